@@ -0,0 +1,96 @@
+"""Measure /products latency while /classify-tenun load runs in parallel.
+
+Start the API first (uvicorn main:app), then run from the backend directory:
+
+    python -m benchmarks.event_loop_latency --user-id ABCD1234 --image ../ai/img1.jpg
+
+The script first samples /products on an idle server, then samples it again
+while `--classify-concurrency` clients keep uploading the image. If image
+decoding or inference blocked the event loop, the second p99 would jump by
+roughly the per-image classification time.
+"""
+import time
+import asyncio
+import argparse
+import mimetypes
+
+import httpx
+import numpy as np
+
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {"count": 0}
+    values = np.array(samples) * 1000
+    return {
+        "count": len(samples),
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p95_ms": round(float(np.percentile(values, 95)), 2),
+        "p99_ms": round(float(np.percentile(values, 99)), 2),
+        "max_ms": round(float(values.max()), 2),
+    }
+
+
+async def sample_products(client: httpx.AsyncClient, duration: float, interval: float) -> list:
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get("/products")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def classify_worker(client: httpx.AsyncClient, stop: asyncio.Event, user_id: str,
+                          image_bytes: bytes, filename: str, content_type: str, counters: dict):
+    while not stop.is_set():
+        response = await client.post(
+            "/classify-tenun",
+            data={"user_id": user_id},
+            files={"file": (filename, image_bytes, content_type)},
+        )
+        counters[response.status_code] = counters.get(response.status_code, 0) + 1
+
+
+async def run(args):
+    with open(args.image, "rb") as f:
+        image_bytes = f.read()
+    content_type = mimetypes.guess_type(args.image)[0] or "image/jpeg"
+
+    limits = httpx.Limits(max_connections=args.classify_concurrency + 4)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+        idle = await sample_products(client, args.duration, args.interval)
+
+        stop = asyncio.Event()
+        counters = {}
+        workers = [
+            asyncio.create_task(classify_worker(client, stop, args.user_id, image_bytes,
+                                                args.image, content_type, counters))
+            for _ in range(args.classify_concurrency)
+        ]
+        try:
+            loaded = await sample_products(client, args.duration, args.interval)
+        finally:
+            stop.set()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    print(f"/products idle:            {percentiles(idle)}")
+    print(f"/products under classify:  {percentiles(loaded)}")
+    print(f"/classify-tenun responses: {counters}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--user-id", required=True, help="Existing user_id used for /classify-tenun")
+    parser.add_argument("--image", required=True, help="Image uploaded by the classification load")
+    parser.add_argument("--classify-concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per sampling phase")
+    parser.add_argument("--interval", type=float, default=0.05, help="Pause between /products calls")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
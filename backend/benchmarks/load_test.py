@@ -0,0 +1,288 @@
+"""End-to-end load test of the main API endpoints.
+
+Against an API that is already running (with OPENAI_BASE_URL pointing at
+benchmarks.mock_openai and DB_* at a local Postgres):
+
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000 --duration 60 --concurrency 20
+
+Or let the script start the mock server and the API itself:
+
+    python -m benchmarks.load_test --spawn --workers 2 --seed --mock-args "--latency lognormal:700,0.4 --error-rate 0.01"
+
+Each virtual user loops over a weighted mix of /chat, /chat-with-tts,
+/translate, /classify-tenun, /products and /buy (--mix). The report has
+throughput, errors and p50/p90/p99/max latency per endpoint. --output saves
+it as JSON; --baseline compares against a saved report and exits 1 when
+p99 or throughput regress by more than --max-regression.
+
+--seed inserts a load-test weaver and product so /buy has stock to sell.
+Only use it (and /buy at all) against a throwaway database: every /buy
+creates a pending transaction.
+"""
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shlex
+import asyncio
+import argparse
+import subprocess
+from collections import defaultdict
+
+import httpx
+import numpy as np
+from PIL import Image
+
+DEFAULT_MIX = "chat=3,chat-with-tts=1,translate=2,classify-tenun=2,products=5,buy=1"
+LOADTEST_WEAVER_ID = "LOADTEST-W"
+LOADTEST_PRODUCT_ID = "LOADTEST-P"
+CHAT_MESSAGES = [
+    "Ina, apa arti motif ayam pada kain tenun?",
+    "Berapa lama menenun satu kain hinggi?",
+    "Tell me about the colors used in Sumba ikat.",
+]
+SUMBA_TEXTS = [
+    "Wai maringu, ana mini",
+    "Ka na mbuhang nda lakeku",
+]
+
+
+class Scenario:
+    """Shared state for the requests: the test user, a product and an image"""
+
+    def __init__(self, client: httpx.AsyncClient, image: bytes):
+        self.client = client
+        self.image = image
+        self.user_id = None
+        self.product_id = None
+
+    async def setup(self):
+        email = f"loadtest-{uuid.uuid4().hex[:10]}@example.com"
+        response = await self.client.post("/auth/register", json={"name": "Load Test", "email": email, "password": uuid.uuid4().hex})
+        response.raise_for_status()
+        self.user_id = response.json()["user_id"]
+
+        products = (await self.client.get("/products")).json()
+        ids = [product["product_id"] for product in products]
+        self.product_id = LOADTEST_PRODUCT_ID if LOADTEST_PRODUCT_ID in ids else (ids[0] if ids else None)
+
+    def chat(self):
+        return self.client.post("/chat", json={"user_message": random.choice(CHAT_MESSAGES), "user_id": self.user_id})
+
+    def chat_with_tts(self):
+        return self.client.post("/chat-with-tts", params={"voice": "nova"},
+                                json={"user_message": random.choice(CHAT_MESSAGES), "user_id": self.user_id})
+
+    def translate(self):
+        return self.client.post("/translate", json={
+            "sumba_text": random.choice(SUMBA_TEXTS), "target_language": random.choice(["id", "en"]), "user_id": self.user_id
+        })
+
+    def classify_tenun(self):
+        # A few random bytes in a JPEG comment keep the prediction cache from answering every request
+        image = self.image[:2] + b"\xff\xfe\x00\x12" + os.urandom(16) + self.image[2:]
+        return self.client.post("/classify-tenun", data={"user_id": self.user_id},
+                                files={"file": ("tenun.jpg", image, "image/jpeg")})
+
+    def products(self):
+        return self.client.get("/products")
+
+    def buy(self):
+        return self.client.post("/buy", json={
+            "user_id": self.user_id, "product_id": self.product_id, "address": "Jl. Load Test 1, Waingapu", "phone_number": "081200000000"
+        })
+
+    def request_for(self, endpoint: str):
+        return getattr(self, endpoint.replace("-", "_"))()
+
+
+def load_jpeg(path: str) -> bytes:
+    """Test image re-encoded as JPEG so classify requests can carry a cache-busting comment"""
+    output = io.BytesIO()
+    Image.open(path).convert("RGB").save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+
+async def virtual_user(scenario: Scenario, mix: dict, deadline: float, results: dict):
+    endpoints, weights = list(mix), list(mix.values())
+    while time.monotonic() < deadline:
+        endpoint = random.choices(endpoints, weights)[0]
+        started = time.perf_counter()
+        try:
+            response = await scenario.request_for(endpoint)
+            outcome = response.status_code
+        except httpx.HTTPError as e:
+            outcome = type(e).__name__
+        results[endpoint].append((time.perf_counter() - started, outcome))
+
+
+def summarize(results: dict, duration: float) -> dict:
+    report = {}
+    for endpoint, samples in sorted(results.items()):
+        ok = np.array([latency for latency, outcome in samples if outcome == 200]) * 1000
+        errors = defaultdict(int)
+        for _, outcome in samples:
+            if outcome != 200:
+                errors[str(outcome)] += 1
+        report[endpoint] = {
+            "requests": len(samples),
+            "throughput": round(len(ok) / duration, 2),
+            "errors": dict(errors),
+            "p50_ms": round(float(np.percentile(ok, 50)), 1) if len(ok) else None,
+            "p90_ms": round(float(np.percentile(ok, 90)), 1) if len(ok) else None,
+            "p99_ms": round(float(np.percentile(ok, 99)), 1) if len(ok) else None,
+            "max_ms": round(float(ok.max()), 1) if len(ok) else None,
+        }
+    return report
+
+
+def print_report(report: dict, duration: float, concurrency: int):
+    print(f"duration={duration:.0f}s concurrency={concurrency}")
+    print(f"{'endpoint':<16}{'requests':>9}{'ok/s':>8}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}  errors")
+    for endpoint, row in report.items():
+        cells = "".join(f"{row[key]:>9.0f}" if row[key] is not None else f"{'-':>9}" for key in ("p50_ms", "p90_ms", "p99_ms", "max_ms"))
+        errors = ", ".join(f"{status}x{count}" for status, count in row["errors"].items()) or "-"
+        print(f"{endpoint:<16}{row['requests']:>9}{row['throughput']:>8.1f}{cells}  {errors}")
+
+
+def regressions(report: dict, baseline: dict, max_regression: float) -> list:
+    found = []
+    for endpoint, row in report.items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if not before:
+            continue
+        if row["p99_ms"] and before.get("p99_ms") and row["p99_ms"] > before["p99_ms"] * (1 + max_regression):
+            found.append(f"{endpoint}: p99 {before['p99_ms']:.0f}ms -> {row['p99_ms']:.0f}ms")
+        if before.get("throughput") and row["throughput"] < before["throughput"] * (1 - max_regression):
+            found.append(f"{endpoint}: throughput {before['throughput']:.1f} -> {row['throughput']:.1f} req/s")
+    return found
+
+
+def seed_product():
+    """Upsert a weaver and a product with plenty of stock for /buy"""
+    from database.config import SessionLocal
+    from models.tables import Product, Weaver
+
+    db = SessionLocal()
+    try:
+        if not db.query(Weaver).filter(Weaver.weaver_id == LOADTEST_WEAVER_ID).first():
+            db.add(Weaver(weaver_id=LOADTEST_WEAVER_ID, name="Load Test Weaver"))
+        product = db.query(Product).filter(Product.product_id == LOADTEST_PRODUCT_ID).first()
+        if product is None:
+            db.add(Product(product_id=LOADTEST_PRODUCT_ID, name="Load Test Hinggi", quantity=1000000, price=150000,
+                           category="hinggi", weaver_id=LOADTEST_WEAVER_ID))
+        else:
+            product.quantity = 1000000
+        db.commit()
+    finally:
+        db.close()
+
+
+def spawn_services(args) -> list:
+    mock_url = f"http://127.0.0.1:{args.mock_port}/v1"
+    env = dict(os.environ, OPENAI_BASE_URL=mock_url, OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", "mock"))
+    return [
+        subprocess.Popen([sys.executable, "-m", "benchmarks.mock_openai", "--port", str(args.mock_port), *shlex.split(args.mock_args)]),
+        subprocess.Popen([
+            sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.api_port),
+            "--workers", str(args.workers), "--log-level", "warning"
+        ], env=env),
+    ]
+
+
+async def wait_until_up(client: httpx.AsyncClient, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get("/health")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"{client.base_url} did not come up")
+
+
+async def run(args) -> dict:
+    mix = parse_mix(args.mix)
+    image = load_jpeg(args.image)
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        await wait_until_up(client)
+        scenario = Scenario(client, image)
+        await scenario.setup()
+        if "buy" in mix and scenario.product_id is None:
+            print("No product in stock, skipping /buy (use --seed)", file=sys.stderr)
+            mix.pop("buy")
+
+        if "classify-tenun" in mix:
+            await client.post("/classify-tenun/warmup")
+
+        results = defaultdict(list)
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(*(virtual_user(scenario, mix, deadline, results) for _ in range(args.concurrency)))
+        duration = time.monotonic() - started
+
+    report = summarize(results, duration)
+    print_report(report, duration, args.concurrency)
+    return {"duration": duration, "concurrency": args.concurrency, "mix": mix, "endpoints": report}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=None, help="Running API (default: the spawned one)")
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights, e.g. chat=3,products=5")
+    parser.add_argument("--image", default="../ai/img1.jpg")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    parser.add_argument("--baseline", default=None, help="Report JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    parser.add_argument("--seed", action="store_true", help="Create a load-test product for /buy (throwaway DB only)")
+    parser.add_argument("--spawn", action="store_true", help="Start the mock OpenAI server and uvicorn main:app")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--api-port", type=int, default=8000)
+    parser.add_argument("--mock-port", type=int, default=8100)
+    parser.add_argument("--mock-args", default="", help="Extra arguments for benchmarks.mock_openai")
+    args = parser.parse_args()
+    args.base_url = args.base_url or f"http://127.0.0.1:{args.api_port}"
+
+    if args.seed:
+        seed_product()
+
+    processes = spawn_services(args) if args.spawn else []
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            found = regressions(report["endpoints"], json.load(f), args.max_regression)
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
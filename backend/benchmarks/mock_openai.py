@@ -0,0 +1,256 @@
+"""Local stand-in for the OpenAI API, for load tests without a real key.
+
+    python -m benchmarks.mock_openai --port 8100 --latency lognormal:700,0.4 --error-rate 0.02
+
+Then point the API at it:
+
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=mock uvicorn main:app
+
+Implements POST /v1/chat/completions (with and without stream=true) and
+POST /v1/audio/speech. Latencies are drawn from a distribution:
+
+    fixed:MS              always MS
+    uniform:LOW,HIGH      uniform between LOW and HIGH ms
+    normal:MEAN,STD       normal, clipped at 0
+    lognormal:MEDIAN,SIGMA  long-tailed, like real model latency
+
+--latency is the time to first token (chat) or first byte (speech); chat
+then generates --completion-tokens at --tokens-per-second, so a
+non-streaming reply takes latency + tokens / rate like the real API.
+Translation prompts (they ask for "translated_text") get a JSON reply, with
+one entry per numbered text for packed /translate/batch prompts.
+
+Error injection: --error-rate returns one of --error-codes (429 carries
+Retry-After), --timeout-rate hangs for --hang-seconds, --disconnect-rate
+cuts streams off half way. GET /mock/stats shows what was served.
+"""
+import re
+import json
+import time
+import uuid
+import random
+import asyncio
+import logging
+import argparse
+import traceback
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+REPLY = (
+    "Halo, anakku! Tenun ikat Sumba ditenun dengan sabar, motif demi motif, dari benang yang diikat "
+    "dan dicelup berulang kali. Motif ayam melambangkan kehidupan baru, motif manusia mengingatkan kita "
+    "pada leluhur. Setiap kain membawa cerita keluarga yang menenunnya."
+)
+TRANSLATION = {
+    "translated_text": "Selamat datang di tanah Sumba, tanah para leluhur.",
+    "cultural_notes": "Leluhur (Marapu) dihormati dalam kehidupan sehari-hari masyarakat Sumba.",
+    "confidence_score": 0.87,
+}
+SILENT_MP3_FRAME = bytes.fromhex("fffb9064") + bytes(413)  # ~26 ms of MPEG audio
+ERROR_TYPES = {
+    429: ("rate_limit_exceeded", "Rate limit reached (mock)"),
+    500: ("server_error", "The server had an error while processing your request (mock)"),
+    502: ("server_error", "Bad gateway (mock)"),
+    503: ("server_error", "The engine is currently overloaded (mock)"),
+}
+
+
+class MockDisconnect(ConnectionResetError):
+    """Raised inside a stream to drop the connection half way"""
+
+
+def hide_injected_disconnects(record: logging.LogRecord) -> bool:
+    """Keep uvicorn from logging a traceback for every deliberate disconnect"""
+    if not record.exc_info:
+        return True
+    return "MockDisconnect" not in "".join(traceback.format_exception(*record.exc_info))
+
+
+def latency_sampler(spec: str):
+    """Parse a latency spec like 'lognormal:700,0.4' into a function returning seconds"""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",")] if params else []
+
+    if kind == "fixed":
+        return lambda: values[0] / 1000
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1]) / 1000
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(values[0], values[1])) / 1000
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda: random.lognormvariate(0, sigma) * median / 1000
+    raise ValueError(f"Unknown latency distribution '{spec}'")
+
+
+def create_app(
+    latency: str = "fixed:800",
+    tts_latency: str = "",
+    tokens_per_second: float = 50.0,
+    completion_tokens: int = 60,
+    audio_realtime_factor: float = 0.0,
+    error_rate: float = 0.0,
+    error_codes: tuple = (429, 500, 503),
+    timeout_rate: float = 0.0,
+    hang_seconds: float = 120.0,
+    disconnect_rate: float = 0.0,
+) -> FastAPI:
+    app = FastAPI(title="Mock OpenAI")
+    chat_latency = latency_sampler(latency)
+    speech_latency = latency_sampler(tts_latency or latency)
+    stats = Counter()
+
+    def completion_id() -> str:
+        return f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+
+    async def injected_failure(endpoint: str):
+        """An error response to send instead of the real one, or None"""
+        roll = random.random()
+        if roll < timeout_rate:
+            stats[f"{endpoint}.timeout"] += 1
+            await asyncio.sleep(hang_seconds)
+        elif roll < timeout_rate + error_rate:
+            status = random.choice(error_codes)
+            stats[f"{endpoint}.error_{status}"] += 1
+            error_type, message = ERROR_TYPES.get(status, ("server_error", "Mock error"))
+            headers = {"retry-after": "1"} if status == 429 else None
+            return JSONResponse(
+                {"error": {"message": message, "type": error_type, "param": None, "code": error_type}},
+                status_code=status,
+                headers=headers,
+            )
+        return None
+
+    def reply_text(body: dict) -> str:
+        prompt = " ".join(str(message.get("content", "")) for message in body.get("messages", []))
+        if '"translations"' in prompt:
+            count = len(re.findall(r"^\d+\. ", prompt, flags=re.MULTILINE))
+            translations = [{"id": index, **TRANSLATION} for index in range(count)]
+            return json.dumps({"translations": translations}, ensure_ascii=False)
+        if "translated_text" in prompt:
+            return json.dumps(TRANSLATION, ensure_ascii=False)
+        words = REPLY.split(" ")
+        tokens = min(int(body.get("max_tokens") or completion_tokens), completion_tokens)
+        return " ".join(words[i % len(words)] for i in range(tokens))
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "gpt-4")
+        stats["chat.requests"] += 1
+
+        failure = await injected_failure("chat")
+        if failure is not None:
+            return failure
+
+        text = reply_text(body)
+        # Whitespace-split "tokens" are close enough for pacing the stream
+        tokens = [token + " " for token in text.split(" ")] if not text.startswith("{") else [text[i:i + 8] for i in range(0, len(text), 8)]
+        await asyncio.sleep(chat_latency())
+
+        if not body.get("stream"):
+            await asyncio.sleep(len(tokens) / tokens_per_second)
+            stats["chat.completed"] += 1
+            return {
+                "id": completion_id(),
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 100, "completion_tokens": len(tokens), "total_tokens": 100 + len(tokens)},
+            }
+
+        cut_at = len(tokens) // 2 if random.random() < disconnect_rate else None
+
+        async def events():
+            chunk_id = completion_id()
+            for position, token in enumerate(tokens):
+                if position == cut_at:
+                    stats["chat.disconnected"] += 1
+                    raise MockDisconnect("mock disconnect")
+                chunk = {
+                    "id": chunk_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(1 / tokens_per_second)
+            stats["chat.completed"] += 1
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/audio/speech")
+    async def audio_speech(request: Request):
+        body = await request.json()
+        stats["speech.requests"] += 1
+
+        failure = await injected_failure("speech")
+        if failure is not None:
+            return failure
+
+        await asyncio.sleep(speech_latency())
+        # Roughly one 26 ms MP3 frame per 10 characters of input
+        frames = max(1, len(body.get("input", "")) // 10)
+
+        async def audio():
+            for start in range(0, frames, 10):
+                yield SILENT_MP3_FRAME * min(10, frames - start)
+                if audio_realtime_factor:
+                    await asyncio.sleep(0.026 * 10 / audio_realtime_factor)
+            stats["speech.completed"] += 1
+
+        return StreamingResponse(audio(), media_type="audio/mpeg")
+
+    @app.get("/mock/stats")
+    async def mock_stats():
+        return dict(stats)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default="fixed:800", help="Time to first token/byte distribution")
+    parser.add_argument("--latency-ms", type=float, default=None, help="Shorthand for --latency fixed:MS")
+    parser.add_argument("--tts-latency", default="", help="Separate distribution for audio.speech")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--completion-tokens", type=int, default=60)
+    parser.add_argument("--audio-realtime-factor", type=float, default=0.0,
+                        help="Stream speech this many times faster than real time (0 = all at once)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-codes", default="429,500,503")
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=120.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    import uvicorn
+    logging.getLogger("uvicorn.error").addFilter(hide_injected_disconnects)
+    app = create_app(
+        latency=f"fixed:{args.latency_ms}" if args.latency_ms is not None else args.latency,
+        tts_latency=args.tts_latency,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        audio_realtime_factor=args.audio_realtime_factor,
+        error_rate=args.error_rate,
+        error_codes=tuple(int(code) for code in args.error_codes.split(",")),
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        disconnect_rate=args.disconnect_rate,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Latency, throughput, memory and accuracy of the exported model variants.
+
+    python -m benchmarks.model_variants --dataset ../ai/tenun_dataset
+
+Every variant listed under "variants" in model_metadata.json (plus the
+shipped CLASSIFIER_MODEL_PATH as "default") is measured in its own
+subprocess so peak RSS is per model. Top-1 agreement and accuracy are
+computed on the dataset images against the float32 variant when it exists.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+import numpy as np
+
+from services.image_pipeline import allocate_batch, decode_image
+from services.inference import create_backend
+from scripts.export_model_variants import IMG_SIZE, dataset_images
+
+REFERENCE_VARIANT = "float32"
+
+
+def load_dataset(dataset_dir: str, class_names: list, limit: int):
+    paths = dataset_images(dataset_dir)[:limit] if limit else dataset_images(dataset_dir)
+    batch = allocate_batch(len(paths), IMG_SIZE)
+    labels = []
+    for i, path in enumerate(paths):
+        with open(path, "rb") as f:
+            decode_image(f.read(), IMG_SIZE, out=batch[i])
+        class_name = os.path.basename(os.path.dirname(path))
+        labels.append(class_names.index(class_name) if class_name in class_names else -1)
+    return batch, np.array(labels)
+
+
+def measure(backend_name: str, model_path: str, args) -> dict:
+    """Runs inside the per-variant subprocess"""
+    with open(args.metadata, "r") as f:
+        class_names = json.load(f).get("class_names", ["ayam", "manusia"])
+
+    backend = create_backend(backend_name, model_path, **({"num_threads": args.threads} if backend_name == "tflite" else {}))
+    images, labels = load_dataset(args.dataset, class_names, args.limit)
+    rng = np.random.default_rng(0)
+
+    latencies = []
+    single = images[:1]
+    for i in range(args.warmup + args.iterations):
+        started = time.perf_counter()
+        backend.predict(single)
+        if i >= args.warmup:
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    throughput = {}
+    for batch_size in args.batch_sizes:
+        batch = images[rng.integers(len(images), size=batch_size)]
+        backend.predict(batch)
+        started = time.perf_counter()
+        runs = max(1, args.iterations // batch_size)
+        for _ in range(runs):
+            backend.predict(batch)
+        throughput[batch_size] = round(runs * batch_size / (time.perf_counter() - started), 1)
+
+    predictions = np.concatenate([
+        backend.predict(images[start:start + 32]) for start in range(0, len(images), 32)
+    ])
+
+    return {
+        "size_bytes": os.path.getsize(model_path) if os.path.isfile(model_path) else None,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "throughput": throughput,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "top1": np.argmax(predictions, axis=1).tolist(),
+        "labels": labels.tolist(),
+    }
+
+
+def run_variant(name: str, backend_name: str, model_path: str, args) -> dict:
+    command = [
+        sys.executable, "-m", "benchmarks.model_variants", "--worker", backend_name, model_path,
+        "--metadata", args.metadata, "--dataset", args.dataset, "--limit", str(args.limit),
+        "--iterations", str(args.iterations), "--warmup", str(args.warmup), "--threads", str(args.threads),
+        "--batch-sizes", *map(str, args.batch_sizes),
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        print(f"{name}: failed\n{completed.stderr.strip()[-2000:]}", file=sys.stderr)
+        return None
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--metadata", default="saved_models/model_metadata.json")
+    parser.add_argument("--dataset", default="../ai/tenun_dataset")
+    parser.add_argument("--limit", type=int, default=0, help="Use at most this many dataset images (0 = all)")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=int(os.getenv("TFLITE_NUM_THREADS", "2")))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--worker", nargs=2, metavar=("BACKEND", "MODEL_PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(*args.worker, args)))
+        return
+
+    with open(args.metadata, "r") as f:
+        metadata = json.load(f)
+
+    candidates = {"default": ("tflite", os.getenv("CLASSIFIER_MODEL_PATH", "saved_models/tenun_classifier.tflite"))}
+    for name, variant in metadata.get("variants", {}).items():
+        candidates[name] = (variant.get("backend", "tflite"), variant["path"])
+
+    results = {}
+    for name, (backend_name, model_path) in candidates.items():
+        result = run_variant(name, backend_name, model_path, args)
+        if result:
+            results[name] = result
+
+    if not results:
+        raise SystemExit("No variant could be benchmarked")
+
+    reference = results.get(REFERENCE_VARIANT) or next(iter(results.values()))
+    reference_top1 = np.array(reference["top1"])
+
+    print(f"{'variant':<14}{'size KB':>9}{'p50 ms':>9}{'p99 ms':>9}{'peak MB':>9}"
+          + "".join(f"{'img/s@' + str(b):>11}" for b in args.batch_sizes) + f"{'agree':>8}{'acc':>8}")
+    for name, result in results.items():
+        top1 = np.array(result["top1"])
+        labels = np.array(result["labels"])
+        labelled = labels >= 0
+        accuracy = float(np.mean(top1[labelled] == labels[labelled])) if labelled.any() else float("nan")
+        size = f"{result['size_bytes'] / 1024:.0f}" if result["size_bytes"] else "-"
+        print(f"{name:<14}{size:>9}{result['p50_ms']:>9.2f}{result['p99_ms']:>9.2f}{result['peak_rss_mb']:>9.1f}"
+              + "".join(f"{result['throughput'][str(b)]:>11.1f}" for b in args.batch_sizes)
+              + f"{np.mean(top1 == reference_top1):>8.3f}{accuracy:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
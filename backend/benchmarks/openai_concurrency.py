@@ -0,0 +1,126 @@
+"""Concurrent upstream calls one API worker can keep in flight.
+
+    python -m benchmarks.openai_concurrency --levels 1 4 16 64 --latency-ms 500
+
+Starts the mock OpenAI server and a single uvicorn worker serving the chat
+and translator routers (pointed at the mock), then fires POST /tts at each
+concurrency level. /tts needs no database, so the numbers only reflect how
+the worker handles upstream latency. With a non-blocking client throughput
+grows with concurrency (ideal = concurrency / upstream latency); a blocking
+client stays flat at 1 / latency.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import subprocess
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+
+TTS_BODY = {"text": "Selamat datang di Sumba, tanah para penenun.", "voice": "nova", "language": "id"}
+
+
+def create_app() -> FastAPI:
+    """Chat + translator routers without the database startup hook of main.py"""
+    from routes.chat import chat_router
+    from routes.translator import translator_router
+    from services.openai_client import close_openai_client
+
+    app = FastAPI()
+    app.include_router(chat_router)
+    app.include_router(translator_router)
+    app.add_event_handler("shutdown", close_openai_client)
+    return app
+
+
+async def wait_until_up(url: str, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up")
+
+
+async def run_level(client: httpx.AsyncClient, url: str, concurrency: int, requests_per_worker: int) -> dict:
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        for _ in range(requests_per_worker):
+            started = time.perf_counter()
+            try:
+                response = await client.post(url, json=TTS_BODY)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+            except httpx.HTTPError:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array(latencies) * 1000 if latencies else np.array([np.nan])
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "errors": errors,
+    }
+
+
+async def run(args):
+    url = f"http://127.0.0.1:{args.api_port}/tts"
+    await wait_until_up(f"http://127.0.0.1:{args.mock_port}/docs")
+    await wait_until_up(f"http://127.0.0.1:{args.api_port}/health")
+
+    limits = httpx.Limits(max_connections=max(args.levels) * 2)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        await run_level(client, url, 1, 1)  # warm up connections and the lazy OpenAI client
+
+        ideal_per_request = args.latency_ms / 1000
+        print(f"upstream latency={args.latency_ms:.0f}ms, one API worker")
+        print(f"{'concurrency':>12}{'req/s':>10}{'ideal':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for concurrency in args.levels:
+            result = await run_level(client, url, concurrency, args.requests_per_worker)
+            print(f"{concurrency:>12}{result['throughput']:>10.1f}{concurrency / ideal_per_request:>10.1f}"
+                  f"{result['p50_ms']:>10.0f}{result['p99_ms']:>10.0f}{result['errors']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests-per-worker", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--mock-port", type=int, default=8100)
+    parser.add_argument("--api-port", type=int, default=8101)
+    args = parser.parse_args()
+
+    env = dict(os.environ, OPENAI_BASE_URL=f"http://127.0.0.1:{args.mock_port}/v1", OPENAI_API_KEY="mock")
+    processes = [
+        subprocess.Popen([
+            sys.executable, "-m", "benchmarks.mock_openai", "--port", str(args.mock_port),
+            "--latency-ms", str(args.latency_ms)
+        ]),
+        subprocess.Popen([
+            sys.executable, "-m", "uvicorn", "benchmarks.openai_concurrency:create_app", "--factory",
+            "--port", str(args.api_port), "--workers", "1", "--log-level", "warning"
+        ], env=env),
+    ]
+    try:
+        asyncio.run(run(args))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
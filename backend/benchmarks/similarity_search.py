@@ -0,0 +1,66 @@
+"""Latency and recall of the product similarity index on synthetic embeddings.
+
+    python -m benchmarks.similarity_search --items 50000 --nprobe 8
+    python -m benchmarks.similarity_search --items 50000 --max-float32-mb 0   # chunked float16 scoring
+
+Vectors are drawn around random cluster centers so the IVF lists behave
+like real motif embeddings. Recall@k is measured against a brute-force scan.
+"""
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+from services.similarity_index import SimilarityIndex, build_index, l2_normalize
+
+
+def synthetic_embeddings(items: int, dimension: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimension)).astype(np.float32)
+    labels = rng.integers(clusters, size=items)
+    return centers[labels] + 0.5 * rng.normal(size=(items, dimension)).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50000)
+    parser.add_argument("--dimension", type=int, default=1280)
+    parser.add_argument("--clusters", type=int, default=300)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--max-float32-mb", type=int, default=512, help="Budget for the cached float32 copy")
+    args = parser.parse_args()
+
+    embeddings = synthetic_embeddings(args.items, args.dimension, args.clusters)
+    items = [{"product_id": f"P{i:06d}"} for i in range(args.items)]
+    queries = synthetic_embeddings(args.queries, args.dimension, args.clusters, seed=1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        build_index(embeddings, items, directory)
+        print(f"build: {time.perf_counter() - started:.1f}s")
+
+        index = SimilarityIndex.load(directory, nprobe=args.nprobe, max_float32_bytes=args.max_float32_mb * 1024 * 1024)
+        exact = l2_normalize(np.asarray(index.vectors, dtype=np.float32))
+
+        latencies, recalls = [], []
+        for query in queries:
+            started = time.perf_counter()
+            found = index.search(query, args.k)
+            latencies.append(time.perf_counter() - started)
+
+            truth = np.argsort(-(exact @ l2_normalize(query)))[:args.k]
+            truth_ids = {index.items[i]["product_id"] for i in truth}
+            recalls.append(len(truth_ids & {item["product_id"] for item in found}) / args.k)
+
+    latencies = np.array(latencies) * 1000
+    scoring = "float32 copy" if index.float32_vectors is not None else "chunked"
+    print(f"items={args.items} dim={args.dimension} nprobe={args.nprobe} k={args.k} scoring={scoring}")
+    print(f"search p50={np.percentile(latencies, 50):.2f}ms p99={np.percentile(latencies, 99):.2f}ms")
+    print(f"recall@{args.k}={np.mean(recalls):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# create_all only creates missing tables; changes to existing tables are applied here, oldest first.
+# Every statement must be safe to run on each startup.
+SCHEMA_UPDATES = [
+    "ALTER TABLE characters ADD COLUMN IF NOT EXISTS prompt_template TEXT",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_conversations_user_character ON conversations (user_id, character_id)",
+]
+
+
+def ensure_schema(engine: Engine):
+    """Apply SCHEMA_UPDATES; a failing statement is logged and the rest still run"""
+    for statement in SCHEMA_UPDATES:
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(statement))
+        except Exception as e:
+            logger.error(f"Schema update failed ({statement}): {e}")
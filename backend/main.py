@@ -4,15 +4,17 @@ from datetime import datetime
 import os
 from fastapi.middleware.cors import CORSMiddleware
 from routes.authentication import authentication_router
-from routes.chat import chat_router
+from routes.chat import chat_router, load_characters
 from routes.ecommerce import ecommerce_router
 from database.config import Base, engine, SessionLocal
+from database.schema import ensure_schema
 from models.tables import User, Conversation, Message, Character
 from sqlalchemy.orm import Session
 from fastapi import Depends
-from routes.translator import translator_router
+from routes.translator import translator_router, load_glossary
 from routes.classifier import classifier_router
 from routes.profile import profile_router
+from services.openai_client import close_openai_client
 
 app = FastAPI()
 origins = [
@@ -69,8 +71,15 @@ def get_db():
 @app.on_event("startup")
 def on_startup():
     Base.metadata.create_all(bind=engine)
+    ensure_schema(engine)
     db = SessionLocal()
     add_characters_to_db(db)
+    load_characters(db)
+    load_glossary()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await close_openai_client()
 @chat_router.delete("/conversation/{conversation_id}")
 async def delete_conversation(conversation_id: int, db: Session = Depends(get_db)):
     """Endpoint untuk menghapus conversation dan semua messagenya"""
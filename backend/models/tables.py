@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, String, Integer, Date, ForeignKey, Text, TIMESTAMP, func
+    Column, String, Integer, Float, Date, ForeignKey, Text, TIMESTAMP, JSON, Index, func
 )
 from sqlalchemy.orm import relationship
 from database.config import Base
@@ -26,6 +26,7 @@ class Character(Base):
     name = Column(String(100), nullable=False)
     bio = Column(Text, nullable=True)
     region = Column(String(50), nullable=True)
+    prompt_template = Column(Text, nullable=True)  # system prompt with {name}, {bio}, {region}; empty = default weaver persona
 
     conversations = relationship("Conversation", back_populates="character", cascade="all, delete-orphan")
 
@@ -33,6 +34,9 @@ class Character(Base):
 # Conversation Table
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        Index("uq_conversations_user_character", "user_id", "character_id", unique=True),
+    )
 
     conversation_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String(8), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
@@ -41,6 +45,7 @@ class Conversation(Base):
     user = relationship("User", back_populates="conversations")
     character = relationship("Character", back_populates="conversations")
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
+    memory = relationship("ConversationMemory", back_populates="conversation", uselist=False, cascade="all, delete-orphan")
 
 
 # Message Table
@@ -55,6 +60,35 @@ class Message(Base):
 
     conversation = relationship("Conversation", back_populates="messages")
 
+
+# Conversation Memory Table: rolling summary of older turns + the recent messages, for building prompts
+class ConversationMemory(Base):
+    __tablename__ = "conversation_memories"
+
+    conversation_id = Column(Integer, ForeignKey("conversations.conversation_id", ondelete="CASCADE"), primary_key=True)
+    summary = Column(Text, nullable=False, default="")
+    recent_messages = Column(JSON, nullable=False, default=list)  # [{"sender", "message", "tokens"}], oldest first
+    recent_tokens = Column(Integer, nullable=False, default=0)
+    summarized_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    conversation = relationship("Conversation", back_populates="memory")
+
+# Translation Memory Table: earlier translations, keyed by source text, target language, context and prompt version
+class TranslationMemoryEntry(Base):
+    __tablename__ = "translation_memory"
+
+    key = Column(String(64), primary_key=True)  # SHA-256, see services/translation_memory.py
+    source_text = Column(Text, nullable=False)
+    target_language = Column(String(8), nullable=False)
+    context_hash = Column(String(16), nullable=False)
+    # "<prompt version>:<model>[+g<glossary hash>]"; fine-tuned model ids alone can pass 60 characters
+    prompt_version = Column(String(200), nullable=False)
+    translated_text = Column(Text, nullable=False)
+    cultural_notes = Column(Text, nullable=True)
+    confidence_score = Column(Float, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
 # Product Table
 class Product(Base):
     __tablename__ = "products"
@@ -1,12 +1,25 @@
-import io
+import json
+import zlib
 import base64
+import asyncio
 from typing import Optional, List
-from openai import OpenAI
-from fastapi import HTTPException, APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
+import anyio
+from fastapi import HTTPException, APIRouter, Depends, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from database.config import get_db
+from database.config import get_db, SessionLocal
+from services.openai_client import get_openai_client, openai_configured, call_with_retries
+from services.tts_cache import TTSCache, normalize_tts_text, tts_cache_key, valid_tts_key
+from services.sentences import SentenceSplitter
+from services.sse import SSE_HEADERS, sse_event
+from services.byte_range import BytesRangeResponse
+from services.character_registry import CharacterRegistry, CharacterProfile
+from services.admin import require_admin_token
+from services.conversation_memory import (
+    get_conversation_memory, append_turn, render_context, load_for_summary, build_summary_prompt, apply_summary
+)
 from models.tables import Character, Conversation, Message, User
 import os
 import logging
@@ -17,18 +30,42 @@ logger = logging.getLogger(__name__)
 
 chat_router = APIRouter()
 
-try:
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    if not os.getenv("OPENAI_API_KEY"):
-        logger.warning("OPENAI_API_KEY not found in environment variables")
-except Exception as e:
-    logger.error(f"Failed to initialize OpenAI client: {e}")
-    client = None
-
 INA_NA_CHARACTER_ID = "CR001"
 VALID_VOICES = ["alloy", "echo", "fable", "onyx", "nova", "shimmer"]
-MAX_CONVERSATION_HISTORY = 20
 MAX_TOKENS = 200
+CHAT_MODEL = "gpt-4"
+TTS_MODEL = "tts-1"
+# Cached clips never change for a key, so clients may keep them
+AUDIO_CACHE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable"}
+
+TTS_CACHE_MEMORY_MB = float(os.getenv("TTS_CACHE_MEMORY_MB", "32"))
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "")  # empty = memory only
+TTS_CACHE_MAX_DISK_MB = float(os.getenv("TTS_CACHE_MAX_DISK_MB", "1024"))
+
+tts_cache = TTSCache(
+    max_memory_bytes=int(TTS_CACHE_MEMORY_MB * 1024 * 1024),
+    cache_dir=TTS_CACHE_DIR or None,
+    max_disk_bytes=int(TTS_CACHE_MAX_DISK_MB * 1024 * 1024)
+)
+# Characters are served from memory, reloaded from the database after this many seconds (0 = only on admin reload)
+CHARACTER_CACHE_TTL_SECONDS = float(os.getenv("CHARACTER_CACHE_TTL_SECONDS", "300"))
+
+# Conversation memory: prompt budget for summary + recent messages, and when to fold old messages into the summary
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1500"))
+CHAT_MEMORY_WINDOW_TOKENS = int(os.getenv("CHAT_MEMORY_WINDOW_TOKENS", "1500"))
+CHAT_SUMMARY_MODEL = os.getenv("CHAT_SUMMARY_MODEL", CHAT_MODEL)
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "300"))
+
+# Conversations whose summary is being updated, and the background tasks doing it
+memory_updates_in_flight = set()
+memory_update_tasks = set()
+
+# Sentence-pipelined chat + TTS: concurrent TTS calls per reply, and the shortest sentence sent alone
+TTS_PIPELINE_PARALLELISM = int(os.getenv("TTS_PIPELINE_PARALLELISM", "3"))
+TTS_PIPELINE_MIN_SENTENCE_CHARS = int(os.getenv("TTS_PIPELINE_MIN_SENTENCE_CHARS", "20"))
+
+# Synthesis in flight per cache key, so concurrent requests for the same text share one upstream call
+tts_in_flight = {}
 
 class ChatMessage(BaseModel):
     user_message: str = Field(..., min_length=1, max_length=2000, description="User message")
@@ -66,6 +103,13 @@ class ChatWithTTSResponse(BaseModel):
     audio_base64: str
     voice_used: str
 
+class ChatWithTTSStreamResponse(BaseModel):
+    bot_response: str
+    conversation_id: int
+    character_name: str
+    audio_url: str
+    voice_used: str
+
 class ConversationHistory(BaseModel):
     conversation_id: int
     user_id: str
@@ -104,55 +148,124 @@ def get_messages(language: str = "en") -> dict:
 
 def validate_openai_client():
     """Validate OpenAI client is available"""
+    client = get_openai_client()
     if client is None:
         raise HTTPException(status_code=500, detail="OpenAI client is not properly configured")
-
-def get_ina_na_character(db: Session) -> Character:
-    """Get Ina Na character from database"""
-    character = db.query(Character).filter(Character.character_id == INA_NA_CHARACTER_ID).first()
+    return client
+
+async def refresh_characters(force: bool = False):
+    """Reload the character registry off the event loop, once for all requests waiting on it"""
+    async with character_refresh_lock:
+        if not force and not character_registry.is_stale():
+            return  # another request refreshed it while we waited
+        try:
+            await asyncio.to_thread(run_in_session, character_registry.load)
+        except Exception as e:
+            character_registry.mark_attempt()
+            logger.error(f"Failed to refresh characters, keeping the cached ones: {e}")
+            if force:
+                raise
+
+async def get_character(character_id: str) -> CharacterProfile:
+    """Character with its precompiled system prompt, from the in-process registry"""
+    if character_registry.is_stale():
+        await refresh_characters()
+    character = character_registry.get(character_id)
     if not character:
         raise HTTPException(status_code=404, detail=get_messages()["character_not_found"])
     return character
 
-def get_or_create_conversation(db: Session, user_id: str) -> Conversation:
-    """Get existing conversation with Ina Na or create new one"""
+async def get_ina_na_character() -> CharacterProfile:
+    return await get_character(INA_NA_CHARACTER_ID)
+
+def get_or_create_conversation(db: Session, user_id: str, character_id: str = INA_NA_CHARACTER_ID) -> Conversation:
+    """Get the user's conversation with a character (one per pair) or create it"""
     conversation = db.query(Conversation).filter(
         Conversation.user_id == user_id,
-        Conversation.character_id == INA_NA_CHARACTER_ID
+        Conversation.character_id == character_id
     ).first()
     
     if not conversation:
         conversation = Conversation(
             user_id=user_id,
-            character_id=INA_NA_CHARACTER_ID
+            character_id=character_id
         )
         db.add(conversation)
-        db.commit()
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent first message created it (unique on user_id, character_id)
+            db.rollback()
+            return db.query(Conversation).filter(
+                Conversation.user_id == user_id,
+                Conversation.character_id == character_id
+            ).one()
         db.refresh(conversation)
-        logger.info(f"Created new conversation {conversation.conversation_id} for user {user_id} with Ina Na")
+        logger.info(f"Created new conversation {conversation.conversation_id} for user {user_id} with {character_id}")
     
     return conversation
 
-def build_conversation_context(db: Session, conversation: Conversation) -> str:
-    """Build conversation context from history"""
-    previous_messages = db.query(Message).filter(
-        Message.conversation_id == conversation.conversation_id
-    ).order_by(Message.timestamp.desc()).limit(MAX_CONVERSATION_HISTORY).all()
-    
-    previous_messages.reverse()
-    
-    conversation_history = ""
-    for msg in previous_messages:
-        if msg.sender == "user":
-            conversation_history += f"User: {msg.message}\n"
-        else:
-            conversation_history += f"Ina Na: {msg.message}\n"
-    
-    return conversation_history
+def build_conversation_context(db: Session, conversation: Conversation, bot_name: str = "Ina Na") -> str:
+    """Rolling summary plus the recent messages that fit in CHAT_HISTORY_TOKEN_BUDGET"""
+    memory = get_conversation_memory(db, conversation.conversation_id)
+    return render_context(memory, CHAT_HISTORY_TOKEN_BUDGET, bot_name)
 
-def save_messages(db: Session, conversation_id: int, user_message: str, bot_response: str):
-    """Save user and bot messages to database"""
+DEFAULT_PROMPT_TEMPLATE = """You are {name}.
+
+{bio}
+
+Region of origin: {region}
+
+You are an experienced traditional ikat weaver from Sumba. Respond according to the language of the message. Speak in a style that is:
+- Maternal and motherly
+- Friendly and warm
+- Patient in explaining
+- Proud of Sumba culture
+- Sometimes mispronounces Sumba terms endearingly
+- Enjoys sharing knowledge about ikat weaving
+- Uses easily understandable English or Indonesian
+- Occasionally mentions weaving motifs, cultural meanings, or the ikat fabric-making process
+
+Answer questions enthusiastically and share your experiences and knowledge about Sumba culture, especially the art of ikat weaving."""
+
+def build_system_prompt(character: Character) -> str:
+    """Character's prompt_template (or the default weaver persona) filled in; done once per
+    character when the registry loads"""
+    fields = {"name": character.name, "bio": character.bio, "region": character.region}
+    template = getattr(character, "prompt_template", None) or DEFAULT_PROMPT_TEMPLATE
+    try:
+        return template.format(**fields)
+    except (KeyError, IndexError, ValueError) as e:
+        logger.error(f"Invalid prompt_template for character {character.character_id} ({e}), using the default")
+        return DEFAULT_PROMPT_TEMPLATE.format(**fields)
+
+character_registry = CharacterRegistry(build_system_prompt, ttl_seconds=CHARACTER_CACHE_TTL_SECONDS)
+character_refresh_lock = asyncio.Lock()
+
+def load_characters(db: Session) -> int:
+    """Fill the character registry at startup (main.py, after the default characters are added)"""
+    return character_registry.load(db)
+
+def build_chat_prompts(character: CharacterProfile, conversation_history: str, user_message: str) -> tuple:
+    """System and user prompt for one chat turn"""
+    system_prompt = character.system_prompt
+
+    user_prompt = f"""Previous conversation history:
+{conversation_history}
+
+User: {user_message}
+{character.name}:"""
+
+    return system_prompt, user_prompt
+
+def save_messages(db: Session, conversation_id: int, user_message: str, bot_response: str) -> bool:
+    """Save user and bot messages to database and add them to the conversation memory
+
+    Returns True when the memory window overflowed and the summary should be updated.
+    """
     try:
+        memory = get_conversation_memory(db, conversation_id, lock=True)
+        
         user_msg = Message(
             conversation_id=conversation_id,
             sender="user",
@@ -166,55 +279,82 @@ def save_messages(db: Session, conversation_id: int, user_message: str, bot_resp
             message=bot_response
         )
         db.add(bot_msg)
+        
+        overflowed = append_turn(memory, user_message, bot_response, CHAT_MEMORY_WINDOW_TOKENS)
         db.commit()
         logger.info(f"Saved messages for conversation {conversation_id}")
+        return overflowed
     except Exception as e:
         db.rollback()
         logger.error(f"Failed to save messages: {e}")
         raise
 
-@chat_router.post("/chat", response_model=ChatResponse)
-async def chat_with_ina_na(message: ChatMessage, db: Session = Depends(get_db)):
-    """Main chat endpoint to chat with Ina Na"""
-    validate_openai_client()
-    
+def run_in_session(operation, *args):
+    """Run a DB function with its own session, for background work outside a request"""
+    db = SessionLocal()
+    try:
+        return operation(db, *args)
+    finally:
+        db.close()
+
+async def update_conversation_summary(conversation_id: int, bot_name: str):
+    """Fold the oldest recent messages into the rolling summary; runs after the reply was sent"""
+    try:
+        client = get_openai_client()
+        if client is None:
+            return
+        
+        loaded = await asyncio.to_thread(run_in_session, load_for_summary, conversation_id, CHAT_MEMORY_WINDOW_TOKENS // 2)
+        if loaded is None:
+            return
+        summary, folded = loaded
+        
+        response = await call_with_retries(
+            client.chat.completions.create,
+            model=CHAT_SUMMARY_MODEL,
+            messages=[{"role": "user", "content": build_summary_prompt(summary, folded, bot_name)}],
+            max_tokens=CHAT_SUMMARY_MAX_TOKENS,
+            temperature=0.3,
+        )
+        new_summary = response.choices[0].message.content.strip()
+        
+        applied = await asyncio.to_thread(run_in_session, apply_summary, conversation_id, folded, new_summary)
+        if applied:
+            logger.info(f"Folded {len(folded)} messages into the summary of conversation {conversation_id}")
+        else:
+            logger.info(f"Memory of conversation {conversation_id} changed while summarizing, will retry on a later turn")
+    except Exception as e:
+        logger.error(f"Failed to update summary of conversation {conversation_id}: {e}")
+    finally:
+        memory_updates_in_flight.discard(conversation_id)
+
+def schedule_memory_update(conversation_id: int, bot_name: str):
+    """Update the conversation summary in the background, at most once at a time per conversation"""
+    if conversation_id in memory_updates_in_flight:
+        return
+    memory_updates_in_flight.add(conversation_id)
+    task = asyncio.create_task(update_conversation_summary(conversation_id, bot_name))
+    memory_update_tasks.add(task)
+    task.add_done_callback(memory_update_tasks.discard)
+
+async def run_chat_turn(client, message: ChatMessage, character_id: str, db: Session) -> ChatResponse:
+    """One chat turn with a character: prompt from the registry and conversation memory, reply saved"""
     try:
         user = db.query(User).filter(User.user_id == message.user_id).first()
         if not user:
             raise HTTPException(status_code=404, detail=get_messages()["user_not_found"])
 
-        character = get_ina_na_character(db)
-
-        conversation = get_or_create_conversation(db, message.user_id)
-
-        conversation_history = build_conversation_context(db, conversation)
-
-        system_prompt = f"""You are {character.name}.
-
-{character.bio}
-
-Region of origin: {character.region}
-
-You are an experienced traditional ikat weaver from Sumba. Respond according to the language of the message. Speak in a style that is:
-- Maternal and motherly
-- Friendly and warm
-- Patient in explaining
-- Proud of Sumba culture
-- Sometimes mispronounces Sumba terms endearingly
-- Enjoys sharing knowledge about ikat weaving
-- Uses easily understandable English or Indonesian
-- Occasionally mentions weaving motifs, cultural meanings, or the ikat fabric-making process
+        character = await get_character(character_id)
 
-Answer questions enthusiastically and share your experiences and knowledge about Sumba culture, especially the art of ikat weaving."""
+        conversation = get_or_create_conversation(db, message.user_id, character_id)
 
-        user_prompt = f"""Previous conversation history:
-{conversation_history}
+        conversation_history = build_conversation_context(db, conversation, character.name)
 
-User: {message.user_message}
-Ina Na:"""
+        system_prompt, user_prompt = build_chat_prompts(character, conversation_history, message.user_message)
 
-        response = client.chat.completions.create(
-            model="gpt-4",
+        response = await call_with_retries(
+            client.chat.completions.create,
+            model=CHAT_MODEL,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
@@ -225,7 +365,8 @@ Ina Na:"""
 
         bot_response = response.choices[0].message.content.strip()
         
-        save_messages(db, conversation.conversation_id, message.user_message, bot_response)
+        if save_messages(db, conversation.conversation_id, message.user_message, bot_response):
+            schedule_memory_update(conversation.conversation_id, character.name)
         
         return ChatResponse(
             bot_response=bot_response,
@@ -239,36 +380,315 @@ Ina Na:"""
         logger.error(f"Chat error: {e}")
         raise HTTPException(status_code=500, detail=get_messages()["chat_error"].format(error_detail=str(e)))
 
+@chat_router.post("/chat", response_model=ChatResponse)
+async def chat_with_ina_na(message: ChatMessage, db: Session = Depends(get_db)):
+    """Main chat endpoint to chat with Ina Na"""
+    client = validate_openai_client()
+    return await run_chat_turn(client, message, INA_NA_CHARACTER_ID, db)
+
+def save_streamed_reply(conversation_id: int, user_message: str, bot_response: str) -> bool:
+    """Persist a streamed turn with its own session; the request's session is closed by then"""
+    return run_in_session(save_messages, conversation_id, user_message, bot_response)
+
+async def stream_chat_events(request: Request, stream, conversation_id: int, character_name: str, user_message: str):
+    """Relay completion deltas as SSE and persist the full reply once the stream ends"""
+    start_time = datetime.now()
+    first_token_time = None
+    parts = []
+    completed = False
+    
+    try:
+        yield sse_event({"conversation_id": conversation_id, "character_name": character_name}, event="start")
+        
+        async for chunk in stream:
+            if await request.is_disconnected():
+                break
+            
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            if first_token_time is None:
+                first_token_time = (datetime.now() - start_time).total_seconds()
+            parts.append(delta)
+            yield sse_event({"delta": delta})
+        else:
+            completed = True
+        
+        if completed:
+            yield sse_event({
+                "bot_response": "".join(parts).strip(),
+                "conversation_id": conversation_id,
+                "character_name": character_name,
+                "time_to_first_token": first_token_time,
+                "processing_time": (datetime.now() - start_time).total_seconds()
+            }, event="done")
+    
+    except Exception as e:
+        logger.error(f"Chat stream error: {e}")
+        yield sse_event({"detail": get_messages()["chat_error"].format(error_detail=str(e))}, event="error")
+    
+    finally:
+        # A client disconnect cancels this generator's scope; shield the cleanup so the
+        # upstream stream is still closed and the turn still saved
+        with anyio.CancelScope(shield=True):
+            # Stop generating (and paying for) tokens nobody will read
+            await stream.close()
+            
+            bot_response = "".join(parts).strip()
+            if not completed:
+                logger.info(f"Chat stream for conversation {conversation_id} ended early after {len(parts)} chunks")
+            if bot_response:
+                try:
+                    if await asyncio.to_thread(save_streamed_reply, conversation_id, user_message, bot_response):
+                        schedule_memory_update(conversation_id, character_name)
+                except Exception:
+                    pass  # already logged by save_messages
+        if first_token_time is not None:
+            logger.info(f"Chat stream time to first token: {first_token_time:.3f}s")
+
+async def open_chat_stream(client, message: ChatMessage, db: Session, character_id: str = INA_NA_CHARACTER_ID) -> tuple:
+    """Look up the user, the character and the conversation, then open a streamed completion
+
+    The upstream stream is opened before responding so setup errors are
+    still plain HTTP errors. Returns (stream, conversation, character).
+    """
+    try:
+        user = db.query(User).filter(User.user_id == message.user_id).first()
+        if not user:
+            raise HTTPException(status_code=404, detail=get_messages()["user_not_found"])
+        
+        character = await get_character(character_id)
+        
+        conversation = get_or_create_conversation(db, message.user_id, character_id)
+        
+        conversation_history = build_conversation_context(db, conversation, character.name)
+        
+        system_prompt, user_prompt = build_chat_prompts(character, conversation_history, message.user_message)
+        
+        stream = await call_with_retries(
+            client.chat.completions.create,
+            model=CHAT_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_tokens=MAX_TOKENS,
+            temperature=0.7,
+            stream=True,
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Chat error: {e}")
+        raise HTTPException(status_code=500, detail=get_messages()["chat_error"].format(error_detail=str(e)))
+    
+    return stream, conversation, character
+
+@chat_router.post("/chat/stream")
+async def chat_with_ina_na_stream(request: Request, message: ChatMessage, db: Session = Depends(get_db)):
+    """Chat with Ina Na, tokens are sent as Server-Sent Events while they are generated"""
+    client = validate_openai_client()
+    
+    stream, conversation, character = await open_chat_stream(client, message, db)
+    
+    return StreamingResponse(
+        stream_chat_events(request, stream, conversation.conversation_id, character.name, message.user_message),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+# Registered after /chat/stream so that path is not taken for a character id
+@chat_router.post("/chat/{character_id}", response_model=ChatResponse)
+async def chat_with_character(character_id: str, message: ChatMessage, db: Session = Depends(get_db)):
+    """Chat with any character in the registry"""
+    client = validate_openai_client()
+    return await run_chat_turn(client, message, character_id, db)
+
+@chat_router.post("/chat/{character_id}/stream")
+async def chat_with_character_stream(character_id: str, request: Request, message: ChatMessage, db: Session = Depends(get_db)):
+    """Chat with any character in the registry, streamed as Server-Sent Events"""
+    client = validate_openai_client()
+    
+    stream, conversation, character = await open_chat_stream(client, message, db, character_id)
+    
+    return StreamingResponse(
+        stream_chat_events(request, stream, conversation.conversation_id, character.name, message.user_message),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+@chat_router.get("/characters")
+async def list_characters():
+    if character_registry.is_stale():
+        await refresh_characters()
+    
+    return {
+        "characters": [
+            {
+                "character_id": character.character_id,
+                "name": character.name,
+                "bio": character.bio,
+                "region": character.region
+            }
+            for character in character_registry.all()
+        ]
+    }
+
+async def synthesize_speech(voice: str, text: str) -> tuple:
+    """Speech for (voice, text) from the TTS cache, else from OpenAI; returns (key, audio, cache_hit)"""
+    text = normalize_tts_text(text)
+    key = tts_cache_key(TTS_MODEL, voice, text)
+    
+    audio = await asyncio.to_thread(tts_cache.get, key)
+    if audio is not None:
+        return key, audio, True
+    
+    pending = tts_in_flight.get(key)
+    if pending is not None:
+        return key, await asyncio.shield(pending), True
+    
+    client = validate_openai_client()
+    pending = asyncio.get_running_loop().create_future()
+    tts_in_flight[key] = pending
+    try:
+        response = await call_with_retries(
+            client.audio.speech.create,
+            model=TTS_MODEL,
+            voice=voice,
+            input=text
+        )
+        audio = response.content
+        await asyncio.to_thread(tts_cache.set, key, audio)
+        pending.set_result(audio)
+        return key, audio, False
+    except BaseException as e:
+        pending.set_exception(e if isinstance(e, Exception) else RuntimeError("TTS request was cancelled"))
+        pending.exception()  # waiters re-raise it; don't warn when there are none
+        raise
+    finally:
+        tts_in_flight.pop(key, None)
+
+def cached_audio_response(key: str, headers: dict) -> Optional[Response]:
+    """Cached clip as a response: from disk via FileResponse (sendfile where the server supports
+    it), else from memory; both tiers answer Range requests. None on a miss"""
+    path = tts_cache.get_path(key)
+    if path is not None:
+        return FileResponse(path, media_type="audio/mpeg", headers=headers)
+    audio = tts_cache.get(key)
+    if audio is not None:
+        # The key is derived from model, voice and text, so it names the clip's bytes for If-Range
+        return BytesRangeResponse(audio, media_type="audio/mpeg", headers={**headers, "ETag": f'"{key}"'})
+    return None
+
+async def open_speech_stream(client, voice: str, text: str):
+    """Start a TTS request without reading the body; relay_speech closes the response"""
+    return await client.audio.speech.with_streaming_response.create(
+        model=TTS_MODEL,
+        voice=voice,
+        input=text,
+        response_format="mp3"
+    ).__aenter__()
+
+async def relay_speech(response, key: str):
+    """Forward upstream audio chunks as they arrive and cache the clip once it is complete"""
+    parts = []
+    completed = False
+    try:
+        async for chunk in response.iter_bytes():
+            parts.append(chunk)
+            yield chunk
+        completed = True
+    except Exception as e:
+        # Headers are already sent, all we can do is end the stream early
+        logger.error(f"TTS stream error: {e}")
+    finally:
+        # Return the connection to the pool even when a disconnect cancelled this generator
+        with anyio.CancelScope(shield=True):
+            await response.close()
+        if completed:
+            await asyncio.to_thread(tts_cache.set, key, b"".join(parts))
+        else:
+            logger.info(f"TTS stream {key[:12]} ended early after {len(parts)} chunks, not cached")
+
+async def speech_response(voice: str, text: str, headers: dict) -> Response:
+    """Cached clip if there is one, else upstream audio streamed through while it is synthesized"""
+    text = normalize_tts_text(text)
+    key = tts_cache_key(TTS_MODEL, voice, text)
+    headers = {**headers, "X-TTS-Cache": "hit", "X-TTS-Audio-Key": key}
+    
+    cached = cached_audio_response(key, headers)
+    if cached is not None:
+        return cached
+    
+    client = validate_openai_client()
+    response = await call_with_retries(open_speech_stream, client, voice, text)
+    
+    headers["X-TTS-Cache"] = "miss"
+    return StreamingResponse(relay_speech(response, key), media_type="audio/mpeg", headers=headers)
+
+def speech_token(voice: str, text: str) -> str:
+    """Self-contained reference to (voice, text) for an audio URL, valid on every worker"""
+    payload = zlib.compress(json.dumps({"voice": voice, "text": text}, ensure_ascii=False).encode("utf-8"))
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+def parse_speech_token(token: str) -> TTSRequest:
+    try:
+        payload = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(zlib.decompress(payload))
+        return TTSRequest(text=data["text"], voice=data["voice"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid audio token")
+
 @chat_router.post("/tts")
 async def text_to_speech(request: TTSRequest):
-    """Convert text to speech using OpenAI TTS API"""
-    validate_openai_client()
-    
+    """Convert text to speech using OpenAI TTS API; audio is streamed as it is generated and
+    repeated text is served from the TTS cache"""
     messages = get_messages(request.language)
     logger.info(f"Processing TTS request in language: {request.language}")
 
     try:
-        response = client.audio.speech.create(
-            model="tts-1",
-            voice=request.voice,
-            input=request.text
-        )
-        
-        audio_bytes = io.BytesIO()
-        for chunk in response.iter_bytes():
-            audio_bytes.write(chunk)
-        audio_bytes.seek(0)
-        
-        return StreamingResponse(
-            io.BytesIO(audio_bytes.read()),
-            media_type="audio/mpeg",
-            headers={"Content-Disposition": "attachment; filename=speech.mp3"}
+        return await speech_response(
+            request.voice,
+            request.text,
+            {"Content-Disposition": "attachment; filename=speech.mp3"}
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"TTS error: {e}")
         raise HTTPException(status_code=500, detail=messages["tts_error"].format(error_detail=str(e)))
 
+@chat_router.get("/tts/stream/{token}")
+async def stream_speech(token: str):
+    """Audio for an `audio_url` from /chat-with-tts/stream, streamed while it is synthesized"""
+    request = parse_speech_token(token)
+    
+    try:
+        return await speech_response(request.voice, request.text, AUDIO_CACHE_HEADERS)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"TTS error: {e}")
+        raise HTTPException(status_code=500, detail=get_messages()["tts_error"].format(error_detail=str(e)))
+
+@chat_router.get("/tts/audio/{audio_key}")
+async def get_cached_speech(audio_key: str):
+    """Cached clip by its key (X-TTS-Audio-Key); supports Range requests for audio players"""
+    if not valid_tts_key(audio_key):
+        raise HTTPException(status_code=400, detail="Invalid audio key")
+    
+    cached = cached_audio_response(audio_key, AUDIO_CACHE_HEADERS)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    return cached
+
+@chat_router.get("/tts/cache/metrics")
+async def get_tts_cache_metrics():
+    return tts_cache.get_metrics()
+
 @chat_router.post("/chat-with-tts", response_model=ChatWithTTSResponse)
 async def chat_with_tts(
     message: ChatMessage, 
@@ -287,17 +707,9 @@ async def chat_with_tts(
     try:
         chat_response = await chat_with_ina_na(message, db)
         
-        audio_response = client.audio.speech.create(
-            model="tts-1",
-            voice=voice,
-            input=chat_response.bot_response
-        )
-        
-        audio_bytes = b""
-        for chunk in audio_response.iter_bytes():
-            audio_bytes += chunk
+        _, audio, _ = await synthesize_speech(voice, chat_response.bot_response)
         
-        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
+        audio_base64 = base64.b64encode(audio).decode('utf-8')
         
         return ChatWithTTSResponse(
             bot_response=chat_response.bot_response,
@@ -313,6 +725,130 @@ async def chat_with_tts(
         logger.error(f"Chat with TTS error: {e}")
         raise HTTPException(status_code=500, detail=f"Chat with TTS Error: {str(e)}")
 
+@chat_router.post("/chat-with-tts/stream", response_model=ChatWithTTSStreamResponse)
+async def chat_with_tts_stream(
+    message: ChatMessage,
+    voice: str = Query(default="nova"),
+    db: Session = Depends(get_db)
+):
+    """Chat with Ina Na; the text comes back right away with a URL that streams its audio"""
+    if voice not in VALID_VOICES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid voice. Must be one of: {', '.join(VALID_VOICES)}"
+        )
+    
+    chat_response = await chat_with_ina_na(message, db)
+    
+    return ChatWithTTSStreamResponse(
+        bot_response=chat_response.bot_response,
+        conversation_id=chat_response.conversation_id,
+        character_name=chat_response.character_name,
+        audio_url=f"/tts/stream/{speech_token(voice, chat_response.bot_response)}",
+        voice_used=voice
+    )
+
+async def pipelined_speech(stream, conversation_id: int, character_name: str, user_message: str, voice: str):
+    """Speak the reply sentence by sentence while it is still being generated
+
+    Each completed sentence goes to TTS right away, at most
+    TTS_PIPELINE_PARALLELISM at a time; the clips are sent in reply order
+    as one MP3 stream (MP3 frames concatenate cleanly).
+    """
+    start_time = datetime.now()
+    semaphore = asyncio.Semaphore(TTS_PIPELINE_PARALLELISM)
+    clips = asyncio.Queue()  # synthesis tasks in sentence order, None at the end
+    tasks = []
+    parts = []
+    first_audio_time = None
+    
+    async def synthesize(sentence: str) -> bytes:
+        async with semaphore:
+            _, audio, _ = await synthesize_speech(voice, sentence)
+            return audio
+    
+    def speak(sentence: str):
+        task = asyncio.create_task(synthesize(sentence))
+        tasks.append(task)
+        clips.put_nowait(task)
+    
+    async def split_reply():
+        splitter = SentenceSplitter(min_chars=TTS_PIPELINE_MIN_SENTENCE_CHARS)
+        try:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                parts.append(delta)
+                for sentence in splitter.feed(delta):
+                    speak(sentence)
+            for sentence in splitter.flush():
+                speak(sentence)
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+        finally:
+            clips.put_nowait(None)
+    
+    producer = asyncio.create_task(split_reply())
+    try:
+        while True:
+            task = await clips.get()
+            if task is None:
+                break
+            try:
+                audio = await task
+            except Exception as e:
+                logger.error(f"TTS error for one sentence, skipped: {e}")
+                continue
+            if first_audio_time is None:
+                first_audio_time = (datetime.now() - start_time).total_seconds()
+            yield audio
+    
+    finally:
+        # Client gone or reply done: stop the LLM stream and any TTS still running.
+        # Shielded, since a disconnect cancels this generator's scope.
+        producer.cancel()
+        for task in tasks:
+            task.cancel()
+        with anyio.CancelScope(shield=True):
+            await stream.close()
+            
+            bot_response = "".join(parts).strip()
+            if bot_response:
+                try:
+                    if await asyncio.to_thread(save_streamed_reply, conversation_id, user_message, bot_response):
+                        schedule_memory_update(conversation_id, character_name)
+                except Exception:
+                    pass  # already logged by save_messages
+        if first_audio_time is not None:
+            logger.info(f"Pipelined chat+TTS time to first audio: {first_audio_time:.3f}s")
+
+@chat_router.post("/chat-with-tts/pipelined")
+async def chat_with_tts_pipelined(
+    message: ChatMessage,
+    voice: str = Query(default="nova"),
+    db: Session = Depends(get_db)
+):
+    """Chat with Ina Na as one MP3 stream, synthesized sentence by sentence while the reply is generated"""
+    client = validate_openai_client()
+    
+    if voice not in VALID_VOICES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid voice. Must be one of: {', '.join(VALID_VOICES)}"
+        )
+    
+    stream, conversation, character = await open_chat_stream(client, message, db)
+    
+    return StreamingResponse(
+        pipelined_speech(stream, conversation.conversation_id, character.name, message.user_message, voice),
+        media_type="audio/mpeg",
+        headers={
+            "X-Conversation-Id": str(conversation.conversation_id),
+            "X-Accel-Buffering": "no",
+        }
+    )
+
 @chat_router.get("/conversation/{conversation_id}", response_model=ConversationHistory)
 async def get_conversation_history(conversation_id: int, db: Session = Depends(get_db)):
     conversation = db.query(Conversation).filter(
@@ -322,7 +858,7 @@ async def get_conversation_history(conversation_id: int, db: Session = Depends(g
     if not conversation:
         raise HTTPException(status_code=404, detail=get_messages()["conversation_not_found"])
     
-    character = get_ina_na_character(db)
+    character = await get_character(conversation.character_id)
     
     messages = db.query(Message).filter(
         Message.conversation_id == conversation_id
@@ -349,23 +885,23 @@ async def get_user_conversations(user_id: str, db: Session = Depends(get_db)):
     if not user:
         raise HTTPException(status_code=404, detail=get_messages()["user_not_found"])
     
-    conversations = db.query(Conversation).filter(
-        Conversation.user_id == user_id,
-        Conversation.character_id == INA_NA_CHARACTER_ID
-    ).all()
+    conversations = db.query(Conversation).filter(Conversation.user_id == user_id).all()
+    
+    if character_registry.is_stale():
+        await refresh_characters()
     
     result = []
     for conv in conversations:
-        character = get_ina_na_character(db)
-        
         last_message = db.query(Message).filter(
             Message.conversation_id == conv.conversation_id
         ).order_by(Message.timestamp.desc()).first()
+        # A character removed from the database keeps its conversations listed, just without a name
+        character = character_registry.get(conv.character_id)
         
         result.append({
             "conversation_id": conv.conversation_id,
             "character_id": conv.character_id,
-            "character_name": character.name,
+            "character_name": character.name if character else None,
             "last_message": last_message.message if last_message else None,
             "last_timestamp": last_message.timestamp.isoformat() if last_message and last_message.timestamp else None
         })
@@ -373,8 +909,8 @@ async def get_user_conversations(user_id: str, db: Session = Depends(get_db)):
     return UserConversations(conversations=result)
 
 @chat_router.get("/character")
-async def get_ina_na_info(db: Session = Depends(get_db)):
-    character = get_ina_na_character(db)
+async def get_ina_na_info():
+    character = await get_ina_na_character()
     
     return {
         "character_id": character.character_id,
@@ -383,6 +919,15 @@ async def get_ina_na_info(db: Session = Depends(get_db)):
         "region": character.region
     }
 
+@chat_router.post("/character/reload", dependencies=[Depends(require_admin_token)])
+async def reload_characters():
+    """Reload all characters and their prompts from the database (after editing a Character row)"""
+    try:
+        await refresh_characters(force=True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to reload characters: {str(e)}")
+    return character_registry.get_metrics()
+
 @chat_router.get("/tts/voices")
 async def get_available_voices():
     return {
@@ -420,7 +965,7 @@ async def delete_conversation(conversation_id: int, db: Session = Depends(get_db
 async def health_check():
     return {
         "status": "healthy",
-        "openai_configured": client is not None,
+        "openai_configured": openai_configured(),
         "character": "Ina Na - Sumba Weaver",
         "timestamp": datetime.now().isoformat()
     }
@@ -433,8 +978,14 @@ def read_root():
         "version": "2.1",
         "endpoints": [
             "/chat - Chat with Ina Na",
+            "/chat/stream - Chat with Ina Na, streamed as Server-Sent Events",
+            "/chat/{character_id} - Chat with another character (/chat/{character_id}/stream to stream)",
+            "/characters - List characters",
             "/tts - Text to speech conversion", 
+            "/tts/audio/{key} - Cached speech audio (Range requests supported)",
             "/chat-with-tts - Chat with audio response",
+            "/chat-with-tts/stream - Chat reply with a URL streaming its audio",
+            "/chat-with-tts/pipelined - Chat reply as audio, spoken sentence by sentence while it is generated",
             "/conversation/{id} - Get conversation history",
             "/user/{id}/conversations - Get user conversations",
             "/character - Get character information",
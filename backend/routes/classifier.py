@@ -1,28 +1,33 @@
-from typing import Optional
+from typing import Optional, Tuple, List
 import os
 import json
+import asyncio
 import logging
+import zipfile
+import tempfile
+from functools import partial
 from datetime import datetime
 import numpy as np
-from PIL import Image
-import io
 import base64
 
 from fastapi import HTTPException, APIRouter, Depends, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from database.config import get_db
 from models.tables import User
+from services.inference import backend_can_embed, create_backend, tensorflow_available
+from services.batching import MicroBatcher, BatchQueueFull
+from services.executors import BoundedExecutor, WorkQueueFull
+from services.image_pipeline import allocate_batch, decode_image
+from services.prediction_cache import PredictionCache, content_key
+from services.perceptual_hash import NearDuplicateIndex, phash
+from services.similarity_index import SimilarityIndex
+from services.model_registry import ModelRegistry
+from services.shadow import ShadowStats
+from services.admin import require_admin_token
 
-# TensorFlow imports with error handling
-try:
-    import tensorflow as tf
-    from tensorflow.keras.preprocessing import image
-    from tensorflow.keras.models import load_model
-    TF_AVAILABLE = True
-except ImportError:
-    TF_AVAILABLE = False
-    tf = None
+TF_AVAILABLE = tensorflow_available()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,16 +36,88 @@ logger = logging.getLogger(__name__)
 classifier_router = APIRouter()
 
 # Constants
-MODEL_PATH = "saved_models/tenun_classifier.keras"
+MODEL_PATHS = {
+    "tflite": "saved_models/tenun_classifier.tflite",
+    "savedmodel": "saved_models/tenun_savedmodel",
+    "keras": "saved_models/tenun_classifier.keras",
+}
+CLASSIFIER_BACKEND = os.getenv("CLASSIFIER_BACKEND", "tflite")
+MODEL_PATH = os.getenv("CLASSIFIER_MODEL_PATH", MODEL_PATHS.get(CLASSIFIER_BACKEND, ""))
+CLASSIFIER_MODEL_VARIANT = os.getenv("CLASSIFIER_MODEL_VARIANT", "")  # e.g. int8, float16 (see "variants" in metadata)
+CLASSIFIER_PRELOAD = os.getenv("CLASSIFIER_PRELOAD", "0") == "1"  # 0 = load on first request or /classify-tenun/warmup
+TFLITE_NUM_THREADS = int(os.getenv("TFLITE_NUM_THREADS", "0")) or None
 METADATA_PATH = "saved_models/model_metadata.json"
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "saved_models/registry")  # used when it holds any version
+MODEL_RELOAD_POLL_SECONDS = float(os.getenv("MODEL_RELOAD_POLL_SECONDS", "0"))  # 0 = no watcher on the ACTIVE file
+CLASSIFIER_SHADOW_VERSION = os.getenv("CLASSIFIER_SHADOW_VERSION", "")
+CLASSIFIER_SHADOW_SAMPLE_RATE = float(os.getenv("CLASSIFIER_SHADOW_SAMPLE_RATE", "0.1"))
+BATCH_MAX_SIZE = int(os.getenv("CLASSIFIER_BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.getenv("CLASSIFIER_BATCH_MAX_WAIT_MS", "5"))
+BATCH_MAX_QUEUE_DEPTH = int(os.getenv("CLASSIFIER_BATCH_MAX_QUEUE_DEPTH", "64"))
+PREPROCESS_WORKERS = int(os.getenv("CLASSIFIER_PREPROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+PREPROCESS_MAX_PENDING = int(os.getenv("CLASSIFIER_PREPROCESS_MAX_PENDING", "32"))
+RETRY_AFTER_SECONDS = int(os.getenv("CLASSIFIER_RETRY_AFTER_SECONDS", "1"))
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "1024"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "86400"))
+PREDICTION_CACHE_DB_PATH = os.getenv("PREDICTION_CACHE_DB_PATH", "")  # empty = memory only
+PREDICTION_CACHE_WRITE_BATCH = int(os.getenv("PREDICTION_CACHE_WRITE_BATCH", "32"))  # disk writes per commit
+PREDICTION_CACHE_FLUSH_SECONDS = float(os.getenv("PREDICTION_CACHE_FLUSH_SECONDS", "5"))
+NEAR_DUPLICATE_MAX_DISTANCE = int(os.getenv("NEAR_DUPLICATE_MAX_DISTANCE", "8"))  # negative = disabled
+NEAR_DUPLICATE_MAX_ENTRIES = int(os.getenv("NEAR_DUPLICATE_MAX_ENTRIES", "10000"))
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/jpg", "image/png", "image/bmp"}
+ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+ZIP_CONTENT_TYPES = {"application/zip", "application/x-zip-compressed", "application/x-zip"}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+PRODUCT_INDEX_DIR = os.getenv("PRODUCT_INDEX_DIR", "saved_models/product_index")
+SIMILAR_PRODUCTS_TOP_K = int(os.getenv("SIMILAR_PRODUCTS_TOP_K", "5"))
+SIMILAR_PRODUCTS_NPROBE = int(os.getenv("SIMILAR_PRODUCTS_NPROBE", "8"))
+SIMILAR_PRODUCTS_MAX_FLOAT32_MB = int(os.getenv("SIMILAR_PRODUCTS_MAX_FLOAT32_MB", "512"))  # float32 copy of the index
+CLASSIFIER_EMBEDDINGS = os.getenv("CLASSIFIER_EMBEDDINGS", "auto")  # auto = on when the product index exists
+MAX_ARCHIVE_SIZE = int(os.getenv("CLASSIFIER_MAX_ARCHIVE_MB", "200")) * 1024 * 1024
+MAX_BATCH_ITEMS = int(os.getenv("CLASSIFIER_MAX_BATCH_ITEMS", "500"))
+MAX_BATCH_UPLOAD_SIZE = int(os.getenv("CLASSIFIER_MAX_BATCH_UPLOAD_MB", "200")) * 1024 * 1024  # all multipart files together
+BATCH_CHUNK_SIZE = int(os.getenv("CLASSIFIER_BATCH_CHUNK_SIZE", str(BATCH_MAX_SIZE)))  # first invocation at this size paid at load time
+ARCHIVE_SPOOL_MAX_SIZE = 16 * 1024 * 1024  # larger ZIP uploads are spooled to a temporary file
+UPLOAD_READ_CHUNK_SIZE = 1024 * 1024
 IMG_SIZE = (224, 224)
 CONFIDENCE_THRESHOLD = 75.0
 
 # Global variables
 model = None
 model_metadata = None
+batcher = None
+similarity_index = None
+model_load_error = None
+model_load_lock = asyncio.Lock()
+shadow_model = None  # candidate bundle (see load_model_bundle) run on sampled traffic
+shadow_stats = None
+shadow_tasks = set()
+reload_watcher = None
+
+model_registry = ModelRegistry(MODEL_REGISTRY_DIR)
+
+# Decode/resize runs here instead of on the event loop
+preprocess_pool = BoundedExecutor(
+    max_workers=PREPROCESS_WORKERS,
+    max_pending=PREPROCESS_MAX_PENDING,
+    name="tenun-preprocess"
+)
+
+# Results of previous uploads, keyed by content hash + model version
+prediction_cache = PredictionCache(
+    max_entries=PREDICTION_CACHE_MAX_ENTRIES,
+    ttl_seconds=PREDICTION_CACHE_TTL_SECONDS,
+    disk_path=PREDICTION_CACHE_DB_PATH or None,
+    write_batch_size=PREDICTION_CACHE_WRITE_BATCH,
+    flush_seconds=PREDICTION_CACHE_FLUSH_SECONDS
+)
+prediction_cache_flush = None  # running background flush of the disk tier
+
+# Recent results by perceptual hash, for re-encoded/resized copies of a photo
+near_duplicate_index = NearDuplicateIndex(
+    max_distance=NEAR_DUPLICATE_MAX_DISTANCE,
+    max_entries=NEAR_DUPLICATE_MAX_ENTRIES
+)
 
 # Motif analysis data
 MOTIF_ANALYSIS = {
@@ -102,8 +179,19 @@ class ClassificationResponse(BaseModel):
     probabilities: dict
     recommendation: Optional[str] = None
     image_info: dict
+    cached: bool = False
+    similar_products: Optional[List[dict]] = None
     timestamp: str
 
+class ModelReloadRequest(BaseModel):
+    version: Optional[str] = Field(None, description="Versi di registry; kosong = versi ACTIVE")
+    activate: bool = Field(False, description="Tulis versi ini ke ACTIVE agar worker lain ikut berpindah")
+    force: bool = Field(False, description="Muat ulang walaupun versi sama dengan yang sedang aktif")
+
+class ShadowModeRequest(BaseModel):
+    version: str = Field(..., description="Versi kandidat di registry")
+    sample_rate: float = Field(CLASSIFIER_SHADOW_SAMPLE_RATE, ge=0.0, le=1.0, description="Porsi trafik yang ikut dijalankan di model kandidat")
+
 class HealthCheckResponse(BaseModel):
     status: str
     model_loaded: bool
@@ -112,39 +200,177 @@ class HealthCheckResponse(BaseModel):
     timestamp: str
 
 # Utility Functions
-def load_tenun_model():
-    """Load the trained tenun classification model"""
-    global model, model_metadata
+def load_model_metadata() -> dict:
+    """Read model_metadata.json, falling back to the default class mapping"""
+    if os.path.exists(METADATA_PATH):
+        with open(METADATA_PATH, 'r') as f:
+            metadata = json.load(f)
+        logger.info("Model metadata loaded successfully")
+        return metadata
     
-    if not TF_AVAILABLE:
-        logger.error("TensorFlow is not available")
-        return False
+    logger.warning("Model metadata not found")
+    return {
+        "classes": {"ayam": 0, "manusia": 1},
+        "class_names": ["ayam", "manusia"]
+    }
+
+def resolve_model_source(version: Optional[str] = None) -> dict:
+    """Where to load a model version from: the registry if it has versions, else saved_models/"""
+    if model_registry.versions():
+        return model_registry.resolve(
+            version or model_registry.active_version(),
+            variant=CLASSIFIER_MODEL_VARIANT,
+            default_backend=CLASSIFIER_BACKEND
+        )
     
-    try:
-        if os.path.exists(MODEL_PATH):
-            model = load_model(MODEL_PATH)
-            logger.info(f"Model loaded successfully from {MODEL_PATH}")
-        else:
-            logger.error(f"Model file not found: {MODEL_PATH}")
-            return False
-        
-        # Load metadata
-        if os.path.exists(METADATA_PATH):
-            with open(METADATA_PATH, 'r') as f:
-                model_metadata = json.load(f)
-            logger.info("Model metadata loaded successfully")
+    if version:
+        raise KeyError(f"Model registry {MODEL_REGISTRY_DIR} is empty, cannot load version '{version}'")
+    
+    # Load metadata (also lists the exported quantized variants)
+    metadata = load_model_metadata()
+    backend_name, model_path = CLASSIFIER_BACKEND, MODEL_PATH
+    if CLASSIFIER_MODEL_VARIANT:
+        variant = metadata.get("variants", {}).get(CLASSIFIER_MODEL_VARIANT)
+        if variant is None:
+            raise ValueError(f"Model variant '{CLASSIFIER_MODEL_VARIANT}' not found in {METADATA_PATH}")
+        backend_name, model_path = variant.get("backend", "tflite"), variant["path"]
+    
+    return {
+        "version": str(metadata.get("version", "unknown")),
+        "backend": backend_name,
+        "path": model_path,
+        "metadata": metadata,
+        "product_index_dir": PRODUCT_INDEX_DIR,
+    }
+
+def load_model_bundle(source: dict, warmup: bool = True) -> dict:
+    """Load, warm up and start one model version without touching the live globals (blocking)"""
+    backend_options = {}
+    if source["backend"] == "tflite":
+        backend_options["num_threads"] = TFLITE_NUM_THREADS
+    if embeddings_enabled(source["product_index_dir"]):
+        if backend_can_embed(source["backend"]):
+            backend_options["embeddings"] = True
         else:
-            logger.warning("Model metadata not found")
-            model_metadata = {
-                "classes": {"ayam": 0, "manusia": 1},
-                "class_names": ["ayam", "manusia"]
-            }
-        
-        return True
-        
+            logger.info(f"The {source['backend']} backend cannot return embeddings, similar-cloth search is off")
+    
+    backend = create_backend(source["backend"], source["path"], **backend_options)
+    logger.info(f"Model {source['version']} loaded from {source['path']} ({source['backend']} backend)")
+    
+    # Similar-cloth search over shop products (built by scripts/build_product_index.py)
+    index = None
+    if getattr(backend, "supports_embeddings", False):
+        index = load_similarity_index(source["product_index_dir"])
+    elif backend_options.get("embeddings"):
+        logger.info(f"Model {source['version']} has no embedding output, similar-cloth search is off")
+    
+    # The first invocation at each batch size is slower; pay for that before taking traffic.
+    # The TFLite interpreter still resizes whenever the batch size changes (cheap, see _invoke).
+    if warmup:
+        for batch_size in sorted({BATCH_MAX_SIZE, BATCH_CHUNK_SIZE, 1}, reverse=True):
+            run_model_batch(backend, allocate_batch(batch_size, IMG_SIZE))
+    
+    bundle_batcher = MicroBatcher(
+        partial(run_model_batch, backend),
+        max_batch_size=BATCH_MAX_SIZE,
+        max_wait_ms=BATCH_MAX_WAIT_MS,
+        max_queue_depth=BATCH_MAX_QUEUE_DEPTH,
+        name=f"tenun-inference-{source['version']}"
+    )
+    bundle_batcher.start()
+    
+    return {
+        "version": source["version"],
+        "model": backend,
+        "metadata": source["metadata"],
+        "similarity_index": index,
+        "batcher": bundle_batcher,
+    }
+
+def activate_model_bundle(bundle: dict):
+    """Swap the live model in one step; must run on the event loop thread
+    
+    There is no await in here, so no request can observe a half-swapped
+    model. Requests already queued on the old batcher still finish on the
+    old model; the caller stops that batcher afterwards.
+    """
+    global model, model_metadata, batcher, similarity_index, model_load_error
+    
+    model = bundle["model"]
+    model_metadata = bundle["metadata"]
+    similarity_index = bundle["similarity_index"]
+    batcher = bundle["batcher"]
+    model_load_error = None
+    
+    # Results from any other model version are stale now
+    prediction_cache.invalidate(keep_version=get_model_version())
+    near_duplicate_index.clear()
+
+def embeddings_enabled(index_dir: str = PRODUCT_INDEX_DIR) -> bool:
+    """Whether the backend should also return backbone embeddings"""
+    if CLASSIFIER_EMBEDDINGS == "auto":
+        return os.path.exists(index_dir)
+    return CLASSIFIER_EMBEDDINGS == "1"
+
+def load_similarity_index(index_dir: str = PRODUCT_INDEX_DIR) -> Optional[SimilarityIndex]:
+    """Load the product embedding index if it has been built"""
+    if not os.path.exists(index_dir):
+        return None
+    try:
+        index = SimilarityIndex.load(
+            index_dir,
+            nprobe=SIMILAR_PRODUCTS_NPROBE,
+            max_float32_bytes=SIMILAR_PRODUCTS_MAX_FLOAT32_MB * 1024 * 1024
+        )
+        logger.info(f"Product similarity index loaded with {len(index)} products")
+        return index
     except Exception as e:
-        logger.error(f"Error loading model: {e}")
-        return False
+        logger.error(f"Error loading product similarity index: {e}")
+        return None
+
+def find_similar_products(embedding: Optional[np.ndarray]) -> Optional[List[dict]]:
+    """Top-k visually similar shop products for one image embedding"""
+    if embedding is None or similarity_index is None:
+        return None
+    return similarity_index.search(embedding, SIMILAR_PRODUCTS_TOP_K)
+
+async def similar_products_for(embeddings: Optional[np.ndarray], rows: int) -> List[Optional[List[dict]]]:
+    """find_similar_products for the first `rows` embeddings, as one job on the preprocess pool"""
+    if embeddings is None or similarity_index is None:
+        return [None] * rows
+    return await preprocess_pool.run(lambda: [find_similar_products(embedding) for embedding in embeddings[:rows]])
+
+def build_classification_response(classification_result: dict) -> ClassificationResponse:
+    """Build the API response model from a classification result dict"""
+    return ClassificationResponse(
+        prediction=classification_result["prediction"],
+        confidence=classification_result["confidence"],
+        is_uncertain=classification_result["is_uncertain"],
+        processing_time=classification_result["processing_time"],
+        motif_analysis=classification_result["motif_analysis"],
+        probabilities=classification_result["probabilities"],
+        recommendation=classification_result["recommendation"],
+        image_info=classification_result["image_info"],
+        cached=classification_result["cached"],
+        similar_products=classification_result.get("similar_products"),
+        timestamp=datetime.now().isoformat()
+    )
+
+def get_model_version(metadata: Optional[dict] = None) -> str:
+    """Version string of the loaded model, used to scope cached results"""
+    metadata = model_metadata if metadata is None else metadata
+    version = str(metadata.get("version")) if metadata and metadata.get("version") else "unknown"
+    if CLASSIFIER_MODEL_VARIANT:
+        version = f"{version}-{CLASSIFIER_MODEL_VARIANT}"
+    return version
+
+def server_busy_error() -> HTTPException:
+    """503 response telling the client when to retry"""
+    return HTTPException(
+        status_code=503,
+        detail="Server klasifikasi sedang sibuk, coba lagi sebentar",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
 
 def validate_image(file: UploadFile) -> bool:
     """Validate uploaded image"""
@@ -162,112 +388,412 @@ def validate_image(file: UploadFile) -> bool:
     
     return True
 
-def preprocess_image(image_data: bytes) -> np.ndarray:
-    """Preprocess image for model prediction"""
+def preprocess_image(image_data: bytes, out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, dict, int]:
+    """Decode image once and return the model input batch, image info and pHash
+
+    When `out` (one row of a preallocated batch) is given the pixels are
+    written there instead of into a freshly allocated (1, H, W, 3) batch.
+    """
     try:
-        # Load image from bytes
-        img = Image.open(io.BytesIO(image_data))
-        
-        # Convert to RGB if needed
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # Resize to model input size
-        img = img.resize(IMG_SIZE, Image.Resampling.LANCZOS)
-        
-        # Convert to array and normalize
-        img_array = np.array(img)
-        img_array = img_array.astype(np.float32) / 255.0
-        img_array = np.expand_dims(img_array, axis=0)
-        
-        return img_array
+        img_array = allocate_batch(1, IMG_SIZE) if out is None else out[np.newaxis]
+        _, image_info = decode_image(image_data, IMG_SIZE, out=img_array[0])
+        return img_array, image_info, phash(img_array[0])
         
     except Exception as e:
         logger.error(f"Error preprocessing image: {e}")
         raise HTTPException(status_code=400, detail="Gagal memproses gambar")
 
-def get_image_info(image_data: bytes) -> dict:
-    """Get basic image information"""
+def run_model_batch(backend, batch: np.ndarray):
+    """Forward pass used by the micro-batcher's inference thread"""
+    if getattr(backend, "supports_embeddings", False):
+        return backend.predict_with_embeddings(batch)
+    return backend.predict(batch)
+
+def split_model_outputs(outputs) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Separate class probabilities from (optional) backbone embeddings"""
+    if isinstance(outputs, tuple):
+        return outputs
+    return outputs, None
+
+def format_classification_result(predictions: np.ndarray, start_time: datetime) -> dict:
+    """Turn one row of model output into the classification result dict"""
+    # Get class mapping
+    if model_metadata and "classes" in model_metadata:
+        class_mapping = model_metadata["classes"]
+        inv_mapping = {v: k for k, v in class_mapping.items()}
+    else:
+        # Fallback mapping
+        inv_mapping = {0: "ayam", 1: "manusia"}
+    
+    # Process predictions
+    predicted_class_idx = int(np.argmax(predictions[0]))
+    confidence = float(np.max(predictions[0]) * 100)
+    predicted_class = inv_mapping[predicted_class_idx]
+    
+    # Create probability dictionary
+    probabilities = {}
+    for idx, prob in enumerate(predictions[0]):
+        class_name = inv_mapping.get(idx, f"class_{idx}")
+        probabilities[class_name] = float(prob * 100)
+    
+    # Determine final result and get analysis
+    is_uncertain = confidence < CONFIDENCE_THRESHOLD
+    final_prediction = "uncertain" if is_uncertain else predicted_class
+    
+    # Get motif analysis if confident
+    motif_analysis = None
+    recommendation = None
+    
+    if not is_uncertain and predicted_class in MOTIF_ANALYSIS:
+        motif_analysis = MOTIF_ANALYSIS[predicted_class]
+        recommendation = f"Gambar menunjukkan motif {predicted_class} dengan tingkat kepercayaan {confidence:.1f}%. Motif ini memiliki makna budaya yang mendalam dalam tradisi tenun Sumba."
+    elif is_uncertain:
+        recommendation = f"Model tidak yakin dengan prediksi ini (kepercayaan: {confidence:.1f}%). Coba gunakan gambar dengan kualitas lebih baik, pencahayaan yang cukup, dan fokus yang jelas pada motif tenun."
+    
+    processing_time = (datetime.now() - start_time).total_seconds()
+    
+    return {
+        "prediction": final_prediction,
+        "confidence": confidence,
+        "is_uncertain": is_uncertain,
+        "processing_time": processing_time,
+        "motif_analysis": motif_analysis,
+        "probabilities": probabilities,
+        "recommendation": recommendation,
+        "raw_prediction": predicted_class,
+        "threshold_used": CONFIDENCE_THRESHOLD
+    }
+
+def predicted_labels(predictions: np.ndarray, metadata: Optional[dict]) -> List[str]:
+    """Top-1 class name per row, using that model version's class mapping"""
+    classes = metadata.get("classes") if metadata else None
+    inv_mapping = {v: k for k, v in classes.items()} if classes else {0: "ayam", 1: "manusia"}
+    return [inv_mapping.get(int(idx), f"class_{idx}") for idx in np.argmax(predictions, axis=1)]
+
+async def run_shadow(candidate: dict, stats: ShadowStats, batch: np.ndarray, primary_labels: List[str], primary_ms: float):
+    """Run the candidate model on a batch the live model already answered and compare"""
+    start_time = datetime.now()
     try:
-        img = Image.open(io.BytesIO(image_data))
-        return {
-            "format": img.format,
-            "mode": img.mode,
-            "size": img.size,
-            "width": img.width,
-            "height": img.height,
-            "file_size_bytes": len(image_data),
-            "file_size_mb": round(len(image_data) / (1024*1024), 2)
-        }
+        predictions, _ = split_model_outputs(await candidate["batcher"].submit(batch))
+    except BatchQueueFull:
+        stats.record_skipped()
+        return
     except Exception as e:
-        logger.error(f"Error getting image info: {e}")
-        return {"error": "Could not analyze image"}
+        logger.warning(f"Shadow model {candidate['version']} failed: {e}")
+        stats.record_error()
+        return
+    
+    shadow_ms = (datetime.now() - start_time).total_seconds() * 1000
+    for primary, shadow in zip(primary_labels, predicted_labels(predictions, candidate["metadata"])):
+        stats.record(primary == shadow, primary_ms, shadow_ms)
+
+def schedule_shadow(batch: np.ndarray, outputs, inference_start: datetime):
+    """Mirror a sample of live inferences to the shadow model without delaying the response"""
+    if shadow_model is None or not shadow_stats.should_sample():
+        return
+    
+    primary_ms = (datetime.now() - inference_start).total_seconds() * 1000
+    predictions, _ = split_model_outputs(outputs)
+    task = asyncio.create_task(run_shadow(
+        shadow_model, shadow_stats, batch, predicted_labels(predictions, model_metadata), primary_ms
+    ))
+    shadow_tasks.add(task)
+    task.add_done_callback(shadow_tasks.discard)
+
+async def cached_prediction(key: str) -> Optional[dict]:
+    """Prediction cache lookup: the memory tier inline, the SQLite tier on the preprocess pool"""
+    result = prediction_cache.get(key)
+    if result is None and prediction_cache.persistent:
+        result = await preprocess_pool.run(prediction_cache.load, key)
+    return result
+
+def cache_prediction(key: str, result: dict):
+    """Store a result; queued disk writes are committed in batches in the background"""
+    global prediction_cache_flush
+    
+    prediction_cache.set(key, result)
+    if prediction_cache.needs_flush() and (prediction_cache_flush is None or prediction_cache_flush.done()):
+        prediction_cache_flush = asyncio.get_running_loop().run_in_executor(None, prediction_cache.flush)
 
-def classify_tenun_image(image_data: bytes, user_id: str) -> dict:
-    """Classify tenun image and return detailed results"""
-    if model is None:
-        raise HTTPException(status_code=500, detail="Model belum dimuat")
+async def classify_tenun_image(image_data: bytes, user_id: str) -> dict:
+    """Classify tenun image and return detailed results (including image info)"""
+    await ensure_classifier_ready()
     
     start_time = datetime.now()
     
     try:
-        # Preprocess image
-        img_array = preprocess_image(image_data)
+        # Identical uploads skip decode and inference entirely
+        cache_key = await preprocess_pool.run(content_key, image_data, get_model_version())
+        cached_result = await cached_prediction(cache_key)
+        if cached_result is not None:
+            result = dict(cached_result)
+            result["processing_time"] = (datetime.now() - start_time).total_seconds()
+            result["cached"] = True
+            return result
         
-        # Make prediction
-        predictions = model.predict(img_array, verbose=0)
+        # Decode + preprocess image once, off the event loop
+        img_array, image_info, image_hash = await preprocess_pool.run(preprocess_image, image_data)
         
-        # Get class mapping
-        if model_metadata and "classes" in model_metadata:
-            class_mapping = model_metadata["classes"]
-            inv_mapping = {v: k for k, v in class_mapping.items()}
+        # Re-encoded or slightly resized copies of a recent photo reuse its result
+        near_duplicate = near_duplicate_index.lookup(image_hash)
+        if near_duplicate is not None:
+            result = dict(near_duplicate[0])
+            logger.info(f"Near-duplicate hit at hamming distance {near_duplicate[1]}")
         else:
-            # Fallback mapping
-            inv_mapping = {0: "ayam", 1: "manusia"}
-        
-        # Process predictions
-        predicted_class_idx = np.argmax(predictions[0])
-        confidence = float(np.max(predictions[0]) * 100)
-        predicted_class = inv_mapping[predicted_class_idx]
-        
-        # Create probability dictionary
-        probabilities = {}
-        for idx, prob in enumerate(predictions[0]):
-            class_name = inv_mapping.get(idx, f"class_{idx}")
-            probabilities[class_name] = float(prob * 100)
+            # Make prediction (batched together with concurrent requests)
+            inference_start = datetime.now()
+            outputs = await batcher.submit(img_array)
+            schedule_shadow(img_array, outputs, inference_start)
+            predictions, embeddings = split_model_outputs(outputs)
+            result = format_classification_result(predictions, start_time)
+            result["similar_products"] = (await similar_products_for(embeddings, 1))[0]
+            near_duplicate_index.add(image_hash, dict(result))
         
-        # Determine final result and get analysis
-        is_uncertain = confidence < CONFIDENCE_THRESHOLD
-        final_prediction = "uncertain" if is_uncertain else predicted_class
-        
-        # Get motif analysis if confident
-        motif_analysis = None
-        recommendation = None
-        
-        if not is_uncertain and predicted_class in MOTIF_ANALYSIS:
-            motif_analysis = MOTIF_ANALYSIS[predicted_class]
-            recommendation = f"Gambar menunjukkan motif {predicted_class} dengan tingkat kepercayaan {confidence:.1f}%. Motif ini memiliki makna budaya yang mendalam dalam tradisi tenun Sumba."
-        elif is_uncertain:
-            recommendation = f"Model tidak yakin dengan prediksi ini (kepercayaan: {confidence:.1f}%). Coba gunakan gambar dengan kualitas lebih baik, pencahayaan yang cukup, dan fokus yang jelas pada motif tenun."
-        
-        processing_time = (datetime.now() - start_time).total_seconds()
-        
-        return {
-            "prediction": final_prediction,
-            "confidence": confidence,
-            "is_uncertain": is_uncertain,
-            "processing_time": processing_time,
-            "motif_analysis": motif_analysis,
-            "probabilities": probabilities,
-            "recommendation": recommendation,
-            "raw_prediction": predicted_class,
-            "threshold_used": CONFIDENCE_THRESHOLD
-        }
+        result["processing_time"] = (datetime.now() - start_time).total_seconds()
+        result["image_info"] = image_info
+        cache_prediction(cache_key, dict(result))
+        result["cached"] = near_duplicate is not None
+        return result
         
+    except (BatchQueueFull, WorkQueueFull) as e:
+        logger.warning(f"Classification rejected, server busy: {e}")
+        raise server_busy_error()
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Classification error: {e}")
         raise HTTPException(status_code=500, detail=f"Gagal melakukan klasifikasi: {str(e)}")
 
+def read_and_hash(load, model_version: str) -> Tuple[bytes, str]:
+    """Read one batch entry and compute its prediction cache key"""
+    image_data = load()
+    if len(image_data) > MAX_FILE_SIZE:
+        raise ValueError(f"File terlalu besar. Maksimal {MAX_FILE_SIZE // (1024*1024)}MB")
+    return image_data, content_key(image_data, model_version)
+
+def batch_error_message(error: Exception) -> str:
+    """Human readable reason for a failed batch entry"""
+    if isinstance(error, HTTPException):
+        return error.detail
+    if isinstance(error, (WorkQueueFull, BatchQueueFull)):
+        return "Server klasifikasi sedang sibuk, coba lagi sebentar"
+    return str(error)
+
+async def classify_tenun_chunk(entries: List[dict]) -> List[dict]:
+    """Classify one chunk of batch entries with a single inference call"""
+    start_time = datetime.now()
+    model_version = get_model_version()
+    results = [None] * len(entries)
+    
+    def fail(position: int, error: Exception):
+        entry = entries[position]
+        results[position] = {"index": entry["index"], "filename": entry["filename"], "error": batch_error_message(error)}
+    
+    # Read entries and hash them in parallel
+    loaded = await asyncio.gather(
+        *(preprocess_pool.run(read_and_hash, entry["load"], model_version) for entry in entries),
+        return_exceptions=True
+    )
+    
+    hashed = []
+    for position, outcome in enumerate(loaded):
+        if isinstance(outcome, Exception):
+            fail(position, outcome)
+        else:
+            hashed.append(position)
+    
+    cached = await asyncio.gather(
+        *(cached_prediction(loaded[position][1]) for position in hashed),
+        return_exceptions=True
+    )
+    pending = []
+    for position, cached_result in zip(hashed, cached):
+        if isinstance(cached_result, Exception):
+            fail(position, cached_result)
+        elif cached_result is not None:
+            results[position] = dict(cached_result, cached=True)
+        else:
+            pending.append(position)
+    
+    # Decode the remaining images in parallel straight into one batch buffer
+    buffer = allocate_batch(len(pending), IMG_SIZE)
+    decoded = await asyncio.gather(
+        *(preprocess_pool.run(preprocess_image, loaded[position][0], buffer[row]) for row, position in enumerate(pending)),
+        return_exceptions=True
+    )
+    
+    infer_rows, infer_positions = [], []
+    for row, (position, outcome) in enumerate(zip(pending, decoded)):
+        if isinstance(outcome, Exception):
+            fail(position, outcome)
+            continue
+        _, image_info, image_hash = outcome
+        near_duplicate = near_duplicate_index.lookup(image_hash)
+        if near_duplicate is not None:
+            result = dict(near_duplicate[0], image_info=image_info)
+            cache_prediction(loaded[position][1], dict(result))
+            results[position] = dict(result, cached=True)
+        else:
+            infer_rows.append(row)
+            infer_positions.append((position, image_info, image_hash))
+    
+    if infer_rows:
+        batch = buffer if len(infer_rows) == len(buffer) else buffer[infer_rows]
+        try:
+            inference_start = datetime.now()
+            outputs = await batcher.submit(batch)
+            schedule_shadow(batch, outputs, inference_start)
+            predictions, embeddings = split_model_outputs(outputs)
+            similar_products = await similar_products_for(embeddings, len(infer_positions))
+        except Exception as e:
+            logger.error(f"Batch inference error: {e}")
+            for position, _, _ in infer_positions:
+                fail(position, e)
+        else:
+            for row, (position, image_info, image_hash) in enumerate(infer_positions):
+                result = format_classification_result(predictions[row:row + 1], start_time)
+                result["similar_products"] = similar_products[row]
+                near_duplicate_index.add(image_hash, dict(result))
+                result["image_info"] = image_info
+                cache_prediction(loaded[position][1], dict(result))
+                results[position] = dict(result, cached=False)
+    
+    processing_time = (datetime.now() - start_time).total_seconds()
+    for position, result in enumerate(results):
+        if "error" not in result:
+            response = build_classification_response(dict(result, processing_time=processing_time))
+            results[position] = {"index": entries[position]["index"], "filename": entries[position]["filename"], **response.model_dump()}
+    
+    return results
+
+async def spool_archive(file: UploadFile) -> tempfile.SpooledTemporaryFile:
+    """Copy a ZIP upload into a spooled file owned by the batch stream
+    
+    FastAPI closes the upload as soon as the endpoint returns, before the
+    NDJSON stream reads the archive. The copy is made in chunks and stops
+    at MAX_ARCHIVE_SIZE, so an oversized upload is never held in memory.
+    """
+    too_large = HTTPException(status_code=400, detail=f"Arsip terlalu besar. Maksimal {MAX_ARCHIVE_SIZE // (1024*1024)}MB")
+    if file.size is not None and file.size > MAX_ARCHIVE_SIZE:
+        raise too_large
+    
+    spool = tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_MAX_SIZE)
+    size = 0
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > MAX_ARCHIVE_SIZE:
+                raise too_large
+            await asyncio.to_thread(spool.write, chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+async def collect_batch_entries(files: List[UploadFile]) -> Tuple[List[dict], Optional[tempfile.SpooledTemporaryFile]]:
+    """Turn multipart files or a single ZIP archive into lazily-read batch entries
+    
+    Returns (entries, spooled archive); the caller closes the archive file
+    once every entry has been read.
+    """
+    if len(files) == 1 and (files[0].content_type in ZIP_CONTENT_TYPES or (files[0].filename or "").lower().endswith(".zip")):
+        spool = await spool_archive(files[0])
+        try:
+            archive = zipfile.ZipFile(spool)
+        except zipfile.BadZipFile:
+            spool.close()
+            raise HTTPException(status_code=400, detail="Arsip ZIP tidak valid")
+        
+        # Entries are decompressed one at a time from the spooled archive, never extracted to disk
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir()
+            and not info.filename.startswith("__MACOSX/")
+            and os.path.splitext(info.filename)[1].lower() in ALLOWED_IMAGE_EXTENSIONS
+        ]
+        entries = []
+        for info in members:
+            entry = {"index": len(entries), "filename": info.filename, "load": partial(archive.read, info)}
+            if info.file_size > MAX_FILE_SIZE:
+                entry["error"] = f"File terlalu besar. Maksimal {MAX_FILE_SIZE // (1024*1024)}MB"
+            entries.append(entry)
+        return entries, spool
+    
+    # Reject what is over the limits before any file is read into memory
+    if len(files) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Terlalu banyak gambar. Maksimal {MAX_BATCH_ITEMS} per batch")
+    too_large = HTTPException(
+        status_code=400,
+        detail=f"Total upload terlalu besar. Maksimal {MAX_BATCH_UPLOAD_SIZE // (1024*1024)}MB per batch"
+    )
+    if sum(file.size or 0 for file in files) > MAX_BATCH_UPLOAD_SIZE:
+        raise too_large
+    
+    entries = []
+    total_size = 0
+    for file in files:
+        entry = {"index": len(entries), "filename": file.filename}
+        entries.append(entry)
+        try:
+            validate_image(file)
+        except HTTPException as e:
+            entry["error"] = e.detail
+            continue
+        
+        # Files without a declared size are read at most one byte past the limit
+        image_data = await file.read(MAX_FILE_SIZE + 1)
+        if len(image_data) > MAX_FILE_SIZE:
+            entry["error"] = f"File terlalu besar. Maksimal {MAX_FILE_SIZE // (1024*1024)}MB"
+            continue
+        total_size += len(image_data)
+        if total_size > MAX_BATCH_UPLOAD_SIZE:
+            raise too_large
+        entry["load"] = partial(bytes, image_data)
+    return entries, None
+
+async def stream_batch_results(entries: List[dict], user_id: str, archive_file=None):
+    """Classify entries chunk by chunk and yield one NDJSON line per image"""
+    start_time = datetime.now()
+    succeeded = 0
+    failed = 0
+    
+    try:
+        for chunk_start in range(0, len(entries), BATCH_CHUNK_SIZE):
+            chunk = entries[chunk_start:chunk_start + BATCH_CHUNK_SIZE]
+            
+            lines = [
+                {"index": entry["index"], "filename": entry["filename"], "error": entry["error"]}
+                for entry in chunk if "error" in entry
+            ]
+            valid = [entry for entry in chunk if "error" not in entry]
+            if valid:
+                lines.extend(await classify_tenun_chunk(valid))
+            
+            for line in sorted(lines, key=lambda item: item["index"]):
+                if "error" in line:
+                    failed += 1
+                else:
+                    succeeded += 1
+                yield json.dumps(line) + "\n"
+    finally:
+        if archive_file is not None:
+            archive_file.close()
+    
+    processing_time = (datetime.now() - start_time).total_seconds()
+    logger.info(f"Batch classification for user {user_id}: {succeeded} ok, {failed} failed in {processing_time:.2f}s")
+    yield json.dumps({
+        "summary": {
+            "total": len(entries),
+            "succeeded": succeeded,
+            "failed": failed,
+            "processing_time": processing_time
+        }
+    }) + "\n"
+
 def validate_user(db: Session, user_id: str) -> User:
     """Validate user exists"""
     user = db.query(User).filter(User.user_id == user_id).first()
@@ -275,16 +801,137 @@ def validate_user(db: Session, user_id: str) -> User:
         raise HTTPException(status_code=404, detail="Pengguna tidak ditemukan")
     return user
 
-# Initialize model on startup
+async def load_model_version(version: Optional[str] = None) -> dict:
+    """Resolve and load a model version off the event loop (may import TensorFlow)"""
+    source = await asyncio.to_thread(resolve_model_source, version)
+    start_time = datetime.now()
+    bundle = await asyncio.to_thread(load_model_bundle, source)
+    logger.info(f"Model {bundle['version']} loaded and warmed up in {(datetime.now() - start_time).total_seconds():.2f}s")
+    return bundle
+
+async def stop_model_bundle(bundle: Optional[dict]):
+    """Let a retired model finish its queued requests, then stop its inference thread"""
+    if bundle is not None and bundle["batcher"] is not None:
+        await asyncio.to_thread(bundle["batcher"].stop)
+
+async def ensure_classifier_ready():
+    """Load the classifier on first use so workers that never classify boot without it"""
+    global model_load_error
+    
+    if model is not None and batcher is not None:
+        return
+    
+    async with model_load_lock:
+        if model is not None and batcher is not None:
+            return
+        
+        try:
+            activate_model_bundle(await load_model_version())
+        except Exception as e:
+            logger.error(f"Error loading model: {e}")
+            model_load_error = str(e)
+            raise HTTPException(status_code=500, detail="Model belum dimuat")
+        
+        if CLASSIFIER_SHADOW_VERSION and shadow_model is None:
+            try:
+                await start_shadow(CLASSIFIER_SHADOW_VERSION, CLASSIFIER_SHADOW_SAMPLE_RATE)
+            except Exception as e:
+                logger.error(f"Error loading shadow model {CLASSIFIER_SHADOW_VERSION}: {e}")
+
+async def reload_model(version: Optional[str] = None, force: bool = False, activate: bool = False) -> dict:
+    """Load a model version next to the live one, then swap it in without dropping requests
+    
+    With `activate` the registry's ACTIVE pointer is moved to the version once
+    it is serving, so a failed load never promotes it to the other workers.
+    """
+    async with model_load_lock:
+        previous_version = model_metadata.get("version") if model is not None and model_metadata else None
+        target = version or (model_registry.active_version() if model_registry.versions() else None)
+        if not force and previous_version is not None and target == previous_version:
+            if activate and version:
+                model_registry.set_active(version)
+            return {"reloaded": False, "version": previous_version}
+        
+        bundle = await load_model_version(version)
+        retired = {"batcher": batcher} if batcher is not None else None
+        activate_model_bundle(bundle)
+        # Still under the load lock, so the ACTIVE watcher cannot switch back in between
+        if activate and version:
+            model_registry.set_active(bundle["version"])
+        await stop_model_bundle(retired)
+        
+        logger.info(f"Classifier switched from model {previous_version} to {bundle['version']}")
+        return {"reloaded": True, "version": bundle["version"], "previous_version": previous_version}
+
+async def start_shadow(version: str, sample_rate: float) -> dict:
+    """Load a candidate version and mirror a sample of traffic to it"""
+    global shadow_model, shadow_stats
+    
+    bundle = await load_model_version(version)
+    retired = shadow_model
+    shadow_model, shadow_stats = bundle, ShadowStats(bundle["version"], sample_rate)
+    await stop_model_bundle(retired)
+    logger.info(f"Shadow model {bundle['version']} receiving {shadow_stats.sample_rate:.0%} of traffic")
+    return shadow_stats.get_metrics()
+
+async def stop_shadow() -> Optional[dict]:
+    """Stop shadow mode and return its final comparison"""
+    global shadow_model, shadow_stats
+    
+    retired, stats = shadow_model, shadow_stats
+    shadow_model, shadow_stats = None, None
+    await stop_model_bundle(retired)
+    return stats.get_metrics() if stats is not None else None
+
+async def watch_active_model():
+    """Follow the registry's ACTIVE pointer so every worker picks up a promoted version"""
+    failed_version = None
+    while True:
+        await asyncio.sleep(MODEL_RELOAD_POLL_SECONDS)
+        target = None
+        # Workers that never loaded the model will load the active version lazily anyway
+        if model is None:
+            continue
+        try:
+            target = await asyncio.to_thread(model_registry.active_version)
+            if target is None or target == model_metadata.get("version") or target == failed_version:
+                continue
+            await reload_model(target)
+            failed_version = None
+        except Exception as e:
+            failed_version = target
+            logger.error(f"Hot reload to model {target} failed, keeping {model_metadata.get('version')}: {e}")
+
+# Initialize model on startup (only when CLASSIFIER_PRELOAD=1)
 @classifier_router.on_event("startup")
 async def load_model_on_startup():
     """Load model when the router starts"""
-    success = load_tenun_model()
-    if success:
+    global reload_watcher
+    
+    if MODEL_RELOAD_POLL_SECONDS > 0:
+        reload_watcher = asyncio.create_task(watch_active_model())
+    
+    if not CLASSIFIER_PRELOAD:
+        logger.info("Tenun classifier will be loaded on first request")
+        return
+    
+    try:
+        await ensure_classifier_ready()
         logger.info("Tenun classifier model loaded successfully on startup")
-    else:
+    except HTTPException:
         logger.error("Failed to load tenun classifier model on startup")
 
+@classifier_router.on_event("shutdown")
+async def stop_batcher_on_shutdown():
+    """Stop the inference threads when the router shuts down"""
+    if reload_watcher is not None:
+        reload_watcher.cancel()
+    await stop_shadow()
+    if batcher is not None:
+        batcher.stop()
+    preprocess_pool.shutdown()
+    await asyncio.to_thread(prediction_cache.flush)
+
 # API Endpoints
 @classifier_router.post("/classify-tenun", response_model=ClassificationResponse)
 async def classify_tenun(
@@ -304,24 +951,11 @@ async def classify_tenun(
         # Read image data
         image_data = await file.read()
         
-        # Get image info
-        image_info = get_image_info(image_data)
-        
         # Classify image
-        classification_result = classify_tenun_image(image_data, user_id)
+        classification_result = await classify_tenun_image(image_data, user_id)
         
         # Prepare response
-        response = ClassificationResponse(
-            prediction=classification_result["prediction"],
-            confidence=classification_result["confidence"],
-            is_uncertain=classification_result["is_uncertain"],
-            processing_time=classification_result["processing_time"],
-            motif_analysis=classification_result["motif_analysis"],
-            probabilities=classification_result["probabilities"],
-            recommendation=classification_result["recommendation"],
-            image_info=image_info,
-            timestamp=datetime.now().isoformat()
-        )
+        response = build_classification_response(classification_result)
         
         logger.info(f"Classification completed for user {user_id}: {classification_result['prediction']} ({classification_result['confidence']:.1f}%)")
         
@@ -333,6 +967,136 @@ async def classify_tenun(
         logger.error(f"Classification endpoint error: {e}")
         raise HTTPException(status_code=500, detail=f"Gagal melakukan klasifikasi: {str(e)}")
 
+@classifier_router.post("/classify-tenun/batch")
+async def classify_tenun_batch(
+    user_id: str = Form(...),
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db)
+):
+    """Klasifikasi banyak gambar sekaligus (multipart atau satu arsip ZIP), hasil dikirim bertahap sebagai NDJSON"""
+    # Validate user once for the whole batch
+    validate_user(db, user_id)
+    
+    await ensure_classifier_ready()
+    
+    entries, archive_file = await collect_batch_entries(files)
+    if not entries or len(entries) > MAX_BATCH_ITEMS:
+        if archive_file is not None:
+            archive_file.close()
+        if not entries:
+            raise HTTPException(status_code=400, detail="Tidak ada gambar yang dapat diproses")
+        raise HTTPException(status_code=400, detail=f"Terlalu banyak gambar. Maksimal {MAX_BATCH_ITEMS} per batch")
+    
+    return StreamingResponse(stream_batch_results(entries, user_id, archive_file), media_type="application/x-ndjson")
+
+@classifier_router.post("/classify-tenun/embedding")
+async def get_tenun_embedding(
+    user_id: str = Form(...),
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    """Vektor fitur MobileNetV2 (sebelum classification head) dari gambar tenun"""
+    validate_user(db, user_id)
+    validate_image(file)
+    
+    await ensure_classifier_ready()
+    if not getattr(model, "supports_embeddings", False):
+        raise HTTPException(status_code=503, detail="Embedding tidak aktif. Set CLASSIFIER_EMBEDDINGS=1")
+    
+    image_data = await file.read()
+    try:
+        img_array, _, _ = await preprocess_pool.run(preprocess_image, image_data)
+        _, embeddings = split_model_outputs(await batcher.submit(img_array))
+        similar_products = (await similar_products_for(embeddings, 1))[0]
+    except (BatchQueueFull, WorkQueueFull) as e:
+        logger.warning(f"Embedding rejected, server busy: {e}")
+        raise server_busy_error()
+    
+    return {
+        "embedding": embeddings[0].astype(float).tolist(),
+        "dimension": int(embeddings.shape[1]),
+        "model_version": get_model_version(),
+        "similar_products": similar_products
+    }
+
+@classifier_router.post("/classify-tenun/warmup")
+async def warmup_classifier():
+    """Muat model dan jalankan satu forward pass agar request pertama tidak menanggung cold start"""
+    start_time = datetime.now()
+    await ensure_classifier_ready()
+    
+    try:
+        await batcher.submit(np.zeros((1, *IMG_SIZE, 3), np.float32))
+    except BatchQueueFull:
+        raise server_busy_error()
+    
+    return {
+        "model_loaded": True,
+        "backend": model.name,
+        "model_version": get_model_version(),
+        "warmup_time": (datetime.now() - start_time).total_seconds()
+    }
+
+@classifier_router.get("/classify-tenun/metrics")
+async def get_classifier_metrics():
+    """Metrik antrian dan batching inferensi classifier"""
+    return {
+        "backend": model.name if model is not None else CLASSIFIER_BACKEND,
+        "model_variant": CLASSIFIER_MODEL_VARIANT or None,
+        "model_version": get_model_version() if model is not None else None,
+        "batching": batcher.get_metrics() if batcher is not None else None,
+        "shadow": shadow_stats.get_metrics() if shadow_stats is not None else None,
+        "preprocessing": preprocess_pool.get_metrics(),
+        "prediction_cache": prediction_cache.get_metrics(),
+        "near_duplicates": near_duplicate_index.get_metrics(),
+        "similarity_index_size": len(similarity_index) if similarity_index is not None else 0,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@classifier_router.get("/classify-tenun/models", dependencies=[Depends(require_admin_token)])
+async def list_model_versions():
+    """Versi model di registry, versi aktif dan versi yang sedang dilayani worker ini"""
+    return {
+        "registry_dir": MODEL_REGISTRY_DIR,
+        "versions": model_registry.versions(),
+        "active_version": model_registry.active_version(),
+        "loaded_version": model_metadata.get("version") if model is not None and model_metadata else None,
+        "shadow": shadow_stats.get_metrics() if shadow_stats is not None else None,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@classifier_router.post("/classify-tenun/models/reload", dependencies=[Depends(require_admin_token)])
+async def reload_model_version(request: ModelReloadRequest):
+    """Muat versi model baru di background, warm-up, lalu ganti model aktif tanpa memutus request"""
+    try:
+        result = await reload_model(request.version, force=request.force, activate=request.activate)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Model reload failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Gagal memuat model: {str(e)}")
+    
+    return {**result, "model_version": get_model_version(), "timestamp": datetime.now().isoformat()}
+
+@classifier_router.post("/classify-tenun/models/shadow", dependencies=[Depends(require_admin_token)])
+async def enable_shadow_mode(request: ShadowModeRequest):
+    """Jalankan model kandidat pada sampel trafik dan catat kesesuaian serta latensinya"""
+    await ensure_classifier_ready()
+    try:
+        return await start_shadow(request.version, request.sample_rate)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except Exception as e:
+        logger.error(f"Shadow model load failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Gagal memuat model kandidat: {str(e)}")
+
+@classifier_router.delete("/classify-tenun/models/shadow", dependencies=[Depends(require_admin_token)])
+async def disable_shadow_mode():
+    """Hentikan shadow mode dan kembalikan hasil perbandingan terakhir"""
+    return {"shadow": await stop_shadow()}
+
 @classifier_router.get("/model-info")
 async def get_model_info():
     """Dapatkan informasi tentang model klasifikasi"""
@@ -373,11 +1137,15 @@ async def health_check():
         model_info = {
             "classes": model_metadata.get("class_names", []),
             "input_shape": model_metadata.get("input_shape"),
+            "backend": model.name if model is not None else CLASSIFIER_BACKEND,
+            "model_variant": CLASSIFIER_MODEL_VARIANT or None,
+            "model_version": get_model_version(),
             "confidence_threshold": CONFIDENCE_THRESHOLD
         }
     
+    # Not loaded yet is fine with lazy loading, a failed load is not
     return HealthCheckResponse(
-        status="healthy" if model is not None else "unhealthy",
+        status="unhealthy" if model_load_error else "healthy",
         model_loaded=model is not None,
         model_info=model_info,
         tensorflow_available=TF_AVAILABLE,
@@ -411,6 +1179,26 @@ def read_root():
                 "method": "POST",
                 "description": "Klasifikasi motif dari gambar tenun"
             },
+            {
+                "path": "/classify-tenun/batch",
+                "method": "POST",
+                "description": "Klasifikasi banyak gambar (multipart atau ZIP), hasil NDJSON"
+            },
+            {
+                "path": "/classify-tenun/embedding",
+                "method": "POST",
+                "description": "Vektor fitur gambar dan produk yang mirip"
+            },
+            {
+                "path": "/classify-tenun/warmup",
+                "method": "POST",
+                "description": "Muat model dan jalankan satu inferensi pemanasan"
+            },
+            {
+                "path": "/classify-tenun/metrics",
+                "method": "GET",
+                "description": "Metrik antrian dan batching inferensi"
+            },
             {
                 "path": "/model-info",
                 "method": "GET",
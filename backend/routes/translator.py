@@ -1,10 +1,22 @@
-from typing import Optional
-from openai import OpenAI
-from fastapi import HTTPException, APIRouter, Depends
+import json
+import asyncio
+import hashlib
+from typing import List, Optional
+import anyio
+from fastapi import HTTPException, APIRouter, Depends, Request, UploadFile, File
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
-from database.config import get_db
-from models.tables import User
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from database.config import get_db, SessionLocal
+from services.openai_client import get_openai_client, openai_configured, call_with_retries
+from services.admin import require_admin_token
+from services.glossary import Glossary, GlossaryEntry
+from services.json_stream import JsonStringFieldExtractor
+from services.sentences import split_segments
+from services.sse import SSE_HEADERS, sse_event
+from services.translation_memory import TranslationMemory, context_hash, translation_key
+from models.tables import TranslationMemoryEntry, User
 import os
 import logging
 from datetime import datetime
@@ -15,19 +27,47 @@ logger = logging.getLogger(__name__)
 
 translator_router = APIRouter()
 
-# Initialize OpenAI client with error handling
-try:
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    if not os.getenv("OPENAI_API_KEY"):
-        logger.warning("OPENAI_API_KEY not found in environment variables")
-except Exception as e:
-    logger.error(f"Failed to initialize OpenAI client: {e}")
-    client = None
-
 # Constants
 SUPPORTED_LANGUAGES = ["id", "en"]
 MAX_TEXT_LENGTH = 5000
 MAX_TOKENS = 1000
+# Structured outputs (response_format json_schema) need gpt-4o, gpt-4o-mini or newer
+TRANSLATION_MODEL = os.getenv("TRANSLATION_MODEL", "gpt-4o")
+# Bump whenever the translation prompt changes, so earlier translations are no longer reused
+# (the model name is part of the stored version too)
+TRANSLATION_PROMPT_VERSION = "v2"
+
+# Longer texts are split into segments of whole sentences, translated concurrently
+TRANSLATION_SEGMENT_MAX_CHARS = int(os.getenv("TRANSLATION_SEGMENT_MAX_CHARS", "800"))
+TRANSLATION_PARALLELISM = int(os.getenv("TRANSLATION_PARALLELISM", "4"))  # segment translations in flight per request
+
+# /translate/batch: short items are packed into one model call with a JSON array response
+BATCH_MAX_ITEMS = int(os.getenv("TRANSLATION_BATCH_MAX_ITEMS", "100"))
+BATCH_PACK_ITEM_MAX_CHARS = int(os.getenv("TRANSLATION_BATCH_PACK_ITEM_MAX_CHARS", "300"))  # longer items get their own call
+BATCH_PACK_MAX_ITEMS = int(os.getenv("TRANSLATION_BATCH_PACK_MAX_ITEMS", "10"))
+BATCH_PACK_MAX_CHARS = int(os.getenv("TRANSLATION_BATCH_PACK_MAX_CHARS", "1200"))
+
+# Sumba glossary: exact terms are answered locally, known terms in longer texts become prompt hints
+GLOSSARY_PATH = os.getenv("GLOSSARY_PATH", "data/glossary.json")
+GLOSSARY_RELOAD_POLL_SECONDS = float(os.getenv("GLOSSARY_RELOAD_POLL_SECONDS", "30"))  # picks up files uploaded via other workers
+GLOSSARY_MAX_HINTS = int(os.getenv("GLOSSARY_MAX_HINTS", "20"))
+GLOSSARY_MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+
+TRANSLATION_MEMORY_MAX_ENTRIES = int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", "10000"))
+TRANSLATION_MEMORY_DB_URL = os.getenv("TRANSLATION_MEMORY_DB_URL", "")  # empty = application database, e.g. sqlite:///cache/translations.db
+
+
+def create_translation_memory() -> TranslationMemory:
+    session_factory = SessionLocal
+    if TRANSLATION_MEMORY_DB_URL:
+        memory_engine = create_engine(TRANSLATION_MEMORY_DB_URL)
+        TranslationMemoryEntry.__table__.create(bind=memory_engine, checkfirst=True)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=memory_engine)
+    return TranslationMemory(session_factory, max_entries=TRANSLATION_MEMORY_MAX_ENTRIES)
+
+
+translation_memory = create_translation_memory()
+glossary = Glossary(GLOSSARY_PATH, SUPPORTED_LANGUAGES, poll_seconds=GLOSSARY_RELOAD_POLL_SECONDS)
 
 # Pydantic Models
 class TranslateRequest(BaseModel):
@@ -47,6 +87,23 @@ class TranslateRequest(BaseModel):
             if not self.sumba_text:
                 raise ValueError('Teks tidak boleh kosong')
 
+class BatchTranslateItem(BaseModel):
+    text: str = Field(..., min_length=1, max_length=MAX_TEXT_LENGTH, description="Teks bahasa Sumba yang akan diterjemahkan")
+    target_language: str = Field(..., description="Bahasa tujuan (id untuk Bahasa Indonesia, en untuk English)")
+    context: Optional[str] = Field(None, max_length=500, description="Konteks tambahan untuk membantu terjemahan")
+
+    def model_post_init(self, __context):
+        if self.target_language not in SUPPORTED_LANGUAGES:
+            raise ValueError(f"Bahasa tujuan tidak valid. Harus salah satu dari: {', '.join(SUPPORTED_LANGUAGES)}")
+
+        self.text = self.text.strip()
+        if not self.text:
+            raise ValueError('Teks tidak boleh kosong')
+
+class BatchTranslateRequest(BaseModel):
+    user_id: str = Field(..., min_length=1, max_length=8, description="User ID")
+    items: List[BatchTranslateItem] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+
 class TranslateResponse(BaseModel):
     original_text: str
     translated_text: str
@@ -55,6 +112,9 @@ class TranslateResponse(BaseModel):
     confidence_score: Optional[float] = None
     cultural_notes: Optional[str] = None
     processing_time: float
+    cached: bool = False
+    glossary: bool = False
+    segments: int = 1
 
 # Localized error messages
 MESSAGES = {
@@ -80,8 +140,10 @@ def get_messages(language: str = "id") -> dict:
 
 def validate_openai_client():
     """Validate OpenAI client is available"""
+    client = get_openai_client()
     if client is None:
         raise HTTPException(status_code=500, detail="OpenAI client is not properly configured")
+    return client
 
 def validate_user(db: Session, user_id: str) -> User:
     """Validate user exists"""
@@ -90,23 +152,76 @@ def validate_user(db: Session, user_id: str) -> User:
         raise HTTPException(status_code=404, detail=get_messages()["user_not_found"])
     return user
 
-def translate_sumba_text(sumba_text: str, target_language: str, context: Optional[str] = None) -> dict:
-    """Translate Sumba text to target language using OpenAI"""
-    validate_openai_client()
-    
-    try:
-        start_time = datetime.now()
-        
-        # Language mapping
-        language_names = {
-            "id": "Bahasa Indonesia",
-            "en": "English"
+LANGUAGE_NAMES = {
+    "id": "Bahasa Indonesia",
+    "en": "English"
+}
+
+TRANSLATION_RESPONSE_FORMAT = """{
+    "translated_text": "terjemahan lengkap yang natural dan akurat",
+    "cultural_notes": "penjelasan budaya jika diperlukan, atau null jika tidak ada",
+    "confidence_score": angka_kepercayaan_0_sampai_1
+}"""
+
+BATCH_RESPONSE_FORMAT = """{
+    "translations": [
+        {
+            "id": nomor_teks,
+            "translated_text": "terjemahan lengkap yang natural dan akurat",
+            "cultural_notes": "penjelasan budaya jika diperlukan, atau null jika tidak ada",
+            "confidence_score": angka_kepercayaan_0_sampai_1
         }
-        
-        target_lang_name = language_names.get(target_language, "Bahasa Indonesia")
-        
-        # Create system prompt for translation
-        system_prompt = f"""Kamu adalah seorang ahli bahasa dan budaya Sumba yang sangat berpengalaman dalam menerjemahkan teks bahasa Sumba ke {target_lang_name}.
+    ]
+}"""
+
+TRANSLATION_FIELDS = {
+    "translated_text": {"type": "string"},
+    "cultural_notes": {"type": ["string", "null"]},
+    "confidence_score": {"type": "number"},
+}
+
+# The model's reply is guaranteed to parse and match these schemas
+TRANSLATION_SCHEMA = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "sumba_translation",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": TRANSLATION_FIELDS,
+            "required": list(TRANSLATION_FIELDS),
+            "additionalProperties": False,
+        },
+    },
+}
+
+BATCH_TRANSLATION_SCHEMA = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "sumba_translation_batch",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "translations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"id": {"type": "integer"}, **TRANSLATION_FIELDS},
+                        "required": ["id", *TRANSLATION_FIELDS],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["translations"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+def build_system_prompt(target_lang_name: str, response_format: str) -> str:
+    """System prompt for translating Sumba text, with the JSON format the reply must follow"""
+    return f"""Kamu adalah seorang ahli bahasa dan budaya Sumba yang sangat berpengalaman dalam menerjemahkan teks bahasa Sumba ke {target_lang_name}.
 
 TUGAS UTAMA:
 1. Terjemahkan teks bahasa Sumba yang diberikan ke {target_lang_name} dengan akurat
@@ -122,60 +237,540 @@ PANDUAN TERJEMAHAN:
 - Jika ada ungkapan atau peribahasa, cari padanan yang sesuai atau jelaskan maknanya
 
 FORMAT RESPONS (wajib dalam JSON):
-{{
-    "translated_text": "terjemahan lengkap yang natural dan akurat",
-    "cultural_notes": "penjelasan budaya jika diperlukan, atau null jika tidak ada",
-    "confidence_score": angka_kepercayaan_0_sampai_1
-}}"""
+{response_format}"""
 
-        user_prompt = f"""Teks bahasa Sumba yang perlu diterjemahkan:
+def load_glossary():
+    """(Re)build the glossary index from GLOSSARY_PATH; a broken file keeps the previous index"""
+    try:
+        glossary.load()
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not load glossary from {GLOSSARY_PATH}: {e}")
+
+def refresh_glossary():
+    if glossary.is_stale():
+        load_glossary()
+
+def glossary_answer(text: str, target_language: str) -> Optional[dict]:
+    """Translation straight from the glossary when `text` is exactly one known term"""
+    refresh_glossary()
+    entry = glossary.index.lookup(text)
+    if entry is None or target_language not in entry.translations:
+        return None
+    glossary.record(local_answer=True)
+    return {
+        "translated_text": entry.translations[target_language],
+        "cultural_notes": entry.note,
+        "confidence_score": 1.0,
+        "cached": False,
+        "glossary": True,
+    }
+
+def glossary_hints(text: str, target_language: str) -> List[GlossaryEntry]:
+    found = glossary.index.find_terms(text)
+    return [entry for entry in found if target_language in entry.translations][:GLOSSARY_MAX_HINTS]
+
+def hint_signature(hints: List[GlossaryEntry], target_language: str) -> tuple:
+    """The glossary lines a prompt would carry for `hints`, comparable between texts"""
+    return tuple((entry.term, entry.translations[target_language]) for entry in hints)
+
+def format_hints(hints: List[GlossaryEntry], target_language: str) -> str:
+    if not hints:
+        return ""
+    lines = "\n".join(f"- {entry.term} = {entry.translations[target_language]}" for entry in hints)
+    return f"Glosarium istilah Sumba (gunakan padanan ini):\n{lines}"
+
+def translation_plan(text: str, target_language: str, context: Optional[str]) -> tuple:
+    """(memory key, prompt version, glossary hints) for one text
+
+    Texts translated with glossary hints are remembered under a prompt
+    version that includes the glossary version, so a new glossary is not
+    shadowed by translations made without (or with older) hints.
+    """
+    hints = glossary_hints(text, target_language)
+    prompt_version = f"{TRANSLATION_PROMPT_VERSION}:{TRANSLATION_MODEL}"
+    if hints:
+        prompt_version += "+g" + hashlib.sha256(glossary.index.version.encode("utf-8")).hexdigest()[:8]
+    return translation_key(text, target_language, context, prompt_version), prompt_version, hints
+
+async def recall_translation(key: str) -> Optional[dict]:
+    """Earlier translation for `key`: in-process memory first, then the translation memory table"""
+    result = translation_memory.get(key)
+    if result is None:
+        result = (await asyncio.to_thread(translation_memory.load, [key])).get(key)
+    return result
+
+def clean_translation(entry) -> dict:
+    """Translation fields of one parsed reply; ValueError when there is no translated_text"""
+    if not isinstance(entry, dict) or not isinstance(entry.get("translated_text"), str) or not entry["translated_text"].strip():
+        raise ValueError("Reply has no translated_text")
+
+    notes = entry.get("cultural_notes")
+    score = entry.get("confidence_score")
+    return {
+        "translated_text": entry["translated_text"].strip(),
+        "cultural_notes": notes.strip() if isinstance(notes, str) and notes.strip() else None,
+        "confidence_score": min(max(float(score), 0.0), 1.0) if isinstance(score, (int, float)) and not isinstance(score, bool) else None,
+    }
+
+def parse_translation(content: Optional[str]) -> dict:
+    if not content:
+        raise ValueError("Empty reply from model")
+    return clean_translation(json.loads(content))
+
+def translation_messages(sumba_text: str, target_language: str, context: Optional[str], hints: List[GlossaryEntry]) -> list:
+    target_lang_name = LANGUAGE_NAMES.get(target_language, "Bahasa Indonesia")
+    system_prompt = build_system_prompt(target_lang_name, TRANSLATION_RESPONSE_FORMAT)
+
+    notes = "\n\n".join(filter(None, [f'Konteks tambahan: {context}' if context else '', format_hints(hints, target_language)]))
+    user_prompt = f"""Teks bahasa Sumba yang perlu diterjemahkan:
 "{sumba_text}"
 
-{f'Konteks tambahan: {context}' if context else ''}
+{notes}
 
 Mohon terjemahkan ke {target_lang_name} dengan mempertahankan makna budaya dan spiritual yang ada."""
 
-        # Call OpenAI API
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+async def known_translation(sumba_text: str, target_language: str, context: Optional[str]) -> tuple:
+    """(result, memory key, prompt version, glossary hints); result is None unless the glossary or translation memory has it"""
+    local = glossary_answer(sumba_text, target_language)
+    if local is not None:
+        return local, None, None, []
+
+    key, prompt_version, hints = translation_plan(sumba_text, target_language, context)
+    remembered = await recall_translation(key)
+    if remembered is not None:
+        return {**remembered, "cached": True}, key, prompt_version, hints
+
+    if hints:
+        glossary.record(hinted=True)
+    return None, key, prompt_version, hints
+
+async def remember_translation(key: str, sumba_text: str, target_language: str, context: Optional[str],
+                               prompt_version: str, result: dict):
+    await asyncio.to_thread(
+        translation_memory.store, key, sumba_text, target_language, context, prompt_version, result
+    )
+
+async def translate_segment(sumba_text: str, target_language: str, context: Optional[str] = None) -> dict:
+    """Translate one piece of Sumba text using OpenAI, reusing the glossary and translation memory when possible"""
+    start_time = datetime.now()
+    known, key, prompt_version, hints = await known_translation(sumba_text, target_language, context)
+    if known is not None:
+        return {**known, "processing_time": (datetime.now() - start_time).total_seconds()}
+
+    client = validate_openai_client()
+    
+    try:
+        response = await call_with_retries(
+            client.chat.completions.create,
+            model=TRANSLATION_MODEL,
+            messages=translation_messages(sumba_text, target_language, context, hints),
             max_tokens=MAX_TOKENS,
             temperature=0.3,  # Lower temperature for more consistent translations
+            response_format=TRANSLATION_SCHEMA,
         )
 
-        result_text = response.choices[0].message.content.strip()
-        
-        # Try to parse JSON response
-        try:
-            import json
-            result = json.loads(result_text)
-            translated_text = result.get("translated_text", result_text)
-            cultural_notes = result.get("cultural_notes")
-            confidence_score = result.get("confidence_score")
-        except json.JSONDecodeError:
-            # If not JSON, use the whole response as translated text
-            translated_text = result_text
-            cultural_notes = None
-            confidence_score = None
-        
-        processing_time = (datetime.now() - start_time).total_seconds()
-        
-        logger.info(f"Translation completed in {processing_time:.2f}s for {len(sumba_text)} characters")
-        
-        return {
-            "translated_text": translated_text,
-            "cultural_notes": cultural_notes,
-            "confidence_score": confidence_score,
-            "processing_time": processing_time
-        }
+        message = response.choices[0].message
+        if getattr(message, "refusal", None):
+            raise ValueError(f"Model refused to translate: {message.refusal}")
+        result = parse_translation(message.content)
         
     except Exception as e:
         logger.error(f"Translation error: {e}")
         raise HTTPException(status_code=500, detail=get_messages()["translation_error"].format(error_detail=str(e)))
 
+    await remember_translation(key, sumba_text, target_language, context, prompt_version, result)
+    
+    processing_time = (datetime.now() - start_time).total_seconds()
+    logger.info(f"Translation completed in {processing_time:.2f}s for {len(sumba_text)} characters")
+    
+    return {
+        **result,
+        "processing_time": processing_time,
+        "cached": False
+    }
+
+def merge_translations(segments: list, results: list) -> dict:
+    """Reassemble segment translations: layout kept, notes de-duplicated, confidence weighted by segment length"""
+    translated_text = "".join(
+        result["translated_text"].strip() + separator
+        for (_, separator), result in zip(segments, results)
+    )
+
+    cultural_notes = []
+    for result in results:
+        note = (result.get("cultural_notes") or "").strip()
+        if note and note not in cultural_notes:
+            cultural_notes.append(note)
+
+    weighted, total_weight = 0.0, 0
+    for (segment, _), result in zip(segments, results):
+        score = result.get("confidence_score")
+        if isinstance(score, (int, float)) and not isinstance(score, bool):
+            weighted += score * len(segment)
+            total_weight += len(segment)
+
+    return {
+        "translated_text": translated_text,
+        "cultural_notes": "\n".join(cultural_notes) or None,
+        "confidence_score": round(weighted / total_weight, 3) if total_weight else None,
+        "cached": all(result["cached"] for result in results),
+        "glossary": all(result.get("glossary", False) for result in results),
+        "segments": len(segments),
+    }
+
+def start_segment_translations(segments: list, target_language: str, context: Optional[str]) -> List[asyncio.Task]:
+    """One task per segment, at most TRANSLATION_PARALLELISM of them translating at a time"""
+    semaphore = asyncio.Semaphore(TRANSLATION_PARALLELISM)
+
+    async def translate_bounded(segment: str) -> dict:
+        async with semaphore:
+            return await translate_segment(segment, target_language, context)
+
+    return [asyncio.create_task(translate_bounded(segment)) for segment, _ in segments]
+
+async def translate_sumba_text(sumba_text: str, target_language: str, context: Optional[str] = None) -> dict:
+    """Translate Sumba text; long texts are split into segments that are translated concurrently
+
+    Every segment is looked up in the translation memory on its own, so an
+    edited document only pays for the sentences that changed, and latency
+    is close to that of the slowest segment instead of one long generation.
+    """
+    segments = split_segments(sumba_text, TRANSLATION_SEGMENT_MAX_CHARS)
+    if len(segments) <= 1:
+        result = await translate_segment(sumba_text, target_language, context)
+        return {**result, "segments": 1}
+
+    start_time = datetime.now()
+    tasks = start_segment_translations(segments, target_language, context)
+    try:
+        results = await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()  # one failed segment fails the request, stop the rest
+
+    merged = merge_translations(segments, results)
+    merged["processing_time"] = (datetime.now() - start_time).total_seconds()
+    logger.info(f"Translated {len(segments)} segments in {merged['processing_time']:.2f}s for {len(sumba_text)} characters")
+    return merged
+
+async def translate_packed(texts: List[str], target_language: str, context: Optional[str] = None,
+                           hints: Optional[List[GlossaryEntry]] = None) -> List[Optional[dict]]:
+    """Translate several short texts in one model call; None for texts the reply left out or garbled"""
+    client = validate_openai_client()
+    target_lang_name = LANGUAGE_NAMES.get(target_language, "Bahasa Indonesia")
+    numbered = "\n".join(f"{index}. {json.dumps(text, ensure_ascii=False)}" for index, text in enumerate(texts))
+    notes = "\n\n".join(filter(None, [f'Konteks tambahan: {context}' if context else '', format_hints(hints or [], target_language)]))
+
+    user_prompt = f"""Teks-teks bahasa Sumba berikut diterjemahkan masing-masing secara terpisah:
+{numbered}
+
+{notes}
+
+Mohon terjemahkan setiap teks ke {target_lang_name} dengan mempertahankan makna budaya dan spiritual yang ada.
+Kembalikan tepat {len(texts)} terjemahan dalam "translations", dengan "id" sesuai nomor teks."""
+
+    try:
+        response = await call_with_retries(
+            client.chat.completions.create,
+            model=TRANSLATION_MODEL,
+            messages=[
+                {"role": "system", "content": build_system_prompt(target_lang_name, BATCH_RESPONSE_FORMAT)},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_tokens=MAX_TOKENS * 2,
+            temperature=0.3,
+            response_format=BATCH_TRANSLATION_SCHEMA,
+        )
+    except Exception as e:
+        logger.error(f"Batch translation error: {e}")
+        raise HTTPException(status_code=500, detail=get_messages()["translation_error"].format(error_detail=str(e)))
+
+    results = [None] * len(texts)
+    message = response.choices[0].message
+    if getattr(message, "refusal", None) or message.content is None:
+        logger.warning(
+            f"Batch translation got no content (refusal: {getattr(message, 'refusal', None)}), "
+            f"translating {len(texts)} items one by one"
+        )
+        return results
+    try:
+        translations = json.loads(message.content.strip())["translations"]
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Unusable batch translation reply, translating {len(texts)} items one by one: {e}")
+        return results
+
+    for entry in translations if isinstance(translations, list) else []:
+        index = entry.get("id") if isinstance(entry, dict) else None
+        if not isinstance(index, int) or not 0 <= index < len(texts):
+            continue
+        try:
+            results[index] = clean_translation(entry)
+        except ValueError:
+            pass  # retried on its own
+    return results
+
+def plan_batch(keys: List[str], items: dict) -> List[List[str]]:
+    """Group item keys into model calls
+
+    Short items are packed together when they share language, context and
+    glossary hints, so the packed prompt carries exactly the hints each
+    item's prompt version (and memory key) stands for.
+    """
+    calls = []
+    packs = {}
+    for key in keys:
+        item = items[key]
+        if len(item.text) > BATCH_PACK_ITEM_MAX_CHARS:
+            calls.append([key])
+            continue
+
+        hints = glossary_hints(item.text, item.target_language)
+        group = (item.target_language, context_hash(item.context), hint_signature(hints, item.target_language))
+        pack = packs.get(group)
+        pack_chars = sum(len(items[packed].text) for packed in pack) if pack else 0
+        if pack is None or len(pack) >= BATCH_PACK_MAX_ITEMS or pack_chars + len(item.text) > BATCH_PACK_MAX_CHARS:
+            pack = packs[group] = []
+            calls.append(pack)
+        pack.append(key)
+    return calls
+
+async def translate_batch_item(key: str, item: BatchTranslateItem, semaphore: asyncio.Semaphore) -> list:
+    async with semaphore:
+        try:
+            return [(key, await translate_sumba_text(item.text, item.target_language, item.context), None)]
+        except HTTPException as e:
+            return [(key, None, e.detail)]
+
+async def translate_batch_pack(keys: List[str], items: dict, semaphore: asyncio.Semaphore) -> list:
+    """(key, result, error) for every item of one packed call; items the reply missed are retried one by one"""
+    if len(keys) == 1:
+        return await translate_batch_item(keys[0], items[keys[0]], semaphore)
+
+    first = items[keys[0]]
+    plans = {key: translation_plan(items[key].text, items[key].target_language, items[key].context) for key in keys}
+    hints = plans[keys[0]][2]
+    signature = hint_signature(hints, first.target_language)
+    if any(hint_signature(plan[2], first.target_language) != signature for plan in plans.values()):
+        # The glossary was replaced after plan_batch grouped these items
+        outcomes = []
+        for translated in await asyncio.gather(*(translate_batch_item(key, items[key], semaphore) for key in keys)):
+            outcomes.extend(translated)
+        return outcomes
+    if hints:
+        glossary.record(hinted=True)
+
+    async with semaphore:
+        try:
+            results = await translate_packed(
+                [items[key].text for key in keys], first.target_language, first.context, hints
+            )
+        except HTTPException as e:
+            return [(key, None, e.detail) for key in keys]
+
+    translated = [(key, result) for key, result in zip(keys, results) if result is not None]
+
+    def remember():
+        for key, result in translated:
+            item = items[key]
+            translation_memory.store(key, item.text, item.target_language, item.context, plans[key][1], result)
+
+    await asyncio.to_thread(remember)
+
+    outcomes = [(key, {**result, "cached": False}, None) for key, result in translated]
+    leftovers = [key for key, result in zip(keys, results) if result is None]
+    for retried in await asyncio.gather(*(translate_batch_item(key, items[key], semaphore) for key in leftovers)):
+        outcomes.extend(retried)
+    return outcomes
+
+async def batch_translation_lines(items: dict, positions: dict, start_time: datetime):
+    """NDJSON lines: one per request item as soon as its translation is known, then a summary line"""
+    counts = {"glossary": 0, "cached": 0, "translated": 0, "failed": 0}
+
+    def item_lines(key: str, result: Optional[dict], error: Optional[str]):
+        item = items[key]
+        for index in positions[key]:
+            line = {"index": index, "original_text": item.text, "target_language": item.target_language}
+            if error is None:
+                line.update(
+                    translated_text=result["translated_text"],
+                    cultural_notes=result.get("cultural_notes"),
+                    confidence_score=result.get("confidence_score"),
+                    cached=result.get("cached", False),
+                    glossary=result.get("glossary", False),
+                )
+            else:
+                line["error"] = error
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    answered = set()
+    for key, item in items.items():
+        local = glossary_answer(item.text, item.target_language)
+        if local is not None:
+            answered.add(key)
+            counts["glossary"] += 1
+            for line in item_lines(key, local, None):
+                yield line
+
+    remembered = {}
+    for key in items:
+        result = translation_memory.get(key) if key not in answered else None
+        if result is not None:
+            remembered[key] = result
+    missing = [key for key in items if key not in remembered and key not in answered]
+    if missing:
+        remembered.update(await asyncio.to_thread(translation_memory.load, missing))
+
+    for key, result in remembered.items():
+        counts["cached"] += 1
+        for line in item_lines(key, {**result, "cached": True}, None):
+            yield line
+
+    semaphore = asyncio.Semaphore(TRANSLATION_PARALLELISM)
+    pending = [key for key in items if key not in remembered and key not in answered]
+    calls = plan_batch(pending, items)
+    tasks = [asyncio.create_task(translate_batch_pack(keys, items, semaphore)) for keys in calls]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            for key, result, error in await next_done:
+                if error is not None:
+                    counts["failed"] += 1
+                else:
+                    counts["glossary" if result.get("glossary") else "cached" if result.get("cached") else "translated"] += 1
+                for line in item_lines(key, result, error):
+                    yield line
+    finally:
+        for task in tasks:
+            task.cancel()  # client went away, stop translating
+
+    yield json.dumps({
+        "done": True,
+        "items": sum(len(indices) for indices in positions.values()),
+        "unique_items": len(items),
+        "model_calls": len(calls),
+        **counts,
+        "processing_time": (datetime.now() - start_time).total_seconds(),
+    }) + "\n"
+
+def translation_response(request: TranslateRequest, result: dict) -> TranslateResponse:
+    return TranslateResponse(
+        original_text=request.sumba_text,
+        translated_text=result["translated_text"],
+        target_language=request.target_language,
+        confidence_score=result["confidence_score"],
+        cultural_notes=result["cultural_notes"],
+        processing_time=result["processing_time"],
+        cached=result.get("cached", False),
+        glossary=result.get("glossary", False),
+        segments=result.get("segments", 1)
+    )
+
+async def open_translation_stream(sumba_text: str, target_language: str, context: Optional[str], hints: List[GlossaryEntry]):
+    """Streamed structured-output completion; opened before responding so setup errors stay plain HTTP errors"""
+    client = validate_openai_client()
+    try:
+        return await call_with_retries(
+            client.chat.completions.create,
+            model=TRANSLATION_MODEL,
+            messages=translation_messages(sumba_text, target_language, context, hints),
+            max_tokens=MAX_TOKENS,
+            temperature=0.3,
+            response_format=TRANSLATION_SCHEMA,
+            stream=True,
+        )
+    except Exception as e:
+        logger.error(f"Translation stream error: {e}")
+        raise HTTPException(status_code=500, detail=get_messages()["translation_error"].format(error_detail=str(e)))
+
+async def stream_model_translation(request: Request, body: TranslateRequest, stream, key: str, prompt_version: str,
+                                   start_time: datetime):
+    """Relay translated_text as it is generated, then send the complete, validated translation"""
+    first_text_time = None
+    extractor = JsonStringFieldExtractor("translated_text")
+    parts = []
+    completed = False
+
+    try:
+        yield sse_event({"target_language": body.target_language, "segments": 1}, event="start")
+
+        async for chunk in stream:
+            if await request.is_disconnected():
+                break
+
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            parts.append(delta)
+            text = extractor.feed(delta)
+            if text:
+                if first_text_time is None:
+                    first_text_time = (datetime.now() - start_time).total_seconds()
+                yield sse_event({"delta": text})
+        else:
+            completed = True
+
+        if completed:
+            result = parse_translation("".join(parts))
+            await remember_translation(key, body.sumba_text, body.target_language, body.context, prompt_version, result)
+            result["processing_time"] = (datetime.now() - start_time).total_seconds()
+            yield sse_event({
+                **translation_response(body, result).model_dump(),
+                "time_to_first_token": first_text_time,
+            }, event="done")
+
+    except Exception as e:
+        logger.error(f"Translation stream error: {e}")
+        yield sse_event({"detail": get_messages()["translation_error"].format(error_detail=str(e))}, event="error")
+
+    finally:
+        # Stop generating (and paying for) tokens nobody will read; shielded, since a
+        # client disconnect cancels this generator's scope
+        with anyio.CancelScope(shield=True):
+            await stream.close()
+
+async def stream_known_translation(body: TranslateRequest, result: dict):
+    """Glossary or translation memory hit: the whole text in one delta"""
+    yield sse_event({"target_language": body.target_language, "segments": 1}, event="start")
+    yield sse_event({"delta": result["translated_text"]})
+    yield sse_event({**translation_response(body, result).model_dump(), "time_to_first_token": 0.0}, event="done")
+
+async def stream_segment_translations(request: Request, body: TranslateRequest, segments: list):
+    """Long texts: segments are translated concurrently and sent in order as each one is ready"""
+    start_time = datetime.now()
+    first_text_time = None
+    tasks = start_segment_translations(segments, body.target_language, body.context)
+
+    try:
+        yield sse_event({"target_language": body.target_language, "segments": len(segments)}, event="start")
+
+        results = []
+        for task, (_, separator) in zip(tasks, segments):
+            result = await task
+            if await request.is_disconnected():
+                return
+            if first_text_time is None:
+                first_text_time = (datetime.now() - start_time).total_seconds()
+            results.append(result)
+            yield sse_event({"delta": result["translated_text"].strip() + separator})
+
+        merged = merge_translations(segments, results)
+        merged["processing_time"] = (datetime.now() - start_time).total_seconds()
+        yield sse_event({
+            **translation_response(body, merged).model_dump(),
+            "time_to_first_token": first_text_time,
+        }, event="done")
+
+    except HTTPException as e:
+        yield sse_event({"detail": e.detail}, event="error")
+
+    finally:
+        for task in tasks:
+            task.cancel()
+
 @translator_router.post("/translate", response_model=TranslateResponse)
 async def translate_text(request: TranslateRequest, db: Session = Depends(get_db)):
     """Terjemahkan teks bahasa Sumba ke Bahasa Indonesia atau English"""
@@ -191,20 +786,13 @@ async def translate_text(request: TranslateRequest, db: Session = Depends(get_db
             )
         
         # Perform translation
-        translation_result = translate_sumba_text(
+        translation_result = await translate_sumba_text(
             request.sumba_text, 
             request.target_language, 
             request.context
         )
         
-        return TranslateResponse(
-            original_text=request.sumba_text,
-            translated_text=translation_result["translated_text"],
-            target_language=request.target_language,
-            confidence_score=translation_result["confidence_score"],
-            cultural_notes=translation_result["cultural_notes"],
-            processing_time=translation_result["processing_time"]
-        )
+        return translation_response(request, translation_result)
         
     except HTTPException:
         raise
@@ -212,6 +800,74 @@ async def translate_text(request: TranslateRequest, db: Session = Depends(get_db
         logger.error(f"Translation endpoint error: {e}")
         raise HTTPException(status_code=500, detail=f"Translation failed: {str(e)}")
 
+@translator_router.post("/translate/stream")
+async def translate_text_stream(request: Request, body: TranslateRequest, db: Session = Depends(get_db)):
+    """Terjemahkan teks Sumba, hasil terjemahan dikirim bertahap sebagai Server-Sent Events"""
+    validate_user(db, body.user_id)
+    start_time = datetime.now()
+
+    segments = split_segments(body.sumba_text, TRANSLATION_SEGMENT_MAX_CHARS)
+    if len(segments) > 1:
+        events = stream_segment_translations(request, body, segments)
+    else:
+        known, key, prompt_version, hints = await known_translation(body.sumba_text, body.target_language, body.context)
+        if known is not None:
+            events = stream_known_translation(body, {**known, "processing_time": (datetime.now() - start_time).total_seconds()})
+        else:
+            stream = await open_translation_stream(body.sumba_text, body.target_language, body.context, hints)
+            events = stream_model_translation(request, body, stream, key, prompt_version, start_time)
+
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
+@translator_router.post("/translate/batch")
+async def translate_batch(request: BatchTranslateRequest, db: Session = Depends(get_db)):
+    """Terjemahkan banyak teks sekaligus; hasil per item dikirim sebagai NDJSON begitu selesai"""
+    validate_user(db, request.user_id)
+    start_time = datetime.now()
+    refresh_glossary()
+
+    # Identical items (same text, language, context) are translated once
+    items = {}
+    positions = {}
+    for index, item in enumerate(request.items):
+        key, _, _ = translation_plan(item.text, item.target_language, item.context)
+        items.setdefault(key, item)
+        positions.setdefault(key, []).append(index)
+
+    return StreamingResponse(
+        batch_translation_lines(items, positions, start_time),
+        media_type="application/x-ndjson",
+    )
+
+@translator_router.get("/translate/metrics")
+async def translation_memory_metrics():
+    """Statistik translation memory (hit rate, jumlah entri)"""
+    return {
+        "prompt_version": TRANSLATION_PROMPT_VERSION,
+        **translation_memory.get_metrics(),
+    }
+
+@translator_router.get("/translate/glossary")
+async def glossary_info():
+    """Versi dan jumlah entri glosarium yang sedang dipakai"""
+    refresh_glossary()
+    return glossary.get_metrics()
+
+@translator_router.post("/translate/glossary", dependencies=[Depends(require_admin_token)])
+async def upload_glossary(file: UploadFile = File(...)):
+    """Ganti glosarium (file JSON) dan bangun ulang indeksnya tanpa restart"""
+    data = await file.read(GLOSSARY_MAX_UPLOAD_BYTES + 1)
+    if len(data) > GLOSSARY_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Glossary file is too large")
+    try:
+        index = await asyncio.to_thread(glossary.replace, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OSError as e:
+        logger.error(f"Could not store glossary: {e}")
+        raise HTTPException(status_code=500, detail="Could not store glossary file")
+    return {"message": "Glossary updated", "version": index.version, "entries": index.size}
+
 @translator_router.get("/supported-languages")
 async def get_supported_languages():
     """Dapatkan daftar bahasa yang didukung untuk terjemahan"""
@@ -245,7 +901,7 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "Sumba Text Translator",
-        "openai_configured": client is not None,
+        "openai_configured": openai_configured(),
         "supported_languages": SUPPORTED_LANGUAGES,
         "max_text_length": MAX_TEXT_LENGTH,
         "timestamp": datetime.now().isoformat()
@@ -277,6 +933,16 @@ def read_root():
                 "method": "POST",
                 "description": "Terjemahkan teks Sumba"
             },
+            {
+                "path": "/translate/stream",
+                "method": "POST",
+                "description": "Terjemahkan teks Sumba, hasil dikirim bertahap (SSE)"
+            },
+            {
+                "path": "/translate/batch",
+                "method": "POST",
+                "description": "Terjemahkan banyak teks sekaligus (hasil NDJSON)"
+            },
             {
                 "path": "/supported-languages", 
                 "method": "GET",
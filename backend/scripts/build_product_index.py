@@ -0,0 +1,104 @@
+"""Embed every product photo and write the similar-cloth search index.
+
+Run from the backend directory (uses the same .env as the API):
+
+    python -m scripts.build_product_index --output saved_models/product_index
+
+Each Product.photo_url is downloaded (Google Drive share links are rewritten
+to direct downloads, local paths are read from disk), run through the same
+preprocessing as /classify-tenun and embedded with the classifier backbone.
+The API picks the index up from PRODUCT_INDEX_DIR on its next model load.
+"""
+import os
+import re
+import sys
+import logging
+import argparse
+
+import httpx
+import numpy as np
+
+from database.config import SessionLocal
+from models.tables import Product
+from services.image_pipeline import allocate_batch, decode_image
+from services.inference import create_backend
+from services.similarity_index import build_index
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("build_product_index")
+
+IMG_SIZE = (224, 224)
+GOOGLE_DRIVE_FILE = re.compile(r"/file/d/([a-zA-Z0-9_-]+)")
+
+
+def photo_download_url(url: str) -> str:
+    """Same rewrite the shop frontend applies to Google Drive share links"""
+    match = GOOGLE_DRIVE_FILE.search(url)
+    if match:
+        return f"https://drive.google.com/uc?export=download&id={match.group(1)}"
+    return url
+
+
+def fetch_photo(client: httpx.Client, url: str) -> bytes:
+    if url.startswith(("http://", "https://")):
+        response = client.get(photo_download_url(url))
+        response.raise_for_status()
+        return response.content
+    with open(url, "rb") as f:
+        return f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=os.getenv("PRODUCT_INDEX_DIR", "saved_models/product_index"))
+    parser.add_argument("--backend", default=os.getenv("CLASSIFIER_BACKEND", "tflite"))
+    parser.add_argument("--model-path", default=os.getenv("CLASSIFIER_MODEL_PATH", "saved_models/tenun_classifier.tflite"))
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--ivf-lists", type=int, default=None, help="Number of IVF lists (default: sqrt(N) above 4096 items)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        products = db.query(Product).filter(Product.photo_url.isnot(None)).all()
+        products = [(p.product_id, p.name, p.photo_url) for p in products if p.photo_url]
+    finally:
+        db.close()
+
+    if not products:
+        logger.error("No products with photo_url found")
+        sys.exit(1)
+
+    backend = create_backend(args.backend, args.model_path, embeddings=True)
+    if not getattr(backend, "supports_embeddings", False):
+        logger.error(f"{args.model_path} has no embedding output (export it with export_model_variants --embeddings)")
+        sys.exit(1)
+
+    items, embeddings = [], []
+    with httpx.Client(timeout=30, follow_redirects=True) as client:
+        for start in range(0, len(products), args.batch_size):
+            chunk = products[start:start + args.batch_size]
+            buffer = allocate_batch(len(chunk), IMG_SIZE)
+            rows = []
+
+            for product_id, name, photo_url in chunk:
+                try:
+                    decode_image(fetch_photo(client, photo_url), IMG_SIZE, out=buffer[len(rows)])
+                except Exception as e:
+                    logger.warning(f"Skipping {product_id}: {e}")
+                    continue
+                rows.append({"product_id": product_id, "name": name, "photo_url": photo_url})
+
+            if rows:
+                embeddings.append(backend.embed(buffer[:len(rows)]))
+                items.extend(rows)
+            logger.info(f"Embedded {len(items)}/{len(products)} products")
+
+    if not items:
+        logger.error("No product photo could be embedded")
+        sys.exit(1)
+
+    build_index(np.concatenate(embeddings), items, args.output, n_lists=args.ivf_lists)
+
+
+if __name__ == "__main__":
+    main()
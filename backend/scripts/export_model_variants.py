@@ -0,0 +1,153 @@
+"""Export quantized TFLite variants of the tenun classifier.
+
+Needs full TensorFlow (export only, serving does not). Run from the backend
+directory:
+
+    python -m scripts.export_model_variants --dataset ../ai/tenun_dataset
+
+Builds from saved_models/tenun_savedmodel:
+  float32        plain float export, the accuracy reference
+  dynamic_range  int8 weights, float activations (same recipe as the shipped .tflite)
+  int8           full-integer ops, calibrated on the dataset images
+  float16        float16 weights
+
+and records each one under "variants" in model_metadata.json so the API can
+pick one with CLASSIFIER_MODEL_VARIANT.
+
+With --embeddings the variants are converted from the Keras model instead and
+get a second output, the backbone feature vector used by similar-cloth search
+(the SavedModel signature only returns class probabilities).
+"""
+import os
+import glob
+import json
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from services.image_pipeline import allocate_batch, decode_image
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("export_model_variants")
+
+IMG_SIZE = (224, 224)
+IMAGE_PATTERNS = ("*.jpg", "*.jpeg", "*.png", "*.bmp")
+VARIANTS = ("float32", "dynamic_range", "int8", "float16")
+
+
+def dataset_images(dataset_dir: str) -> list:
+    paths = []
+    for pattern in IMAGE_PATTERNS:
+        paths.extend(glob.glob(os.path.join(dataset_dir, "*", pattern)))
+    return sorted(paths)
+
+
+def representative_dataset(paths: list):
+    """Calibration samples for full-integer quantization, preprocessed like the API"""
+    def generator():
+        for path in paths:
+            with open(path, "rb") as f:
+                sample = allocate_batch(1, IMG_SIZE)
+                decode_image(f.read(), IMG_SIZE, out=sample[0])
+            yield [sample]
+    return generator
+
+
+def embedding_model(tf, keras_path: str):
+    """The classifier with the global-average-pooling features as a second output"""
+    model = tf.keras.models.load_model(keras_path)
+    pooling = next(
+        (layer for layer in model.layers if isinstance(layer, tf.keras.layers.GlobalAveragePooling2D)),
+        None
+    )
+    if pooling is None:
+        raise SystemExit(f"No GlobalAveragePooling2D layer in {keras_path}")
+    return tf.keras.Model(model.inputs, [model.output, pooling.output])
+
+
+def build_converter(tf, source, variant: str, calibration_paths: list, int8_io: bool):
+    """Converter for a SavedModel directory or an in-memory Keras model"""
+    if isinstance(source, str):
+        converter = tf.lite.TFLiteConverter.from_saved_model(source)
+    else:
+        converter = tf.lite.TFLiteConverter.from_keras_model(source)
+
+    if variant == "dynamic_range":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    elif variant == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == "int8":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset(calibration_paths)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        if int8_io:
+            converter.inference_input_type = tf.int8
+            converter.inference_output_type = tf.int8
+
+    return converter
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--savedmodel", default="saved_models/tenun_savedmodel")
+    parser.add_argument("--dataset", default="../ai/tenun_dataset", help="Calibration images, one folder per class")
+    parser.add_argument("--output-dir", default="saved_models")
+    parser.add_argument("--metadata", default="saved_models/model_metadata.json")
+    parser.add_argument("--variants", nargs="+", default=list(VARIANTS), choices=VARIANTS)
+    parser.add_argument("--int8-io", action="store_true", help="Use int8 model inputs/outputs for the int8 variant")
+    parser.add_argument("--embeddings", action="store_true", help="Add the backbone embedding as a second output")
+    parser.add_argument("--keras-model", default="saved_models/tenun_classifier.keras",
+                        help="Keras model used with --embeddings")
+    args = parser.parse_args()
+
+    import tensorflow as tf
+
+    calibration_paths = dataset_images(args.dataset)
+    if "int8" in args.variants and not calibration_paths:
+        raise SystemExit(f"No calibration images found in {args.dataset}")
+
+    with open(args.metadata, "r") as f:
+        metadata = json.load(f)
+    variants = metadata.setdefault("variants", {})
+    source = embedding_model(tf, args.keras_model) if args.embeddings else args.savedmodel
+
+    for variant in args.variants:
+        logger.info(f"Converting {variant} variant")
+        converter = build_converter(tf, source, variant, calibration_paths, args.int8_io)
+        output_path = os.path.join(args.output_dir, f"tenun_classifier_{variant}.tflite")
+        with open(output_path, "wb") as f:
+            f.write(converter.convert())
+
+        variants[variant] = {
+            "path": output_path,
+            "backend": "tflite",
+            "quantization": variant,
+            "int8_io": bool(args.int8_io and variant == "int8"),
+            "calibration_samples": len(calibration_paths) if variant == "int8" else 0,
+            "embedding_output": bool(args.embeddings),
+            "size_bytes": os.path.getsize(output_path),
+            "sha256": sha256_file(output_path),
+            "exported_at": datetime.now().isoformat(),
+            "tensorflow_version": tf.__version__,
+        }
+        logger.info(f"Wrote {output_path} ({variants[variant]['size_bytes'] / 1024:.0f} KB)")
+
+    with open(args.metadata, "w") as f:
+        json.dump(metadata, f, indent=2)
+    logger.info(f"Updated {args.metadata}")
+
+
+if __name__ == "__main__":
+    main()
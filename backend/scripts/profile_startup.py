@@ -0,0 +1,94 @@
+"""Import-time profile of the API process.
+
+Run from the backend directory:
+
+    python -m scripts.profile_startup
+    python -m scripts.profile_startup --top 40 --budget 1.0
+
+Imports the app module in a fresh interpreter with ``-X importtime`` and
+prints the slowest modules (cumulative) and the heaviest top-level packages
+(self time summed), plus total wall time to import. With --budget the
+command exits non-zero when the import takes longer, so it can guard the
+cold-start target in CI. --startup also runs the FastAPI startup handlers
+(needs the database from .env).
+"""
+import sys
+import time
+import argparse
+import subprocess
+from collections import defaultdict
+
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+if {startup}:
+    import asyncio
+    asyncio.run({module}.app.router.startup())
+print(f"__profile__ {{imported - started:.4f}} {{time.perf_counter() - imported:.4f}}", file=sys.stderr)
+"""
+
+
+def parse_importtime(stderr: str):
+    """(module, self_us, cumulative_us, depth) rows from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="Module to import (default: main)")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--startup", action="store_true", help="Also run the app startup handlers")
+    parser.add_argument("--budget", type=float, default=None, help="Fail when import takes longer (seconds)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=args.module, startup=args.startup)],
+        capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if completed.returncode != 0:
+        print(completed.stderr[-4000:], file=sys.stderr)
+        sys.exit(completed.returncode)
+
+    rows = parse_importtime(completed.stderr)
+    import_seconds, startup_seconds = next(
+        map(float, line.split()[1:]) for line in completed.stderr.splitlines() if line.startswith("__profile__")
+    ) if "__profile__" in completed.stderr else (float("nan"), float("nan"))
+
+    packages = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        packages[name.split(".")[0]] += self_us
+
+    print(f"Slowest imports (cumulative) for '{args.module}':")
+    for name, self_us, cumulative_us, depth in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  {self_us / 1000:8.1f} ms self  {'  ' * depth}{name}")
+
+    print("\nHeaviest packages (self time):")
+    for name, self_us in sorted(packages.items(), key=lambda p: -p[1])[:args.top]:
+        print(f"  {self_us / 1000:9.1f} ms  {name}")
+
+    heavy = [name for name in ("tensorflow", "keras", "ai_edge_litert", "tflite_runtime", "openai") if name in packages]
+    print(f"\nmodules imported: {len(rows)}")
+    print(f"heavy packages loaded at import: {', '.join(heavy) or 'none'}")
+    print(f"import {args.module}: {import_seconds:.3f}s")
+    if args.startup:
+        print(f"startup handlers: {startup_seconds:.3f}s")
+    print(f"interpreter total: {wall:.3f}s")
+
+    if args.budget is not None and import_seconds > args.budget:
+        print(f"Import time {import_seconds:.3f}s exceeds budget of {args.budget:.3f}s", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Copy a trained model into the versioned model registry.
+
+Run from the backend directory:
+
+    python -m scripts.publish_model --version 1.1 --model ../ai/saved_models/tenun_classifier.tflite \\
+        --metadata ../ai/saved_models/model_metadata.json --activate
+
+Creates <registry>/<version>/ with the model file (or SavedModel directory),
+its model_metadata.json and optionally a product index built for it.
+--activate points the registry's ACTIVE file at the new version; workers
+running with MODEL_RELOAD_POLL_SECONDS > 0 then hot-swap to it.
+"""
+import os
+import sys
+import json
+import shutil
+import logging
+import argparse
+from datetime import datetime
+
+from services.model_registry import METADATA_FILE, PRODUCT_INDEX_DIR, ModelRegistry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("publish_model")
+
+BACKEND_BY_EXTENSION = {".tflite": "tflite", ".keras": "keras", ".h5": "keras"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--version", required=True)
+    parser.add_argument("--model", required=True, help=".tflite/.keras file or SavedModel directory")
+    parser.add_argument("--metadata", required=True, help="model_metadata.json written by the training notebook")
+    parser.add_argument("--backend", default=None, help="Defaults from the model file type")
+    parser.add_argument("--product-index", default=None, help="Product index built with this model")
+    parser.add_argument("--registry", default=os.getenv("MODEL_REGISTRY_DIR", "saved_models/registry"))
+    parser.add_argument("--activate", action="store_true")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.registry)
+    version_dir = os.path.join(args.registry, args.version)
+    if os.path.exists(version_dir):
+        logger.error(f"Version {args.version} already exists in {args.registry}")
+        sys.exit(1)
+
+    backend = args.backend or (
+        "savedmodel" if os.path.isdir(args.model) else BACKEND_BY_EXTENSION.get(os.path.splitext(args.model)[1])
+    )
+    if backend is None:
+        logger.error(f"Cannot tell the backend for {args.model}, pass --backend")
+        sys.exit(1)
+
+    with open(args.metadata, "r") as f:
+        metadata = json.load(f)
+
+    # Stage in a temporary directory so a half-copied version is never listed
+    staging_dir = f"{version_dir}.partial"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+
+    model_file = os.path.basename(os.path.normpath(args.model))
+    if os.path.isdir(args.model):
+        shutil.copytree(args.model, os.path.join(staging_dir, model_file))
+    else:
+        shutil.copy2(args.model, os.path.join(staging_dir, model_file))
+    if args.product_index:
+        shutil.copytree(args.product_index, os.path.join(staging_dir, PRODUCT_INDEX_DIR))
+
+    metadata.update({
+        "backend": backend,
+        "model_file": model_file,
+        "published_at": datetime.now().isoformat(),
+    })
+    with open(os.path.join(staging_dir, METADATA_FILE), "w") as f:
+        json.dump(metadata, f, indent=2)
+
+    os.rename(staging_dir, version_dir)
+    logger.info(f"Published model {args.version} to {version_dir}")
+
+    if args.activate:
+        registry.set_active(args.version)
+
+
+if __name__ == "__main__":
+    main()
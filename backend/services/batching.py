@@ -0,0 +1,228 @@
+import time
+import queue
+import asyncio
+import logging
+import threading
+from typing import Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Sentinel pushed into the queue to stop the inference thread
+_STOP = object()
+
+
+class BatchQueueFull(Exception):
+    """Raised when the batching queue has reached its configured depth"""
+
+
+def _rows(outputs, start: int, end: int):
+    """Slice a request's rows out of the model output (array or tuple of arrays)"""
+    if isinstance(outputs, tuple):
+        return tuple(output[start:end] for output in outputs)
+    return outputs[start:end]
+
+
+def _resolve(future: asyncio.Future, result=None, error: Exception = None):
+    """Set a future's outcome unless the waiting request already went away"""
+    if future.cancelled() or future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class MicroBatcher:
+    """Collects image tensors from concurrent requests and runs them as one batch
+
+    Requests are grouped until either `max_batch_size` rows are waiting or the
+    oldest item has waited `max_wait_ms`. The forward pass runs on a dedicated
+    thread so the event loop never blocks on the model. A request may submit
+    several rows at once (batch uploads); it always gets back its own rows.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        max_queue_depth: int = 64,
+        name: str = "tenun-inference",
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_queue_depth = max_queue_depth
+        self.name = name
+
+        self._queue = queue.Queue(maxsize=max_queue_depth)
+        self._thread = None
+        # Guards `_stopping` so no submit can slip in behind the stop sentinel
+        self._submit_lock = threading.Lock()
+        self._stopping = False
+        self._metrics_lock = threading.Lock()
+        self._reset_metrics()
+
+    def _reset_metrics(self):
+        self._batches = 0
+        self._items = 0
+        self._rejected = 0
+        self._errors = 0
+        self._inference_seconds = 0.0
+        self._wait_seconds = 0.0
+        self._batch_size_counts = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the inference thread"""
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Micro-batcher started (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:.1f}, max_queue_depth={self.max_queue_depth})"
+        )
+
+    def stop(self, timeout: float = 5.0):
+        """Finish the current batch, stop the inference thread and fail whatever is still queued
+
+        New submits are rejected as soon as stopping starts.
+        """
+        with self._submit_lock:
+            self._stopping = True
+        if self.running:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        self._thread = None
+
+        failed = self._fail_pending(RuntimeError("Micro-batcher stopped before the item was processed"))
+        logger.info(f"Micro-batcher stopped ({failed} queued item(s) failed)" if failed else "Micro-batcher stopped")
+
+    def _fail_pending(self, error: Exception) -> int:
+        """Resolve every item left in the queue with `error`"""
+        failed = 0
+        stop_pending = False
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop_pending = True  # thread outlived the join timeout and has not seen it yet
+                continue
+            _, future, loop, _ = item
+            try:
+                loop.call_soon_threadsafe(_resolve, future, None, error)
+            except RuntimeError:
+                pass  # the request's event loop is already closed
+            failed += 1
+        if stop_pending:
+            self._queue.put(_STOP)
+        return failed
+
+    async def submit(self, tensor: np.ndarray) -> np.ndarray:
+        """Queue a (N, H, W, C) tensor and wait for its N rows of model output"""
+        if tensor.ndim != 4:
+            raise ValueError(f"Expected a (N, H, W, C) tensor, got shape {tensor.shape}")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._submit_lock:
+            if self._stopping or not self.running:
+                raise RuntimeError("Micro-batcher is not running")
+            try:
+                self._queue.put_nowait((tensor, future, loop, time.monotonic()))
+            except queue.Full:
+                with self._metrics_lock:
+                    self._rejected += 1
+                raise BatchQueueFull(f"Inference queue is full ({self.max_queue_depth} waiting)")
+
+        return await future
+
+    def _collect_batch(self, first_item) -> tuple:
+        """Gather up to max_batch_size rows, waiting at most max_wait after the first item"""
+        items = [first_item]
+        rows = len(first_item[0])
+        deadline = time.monotonic() + self.max_wait
+        stop_requested = False
+
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop_requested = True
+                break
+            items.append(item)
+            rows += len(item[0])
+
+        return items, stop_requested
+
+    def _run(self):
+        while True:
+            first_item = self._queue.get()
+            if first_item is _STOP:
+                return
+
+            items, stop_requested = self._collect_batch(first_item)
+            self._run_batch(items)
+
+            if stop_requested:
+                return
+
+    def _run_batch(self, items: list):
+        started = time.monotonic()
+        batch = np.concatenate([item[0] for item in items], axis=0)
+
+        try:
+            predictions = self.predict_fn(batch)
+        except Exception as e:
+            logger.error(f"Batched inference failed for {len(items)} item(s): {e}")
+            with self._metrics_lock:
+                self._errors += 1
+            for _, future, loop, _ in items:
+                loop.call_soon_threadsafe(_resolve, future, None, e)
+            return
+
+        finished = time.monotonic()
+        offset = 0
+        for tensor, future, loop, _ in items:
+            loop.call_soon_threadsafe(_resolve, future, _rows(predictions, offset, offset + len(tensor)))
+            offset += len(tensor)
+
+        with self._metrics_lock:
+            self._batches += 1
+            self._items += offset
+            self._inference_seconds += finished - started
+            self._wait_seconds += sum((started - item[3]) * len(item[0]) for item in items)
+            self._batch_size_counts[offset] = self._batch_size_counts.get(offset, 0) + 1
+
+    def get_metrics(self) -> dict:
+        """Snapshot of batching counters for the metrics endpoint"""
+        with self._metrics_lock:
+            return {
+                "running": self.running and not self._stopping,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "max_queue_depth": self.max_queue_depth,
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "items": self._items,
+                "rejected": self._rejected,
+                "errors": self._errors,
+                "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+                "avg_inference_ms": round(self._inference_seconds * 1000 / self._batches, 2) if self._batches else 0.0,
+                "avg_queue_wait_ms": round(self._wait_seconds * 1000 / self._items, 2) if self._items else 0.0,
+                "batch_size_histogram": dict(sorted(self._batch_size_counts.items())),
+            }
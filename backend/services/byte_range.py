@@ -0,0 +1,60 @@
+import re
+from typing import Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+_SINGLE_RANGE = re.compile(r"^\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*$", re.IGNORECASE)
+
+
+def parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) with end exclusive for a single `bytes=` range; None when the header is not a
+    single byte range and the whole body should be sent. ValueError when it can't be satisfied"""
+    match = _SINGLE_RANGE.match(header)
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size
+    start = int(first)
+    end = min(int(last) + 1, size) if last else size
+    if start >= size or start >= end:
+        raise ValueError("range starts past the end")
+    return start, end
+
+
+class BytesRangeResponse(Response):
+    """In-memory body that answers Range requests like FileResponse does for files: 206 with
+    Content-Range for a single byte range, 416 when it can't be satisfied, the full body otherwise
+    (multiple ranges, or an If-Range that doesn't match the ETag)"""
+
+    def __init__(self, content: bytes, media_type: Optional[str] = None, headers: Optional[dict] = None):
+        super().__init__(content=content, media_type=media_type, headers={**(headers or {}), "Accept-Ranges": "bytes"})
+
+    async def __call__(self, scope, receive, send) -> None:
+        request_headers = Headers(scope=scope)
+        http_range = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if http_range is None or (if_range is not None and if_range != self.headers.get("etag")):
+            return await super().__call__(scope, receive, send)
+
+        size = len(self.body)
+        try:
+            byte_range = parse_byte_range(http_range, size)
+        except ValueError:
+            response = Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+            return await response(scope, receive, send)
+        if byte_range is None:
+            return await super().__call__(scope, receive, send)
+
+        start, end = byte_range
+        headers = {k: v for k, v in self.headers.items() if k not in ("content-length", "content-type")}
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+        response = Response(content=self.body[start:end], status_code=206, media_type=self.media_type, headers=headers)
+        await response(scope, receive, send)
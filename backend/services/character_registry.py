@@ -0,0 +1,85 @@
+import time
+import logging
+import threading
+from types import MappingProxyType
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from models.tables import Character
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CharacterProfile:
+    """Read-only copy of a Character row with its system prompt already formatted"""
+    character_id: str
+    name: str
+    bio: Optional[str]
+    region: Optional[str]
+    system_prompt: str
+
+
+class CharacterRegistry:
+    """All characters, loaded once and served from memory
+
+    `load` reads every Character row and swaps in a new immutable snapshot
+    in one assignment, so readers never see a half-refreshed registry.
+    `is_stale` tells callers when the TTL has passed (0 = never); a failed
+    load keeps the previous snapshot and is not retried before the next TTL.
+    """
+
+    def __init__(self, build_system_prompt: Callable[[Character], str], ttl_seconds: float = 300):
+        self.build_system_prompt = build_system_prompt
+        self.ttl_seconds = ttl_seconds
+
+        self._profiles = MappingProxyType({})
+        self._loaded_at = None
+        self._last_attempt = None
+        self._loads = 0
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> int:
+        with self._lock:
+            self._last_attempt = time.monotonic()
+            characters = db.query(Character).all()
+            self._profiles = MappingProxyType({
+                character.character_id: CharacterProfile(
+                    character_id=character.character_id,
+                    name=character.name,
+                    bio=character.bio,
+                    region=character.region,
+                    system_prompt=self.build_system_prompt(character),
+                )
+                for character in characters
+            })
+            self._loaded_at = self._last_attempt
+            self._loads += 1
+
+        logger.info(f"Character registry loaded {len(self._profiles)} characters")
+        return len(self._profiles)
+
+    def is_stale(self) -> bool:
+        if self._last_attempt is None:
+            return True
+        return self.ttl_seconds > 0 and time.monotonic() - self._last_attempt > self.ttl_seconds
+
+    def mark_attempt(self):
+        """Record a failed load so it is not retried on every request"""
+        self._last_attempt = time.monotonic()
+
+    def get(self, character_id: str) -> Optional[CharacterProfile]:
+        return self._profiles.get(character_id)
+
+    def all(self) -> List[CharacterProfile]:
+        return list(self._profiles.values())
+
+    def get_metrics(self) -> dict:
+        return {
+            "characters": len(self._profiles),
+            "ttl_seconds": self.ttl_seconds,
+            "loads": self._loads,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+        }
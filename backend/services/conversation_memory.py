@@ -0,0 +1,178 @@
+import math
+import logging
+import threading
+from typing import List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.tables import ConversationMemory, Message
+
+logger = logging.getLogger(__name__)
+
+# Messages an existing conversation starts its memory with (older ones were never in the prompt either)
+SEED_MESSAGES = 20
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_loaded = False
+
+
+def _get_encoding():
+    """tiktoken's cl100k_base when installed, loaded on first use; None falls back to an estimate"""
+    global _encoding, _encoding_loaded
+
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    logger.info(f"tiktoken not available ({e}), estimating tokens as characters / 4")
+                    _encoding = None
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def memory_entry(sender: str, message: str) -> dict:
+    return {"sender": sender, "message": message, "tokens": count_tokens(message)}
+
+
+def get_conversation_memory(db: Session, conversation_id: int, lock: bool = False) -> ConversationMemory:
+    """Memory row of a conversation, created on first use
+
+    Conversations that predate the memory table are seeded once from their
+    latest messages; after that no message history is queried per turn.
+    With `lock` the row is re-read FOR UPDATE so concurrent turns and
+    summary updates of the same conversation never overwrite each other.
+    """
+    if lock:
+        memory = db.get(ConversationMemory, conversation_id, with_for_update=True, populate_existing=True)
+    else:
+        memory = db.get(ConversationMemory, conversation_id)
+    if memory is not None:
+        return memory
+
+    previous_messages = db.query(Message).filter(
+        Message.conversation_id == conversation_id
+    ).order_by(Message.timestamp.desc()).limit(SEED_MESSAGES).all()
+    previous_messages.reverse()
+
+    recent = [memory_entry(msg.sender, msg.message) for msg in previous_messages]
+    memory = ConversationMemory(
+        conversation_id=conversation_id,
+        summary="",
+        recent_messages=recent,
+        recent_tokens=sum(entry["tokens"] for entry in recent),
+        summarized_count=0,
+    )
+    db.add(memory)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # another request created it first
+        return get_conversation_memory(db, conversation_id, lock)
+    if lock:
+        db.refresh(memory, with_for_update=True)
+    return memory
+
+
+def append_turn(memory: ConversationMemory, user_message: str, bot_response: str, window_tokens: int) -> bool:
+    """Add a turn to the recent window; True when the window is over budget and should be summarized"""
+    entries = [memory_entry("user", user_message), memory_entry("bot", bot_response)]
+    # Reassign instead of appending in place so SQLAlchemy sees the JSON change
+    memory.recent_messages = list(memory.recent_messages or []) + entries
+    memory.recent_tokens = (memory.recent_tokens or 0) + sum(entry["tokens"] for entry in entries)
+    return memory.recent_tokens > window_tokens
+
+
+def format_message(entry: dict, bot_name: str) -> str:
+    speaker = "User" if entry["sender"] == "user" else bot_name
+    return f"{speaker}: {entry['message']}"
+
+
+def render_context(memory: ConversationMemory, token_budget: int, bot_name: str) -> str:
+    """Summary plus as many of the newest messages as fit in `token_budget`"""
+    summary = memory.summary or ""
+    remaining = token_budget - (count_tokens(summary) if summary else 0)
+
+    lines = []
+    for entry in reversed(memory.recent_messages or []):
+        remaining -= entry["tokens"] + 3  # speaker label and newline
+        if remaining < 0:
+            break
+        lines.append(format_message(entry, bot_name))
+    lines.reverse()
+
+    context = "\n".join(lines)
+    if summary:
+        context = f"Summary of the earlier conversation: {summary}\n\n{context}"
+    return context
+
+
+def messages_to_fold(recent: List[dict], keep_tokens: int) -> int:
+    """How many of the oldest messages to fold into the summary so at most `keep_tokens` stay recent"""
+    total = sum(entry["tokens"] for entry in recent)
+    count = 0
+    while count < len(recent) and total > keep_tokens:
+        total -= recent[count]["tokens"]
+        count += 1
+    return count
+
+
+def build_summary_prompt(summary: str, entries: List[dict], bot_name: str) -> str:
+    transcript = "\n".join(format_message(entry, bot_name) for entry in entries)
+    return f"""Update the running summary of a conversation between a user and {bot_name}.
+
+Current summary:
+{summary or "(none yet)"}
+
+New messages to fold in:
+{transcript}
+
+Write the updated summary in a few sentences, in the language of the conversation. Keep facts about the
+user (name, interests, questions asked, preferences) and anything {bot_name} promised or explained.
+Reply with the summary only."""
+
+
+def apply_summary(db: Session, conversation_id: int, folded: List[dict], summary: str) -> bool:
+    """Replace the summary and drop the folded messages from the window
+
+    The row is locked and only updated when the window still starts with
+    the messages that were summarized, so a concurrent update is never
+    folded twice or lost.
+    """
+    memory = db.query(ConversationMemory).filter(
+        ConversationMemory.conversation_id == conversation_id
+    ).with_for_update().first()
+    recent = list(memory.recent_messages or []) if memory is not None else []
+    if memory is None or recent[:len(folded)] != folded:
+        db.rollback()
+        return False
+
+    memory.summary = summary
+    memory.recent_messages = recent[len(folded):]
+    memory.recent_tokens = sum(entry["tokens"] for entry in memory.recent_messages)
+    memory.summarized_count = (memory.summarized_count or 0) + len(folded)
+    db.commit()
+    return True
+
+
+def load_for_summary(db: Session, conversation_id: int, keep_tokens: int) -> Optional[tuple]:
+    """(current summary, oldest messages to fold) or None when nothing needs folding"""
+    memory = db.get(ConversationMemory, conversation_id)
+    if memory is None:
+        return None
+    recent = list(memory.recent_messages or [])
+    count = messages_to_fold(recent, keep_tokens)
+    if count == 0:
+        return None
+    return memory.summary or "", recent[:count]
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class WorkQueueFull(Exception):
+    """Raised when a bounded executor has no free slot for new work"""
+
+
+class BoundedExecutor:
+    """Thread pool with a hard cap on running plus queued jobs
+
+    Blocking work (PIL decode, resize) is pushed here so it never runs on the
+    event loop. Once `max_workers + max_pending` jobs are in flight new work
+    is rejected immediately instead of piling up behind the pool.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 32, name: str = "worker"):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(0, max_pending)
+        self.name = name
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+        self._slots.release()
+
+    async def run(self, fn: Callable, *args):
+        """Run fn(*args) on the pool, raising WorkQueueFull when saturated"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise WorkQueueFull(f"{self.name} pool is saturated")
+
+        with self._lock:
+            self._in_flight += 1
+
+        # The slot is released when the job really finishes, even if the
+        # awaiting request is cancelled before that.
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
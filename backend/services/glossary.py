@@ -0,0 +1,194 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+import unicodedata
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+TOKEN = re.compile(r"[\w'’-]+")
+_END = ""  # trie key of the entry ending at a node; tokens are never empty
+
+
+def glossary_tokens(text: str) -> List[str]:
+    """Case-folded words of `text`, punctuation dropped"""
+    return TOKEN.findall(unicodedata.normalize("NFC", text).casefold())
+
+
+@dataclass(frozen=True)
+class GlossaryEntry:
+    term: str
+    translations: MappingProxyType  # target language -> translation
+    note: Optional[str] = None
+
+
+def parse_glossary(data: bytes, languages: List[str]) -> tuple:
+    """(version, entries) from a glossary file; ValueError when it is not usable
+
+    Format::
+
+        {"version": "2026.10.1",
+         "entries": [{"sumba": "hinggi", "id": "kain tenun pria", "en": "men's ikat cloth", "note": "..."}]}
+
+    Without "version" the first 12 hex digits of the content hash are used.
+    """
+    try:
+        document = json.loads(data)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Glossary is not valid JSON: {e}")
+    if not isinstance(document, dict) or not isinstance(document.get("entries"), list):
+        raise ValueError('Glossary must be an object with an "entries" list')
+
+    entries = []
+    for position, raw in enumerate(document["entries"]):
+        term = raw.get("sumba") if isinstance(raw, dict) else None
+        if not isinstance(term, str) or not glossary_tokens(term):
+            raise ValueError(f'Entry {position} has no "sumba" term')
+        translations = {
+            language: raw[language].strip()
+            for language in languages
+            if isinstance(raw.get(language), str) and raw[language].strip()
+        }
+        if not translations:
+            raise ValueError(f"Entry {position} ('{term}') has no translation for {', '.join(languages)}")
+        note = raw.get("note") if isinstance(raw.get("note"), str) and raw["note"].strip() else None
+        entries.append(GlossaryEntry(term=term.strip(), translations=MappingProxyType(translations), note=note))
+
+    version = str(document.get("version") or hashlib.sha256(data).hexdigest()[:12])
+    return version, entries
+
+
+class GlossaryIndex:
+    """Immutable word trie over the glossary terms"""
+
+    def __init__(self, entries: List[GlossaryEntry], version: str):
+        self.version = version
+        self.size = len(entries)
+        self._root = {}
+        for entry in entries:
+            node = self._root
+            for token in glossary_tokens(entry.term):
+                node = node.setdefault(token, {})
+            node[_END] = entry  # a later duplicate replaces the earlier one
+
+    def lookup(self, text: str) -> Optional[GlossaryEntry]:
+        """The entry when `text` is exactly one glossary term (case and punctuation ignored)"""
+        node = self._root
+        for token in glossary_tokens(text):
+            node = node.get(token)
+            if node is None:
+                return None
+        return node.get(_END) if node is not self._root else None
+
+    def find_terms(self, text: str) -> List[GlossaryEntry]:
+        """Glossary terms in `text`, longest match first at every position, each entry once"""
+        tokens = glossary_tokens(text)
+        found = []
+        position = 0
+        while position < len(tokens):
+            node, match, match_end = self._root, None, position
+            for index in range(position, len(tokens)):
+                node = node.get(tokens[index])
+                if node is None:
+                    break
+                if _END in node:
+                    match, match_end = node[_END], index + 1
+            if match is None:
+                position += 1
+                continue
+            if match not in found:
+                found.append(match)
+            position = match_end
+        return found
+
+
+class Glossary:
+    """Current glossary index, loaded from a versioned JSON file
+
+    `replace` writes a new file atomically and swaps the index in one
+    assignment. Other workers notice the new file through `is_stale`, which
+    compares its modification time at most every `poll_seconds`.
+    """
+
+    def __init__(self, path: str, languages: List[str], poll_seconds: float = 30):
+        self.path = path
+        self.languages = languages
+        self.poll_seconds = poll_seconds
+
+        self.index = GlossaryIndex([], version="")
+        self._mtime = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self._loads = 0
+        self._local_answers = 0
+        self._hinted = 0
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def is_stale(self) -> bool:
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.poll_seconds:
+            return False
+        self._checked_at = now
+        return self._file_mtime() != self._mtime
+
+    def load(self) -> int:
+        """(Re)build the index from the file; a missing file gives an empty glossary"""
+        with self._lock:
+            mtime = self._file_mtime()
+            if mtime is None:
+                version, entries = "", []
+            else:
+                with open(self.path, "rb") as f:
+                    version, entries = parse_glossary(f.read(), self.languages)
+            self.index = GlossaryIndex(entries, version)
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+            self._loads += 1
+
+        logger.info(f"Glossary loaded: {len(entries)} entries, version '{version or '-'}'")
+        return len(entries)
+
+    def replace(self, data: bytes) -> GlossaryIndex:
+        """Validate and store a new glossary file, then rebuild the index from it"""
+        version, entries = parse_glossary(data, self.languages)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+            self.index = GlossaryIndex(entries, version)
+            self._mtime = self._file_mtime()
+            self._checked_at = time.monotonic()
+            self._loads += 1
+
+        logger.info(f"Glossary replaced: {len(entries)} entries, version '{version}'")
+        return self.index
+
+    def record(self, local_answer: bool = False, hinted: bool = False):
+        self._local_answers += local_answer
+        self._hinted += hinted
+
+    def get_metrics(self) -> dict:
+        return {
+            "version": self.index.version or None,
+            "entries": self.index.size,
+            "path": self.path,
+            "loads": self._loads,
+            "local_answers": self._local_answers,
+            "hinted_prompts": self._hinted,
+        }
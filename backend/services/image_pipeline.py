@@ -0,0 +1,72 @@
+import io
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+LAYOUT_NHWC = "NHWC"
+LAYOUT_NCHW = "NCHW"
+
+
+def allocate_batch(batch_size: int, target_size: Tuple[int, int], layout: str = LAYOUT_NHWC) -> np.ndarray:
+    """Preallocate a float32 input buffer the pipeline can write rows into"""
+    width, height = target_size
+    if layout == LAYOUT_NCHW:
+        return np.empty((batch_size, 3, height, width), dtype=np.float32)
+    return np.empty((batch_size, height, width, 3), dtype=np.float32)
+
+
+def _describe(img: Image.Image, image_data: bytes) -> dict:
+    """Image info read from the header, before any pixel is decoded"""
+    return {
+        "format": img.format,
+        "mode": img.mode,
+        "size": img.size,
+        "width": img.width,
+        "height": img.height,
+        "file_size_bytes": len(image_data),
+        "file_size_mb": round(len(image_data) / (1024*1024), 2)
+    }
+
+
+def decode_image(
+    image_data: bytes,
+    target_size: Tuple[int, int],
+    out: Optional[np.ndarray] = None,
+    layout: str = LAYOUT_NHWC,
+    scale: float = 255.0,
+) -> Tuple[np.ndarray, dict]:
+    """Decode an upload once and write the normalized pixels into `out`
+
+    `out` is a single (H, W, 3) or (3, H, W) float32 row, e.g. one entry of
+    `allocate_batch`. JPEGs are downscaled in the DCT domain via
+    `Image.draft` so a 12 MP phone photo is never decoded at full size.
+    Returns the filled row and the header info dict.
+    """
+    img = Image.open(io.BytesIO(image_data))
+    image_info = _describe(img, image_data)
+
+    # Let libjpeg decode at 1/2, 1/4 or 1/8 scale while staying >= target_size
+    if img.format == "JPEG":
+        img.draft("RGB", target_size)
+
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    if img.size != tuple(target_size):
+        img = img.resize(target_size, Image.Resampling.LANCZOS)
+
+    if out is None:
+        out = allocate_batch(1, target_size, layout)[0]
+
+    pixels = np.asarray(img)
+    if layout == LAYOUT_NCHW:
+        pixels = pixels.transpose(2, 0, 1)
+
+    # Normalization is fused into the write into the preallocated buffer
+    np.divide(pixels, np.float32(scale), out=out, casting="unsafe")
+
+    return out, image_info
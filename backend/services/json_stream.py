@@ -0,0 +1,85 @@
+import re
+
+ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JsonStringFieldExtractor:
+    """Decode one string field of a JSON object while the object is still being streamed
+
+    `feed` takes the next chunk of raw JSON text and returns the newly
+    decoded characters of the field's value (often ""). Escapes split
+    across chunks are held back until complete; unknown or malformed
+    escapes are passed through instead of failing, since the full document
+    is parsed properly once the stream ends. `done` turns True at the
+    closing quote.
+    """
+
+    def __init__(self, field: str):
+        self._key = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._in_value = False
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        if self.done:
+            return ""
+        self._buffer += chunk
+
+        if not self._in_value:
+            match = self._key.search(self._buffer)
+            if match is None:
+                return ""
+            self._buffer = self._buffer[match.end():]
+            self._in_value = True
+
+        buffer = self._buffer
+        decoded = []
+        position = 0
+        while position < len(buffer):
+            char = buffer[position]
+            if char == '"':
+                self.done = True
+                position += 1
+                break
+            if char != "\\":
+                decoded.append(char)
+                position += 1
+                continue
+
+            if position + 1 >= len(buffer):
+                break  # the escape continues in the next chunk
+            code = buffer[position + 1]
+            if code != "u":
+                decoded.append(ESCAPES.get(code, code))
+                position += 2
+                continue
+
+            if position + 6 > len(buffer):
+                break
+            try:
+                codepoint = int(buffer[position + 2:position + 6], 16)
+            except ValueError:
+                position += 6
+                continue
+            if 0xD800 <= codepoint < 0xDC00:
+                # High surrogate: wait for the low half, unless what follows cannot be one
+                low = buffer[position + 6:position + 12]
+                if len(low) < 6 and "\\u".startswith(low[:2]):
+                    break
+                if low.startswith("\\u"):
+                    try:
+                        low_codepoint = int(low[2:], 16)
+                    except ValueError:
+                        low_codepoint = 0
+                    if 0xDC00 <= low_codepoint < 0xE000:
+                        decoded.append(chr(0x10000 + ((codepoint - 0xD800) << 10) + (low_codepoint - 0xDC00)))
+                        position += 12
+                        continue
+                decoded.append("\ufffd")
+                position += 6
+                continue
+            decoded.append(chr(codepoint))
+            position += 6
+
+        self._buffer = buffer[position:]
+        return "".join(decoded)
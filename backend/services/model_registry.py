@@ -0,0 +1,95 @@
+import os
+import re
+import json
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+METADATA_FILE = "model_metadata.json"
+ACTIVE_FILE = "ACTIVE"
+PRODUCT_INDEX_DIR = "product_index"
+
+
+def _version_sort_key(version: str) -> list:
+    """Natural ordering so that 1.10 sorts after 1.9"""
+    return [(0, int(part), "") if part.isdigit() else (1, 0, part) for part in re.split(r"(\d+)", version) if part]
+
+
+class ModelRegistry:
+    """Directory of versioned classifier artifacts
+
+    Layout::
+
+        <root>/<version>/model_metadata.json   class mapping, "backend", "model_file", optional "variants"
+        <root>/<version>/<model_file>           .tflite file, SavedModel directory or .keras file
+        <root>/<version>/product_index/         optional, embeddings are specific to one model
+        <root>/ACTIVE                           version the workers should serve
+
+    Without an ACTIVE file the highest version is served.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    @property
+    def active_path(self) -> str:
+        return os.path.join(self.root, ACTIVE_FILE)
+
+    def versions(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        versions = [
+            name for name in os.listdir(self.root)
+            if not name.endswith(".partial") and os.path.isfile(os.path.join(self.root, name, METADATA_FILE))
+        ]
+        return sorted(versions, key=_version_sort_key)
+
+    def active_version(self) -> Optional[str]:
+        """Version named in ACTIVE, else the latest one"""
+        if os.path.exists(self.active_path):
+            with open(self.active_path, "r") as f:
+                version = f.read().strip()
+            if version:
+                return version
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def set_active(self, version: str):
+        """Point ACTIVE at a version (atomic rename, watchers never see a partial file)"""
+        if version not in self.versions():
+            raise KeyError(f"Model version '{version}' not found in {self.root}")
+        tmp_path = f"{self.active_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(version)
+        os.replace(tmp_path, self.active_path)
+        logger.info(f"Active model version set to {version}")
+
+    def resolve(self, version: str, variant: str = "", default_backend: str = "tflite") -> dict:
+        """Backend, model path, metadata and product index directory for one version"""
+        version_dir = os.path.join(self.root, version)
+        metadata_path = os.path.join(version_dir, METADATA_FILE)
+        if not os.path.isfile(metadata_path):
+            raise KeyError(f"Model version '{version}' not found in {self.root}")
+
+        with open(metadata_path, "r") as f:
+            metadata = json.load(f)
+        metadata["version"] = version
+
+        if variant:
+            entry = metadata.get("variants", {}).get(variant)
+            if entry is None:
+                raise ValueError(f"Model variant '{variant}' not found for version {version}")
+            backend, model_file = entry.get("backend", "tflite"), entry["path"]
+        else:
+            backend, model_file = metadata.get("backend", default_backend), metadata.get("model_file")
+            if not model_file:
+                raise ValueError(f"{metadata_path} does not name a model_file")
+
+        return {
+            "version": version,
+            "backend": backend,
+            "path": model_file if os.path.isabs(model_file) else os.path.join(version_dir, model_file),
+            "metadata": metadata,
+            "product_index_dir": os.path.join(version_dir, PRODUCT_INDEX_DIR),
+        }
@@ -0,0 +1,127 @@
+import os
+import random
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Connection pool and timeouts of the shared httpx client
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")  # e.g. http://127.0.0.1:8100/v1 for the mock server
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "60"))
+OPENAI_POOL_TIMEOUT = float(os.getenv("OPENAI_POOL_TIMEOUT", "10"))
+
+# Retries of failed upstream calls (connection errors, timeouts, 429, 5xx)
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+OPENAI_BACKOFF_BASE_SECONDS = float(os.getenv("OPENAI_BACKOFF_BASE_SECONDS", "0.5"))
+OPENAI_BACKOFF_MAX_SECONDS = float(os.getenv("OPENAI_BACKOFF_MAX_SECONDS", "8"))
+
+_client = None
+_http_client = None
+_client_lock = threading.Lock()
+_client_initialized = False
+
+
+def get_openai_client():
+    """Shared AsyncOpenAI client on a pooled httpx.AsyncClient, created on first use
+
+    The openai package takes a large share of process start-up to import,
+    so it is only imported once a route actually calls the API. Returns
+    None when the client cannot be configured.
+    """
+    global _client, _http_client, _client_initialized
+
+    if _client_initialized:
+        return _client
+
+    with _client_lock:
+        if not _client_initialized:
+            try:
+                import httpx
+                from openai import AsyncOpenAI
+
+                _http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                    ),
+                    timeout=httpx.Timeout(
+                        OPENAI_READ_TIMEOUT,
+                        connect=OPENAI_CONNECT_TIMEOUT,
+                        pool=OPENAI_POOL_TIMEOUT,
+                    ),
+                )
+                # Retries are done in call_with_retries so the backoff is ours to tune
+                _client = AsyncOpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    base_url=OPENAI_BASE_URL or None,
+                    http_client=_http_client,
+                    max_retries=0,
+                )
+                if not os.getenv("OPENAI_API_KEY"):
+                    logger.warning("OPENAI_API_KEY not found in environment variables")
+            except Exception as e:
+                logger.error(f"Failed to initialize OpenAI client: {e}")
+                _client = None
+            _client_initialized = True
+
+    return _client
+
+
+def openai_configured() -> bool:
+    """Whether the client is (or can be) configured, without importing openai"""
+    if _client_initialized:
+        return _client is not None
+    return bool(os.getenv("OPENAI_API_KEY"))
+
+
+async def close_openai_client():
+    """Close the pooled connections on shutdown"""
+    global _client, _http_client, _client_initialized
+
+    with _client_lock:
+        http_client, _http_client = _http_client, None
+        _client, _client_initialized = None, False
+
+    if http_client is not None:
+        await http_client.aclose()
+
+
+def _retry_delay(attempt: int, error: Exception) -> float:
+    """Full-jitter exponential backoff, or the server's Retry-After when it sends one"""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), OPENAI_BACKOFF_MAX_SECONDS)
+        except ValueError:
+            pass
+    return random.uniform(0, min(OPENAI_BACKOFF_MAX_SECONDS, OPENAI_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+def _is_retryable(error: Exception) -> bool:
+    import openai
+
+    if isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)):
+        return True  # APITimeoutError is an APIConnectionError
+    return isinstance(error, openai.APIStatusError) and error.status_code in (408, 409)
+
+
+async def call_with_retries(operation, *args, **kwargs):
+    """Await an OpenAI call, retrying transient failures with jittered backoff
+
+    For streaming calls only opening the stream is retried; once tokens
+    have been sent to the client the request cannot be replayed.
+    """
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        try:
+            return await operation(*args, **kwargs)
+        except Exception as e:
+            if attempt >= OPENAI_MAX_RETRIES or not _is_retryable(e):
+                raise
+            delay = _retry_delay(attempt, e)
+            logger.warning(f"OpenAI call failed ({type(e).__name__}), retry {attempt + 1}/{OPENAI_MAX_RETRIES} in {delay:.2f}s")
+            await asyncio.sleep(delay)
@@ -0,0 +1,155 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+_DCT_SIZE = 32
+_LOW_FREQ = 8
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II basis, so dct(x) == D @ x"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    basis = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def phash(tensor: np.ndarray) -> int:
+    """64-bit pHash of an already preprocessed (H, W, 3) image tensor
+
+    Works on the model input produced by the image pipeline, so no extra
+    decode is needed: luma, 32x32 block-mean downsample, 2D DCT, then one bit
+    per low-frequency coefficient above the median.
+    """
+    gray = tensor @ _LUMA
+    height, width = gray.shape
+    height -= height % _DCT_SIZE
+    width -= width % _DCT_SIZE
+    small = gray[:height, :width].reshape(
+        _DCT_SIZE, height // _DCT_SIZE, _DCT_SIZE, width // _DCT_SIZE
+    ).mean(axis=(1, 3))
+
+    coefficients = (_DCT @ small @ _DCT.T)[:_LOW_FREQ, :_LOW_FREQ].flatten()
+    # The DC term only tracks overall brightness, leave it out of the median
+    bits = coefficients > np.median(coefficients[1:])
+
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class NearDuplicateIndex:
+    """Multi-index hamming index over recent pHashes
+
+    The 64 bits are split into `max_distance + 1` chunks. Two hashes within
+    `max_distance` bits must agree exactly on at least one chunk (pigeonhole),
+    so lookups only compare against hashes sharing a chunk value. Entries are
+    evicted oldest-first once `max_entries` is reached.
+    """
+
+    def __init__(self, max_distance: int = 8, max_entries: int = 10000):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+
+        num_chunks = min(HASH_BITS, max(1, max_distance + 1))
+        bounds = np.linspace(0, HASH_BITS, num_chunks + 1).astype(int)
+        self._chunks = [
+            (int(start), (1 << int(end - start)) - 1) for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_distance >= 0 and self.max_entries > 0
+
+    def _chunk_keys(self, value: int):
+        return [(i, (value >> shift) & mask) for i, (shift, mask) in enumerate(self._chunks)]
+
+    def _remove(self, value: int):
+        self._entries.pop(value, None)
+        for key in self._chunk_keys(value):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(value)
+                if not bucket:
+                    del self._buckets[key]
+
+    def add(self, value: int, result: dict):
+        if not self.enabled:
+            return
+        with self._lock:
+            if value in self._entries:
+                self._entries.move_to_end(value)
+                self._entries[value] = (time.time(), result)
+                return
+
+            self._entries[value] = (time.time(), result)
+            for key in self._chunk_keys(value):
+                self._buckets.setdefault(key, set()).add(value)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def lookup(self, value: int) -> Optional[Tuple[dict, int]]:
+        """Closest stored result within max_distance, with its distance"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            best = None
+            candidates = set()
+            for key in self._chunk_keys(value):
+                candidates.update(self._buckets.get(key, ()))
+
+            for candidate in candidates:
+                distance = hamming(value, candidate)
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (candidate, distance)
+
+            if best is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._entries.move_to_end(best[0])
+            return self._entries[best[0]][1], best[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "max_distance": self.max_distance,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(image_data: bytes, model_version: str) -> str:
+    """Cache key: SHA-256 of the uploaded bytes scoped to the model version"""
+    return f"{model_version}:{hashlib.sha256(image_data).hexdigest()}"
+
+
+class PredictionCache:
+    """Two-tier cache for classification results
+
+    Tier 1 is an in-memory LRU bounded by entry count and TTL. Tier 2 is an
+    optional SQLite file that survives restarts; hits there are promoted back
+    into memory. Entries are keyed by `content_key`, so a new model version
+    never sees results produced by an older one.
+
+    `get` and `set` only touch memory and are safe on the event loop. The
+    disk tier is reached through `load` (after a `get` miss) and `flush`,
+    which writes queued entries in one transaction once `write_batch_size`
+    are waiting or the oldest has waited `flush_seconds` (see `needs_flush`);
+    both block, so run them off the event loop.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 86400, disk_path: Optional[str] = None,
+                 write_batch_size: int = 32, flush_seconds: float = 5.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+        self.write_batch_size = max(1, write_batch_size)
+        self.flush_seconds = flush_seconds
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()  # memory tier and pending writes, never held during disk I/O
+        self._disk_lock = threading.Lock()
+        self._pending = {}  # key -> (created_at, result) waiting for the next flush
+        self._pending_since = None
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._flushes = 0
+        self._db = None
+
+        if disk_path:
+            self._open_disk(disk_path)
+
+    @property
+    def persistent(self) -> bool:
+        return self._db is not None
+
+    def _open_disk(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS prediction_cache ("
+                "key TEXT PRIMARY KEY, model_version TEXT NOT NULL, "
+                "result TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            logger.info(f"Prediction cache disk tier at {path}")
+        except sqlite3.Error as e:
+            logger.error(f"Could not open prediction cache at {path}: {e}")
+            self._db = None
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, created_at: float, result: dict):
+        self._memory[key] = (created_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[dict]:
+        """Memory tier only; without a disk tier a miss here is final"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, result = entry
+                if not self._expired(created_at):
+                    self._memory.move_to_end(key)
+                    self._hits += 1
+                    return result
+                del self._memory[key]
+            if self._db is None:
+                self._misses += 1
+            return None
+
+    def load(self, key: str) -> Optional[dict]:
+        """Disk tier lookup after a `get` miss (blocking); expired rows are left for `flush` to purge"""
+        if self._db is None:
+            return None
+        with self._lock:
+            entry = self._pending.get(key)  # evicted from memory before it was flushed
+        row = None
+        if entry is None:
+            with self._disk_lock:
+                row = self._db.execute(
+                    "SELECT created_at, result FROM prediction_cache WHERE key = ?", (key,)
+                ).fetchone()
+            if row is not None:
+                entry = (row[0], json.loads(row[1]))
+
+        with self._lock:
+            if entry is None or self._expired(entry[0]):
+                self._misses += 1
+                return None
+            self._remember(key, *entry)
+            self._hits += 1
+            self._disk_hits += row is not None
+            return entry[1]
+
+    def set(self, key: str, result: dict):
+        """Store in memory and queue the disk write for the next `flush`"""
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, created_at, result)
+            if self._db is not None:
+                self._pending[key] = (created_at, result)
+                if self._pending_since is None:
+                    self._pending_since = time.monotonic()
+
+    def needs_flush(self) -> bool:
+        with self._lock:
+            if not self._pending:
+                return False
+            return (len(self._pending) >= self.write_batch_size
+                    or time.monotonic() - self._pending_since >= self.flush_seconds)
+
+    def flush(self) -> int:
+        """Write queued entries and purge expired rows in one transaction (blocking)"""
+        with self._lock:
+            pending, self._pending, self._pending_since = self._pending, {}, None
+        if self._db is None or not pending:
+            return 0
+
+        rows = [
+            (key, key.split(":", 1)[0], json.dumps(result), created_at)
+            for key, (created_at, result) in pending.items()
+        ]
+        with self._disk_lock:
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO prediction_cache (key, model_version, result, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                if self.ttl_seconds > 0:
+                    self._db.execute("DELETE FROM prediction_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+                self._db.commit()
+            except sqlite3.Error as e:
+                self._db.rollback()
+                logger.error(f"Failed to persist {len(rows)} prediction cache entries: {e}")
+                return 0
+        with self._lock:
+            self._flushes += 1
+        return len(rows)
+
+    def invalidate(self, keep_version: Optional[str] = None):
+        """Drop cached results, keeping only those of `keep_version` if given"""
+        prefix = f"{keep_version}:"
+        with self._lock:
+            if keep_version is None:
+                self._memory.clear()
+                self._pending.clear()
+            else:
+                for key in [k for k in self._memory if not k.startswith(prefix)]:
+                    del self._memory[key]
+                for key in [k for k in self._pending if not k.startswith(prefix)]:
+                    del self._pending[key]
+
+        if self._db is not None:
+            with self._disk_lock:
+                if keep_version is None:
+                    self._db.execute("DELETE FROM prediction_cache")
+                else:
+                    self._db.execute("DELETE FROM prediction_cache WHERE model_version != ?", (keep_version,))
+                self._db.commit()
+
+        logger.info(f"Prediction cache invalidated (kept version: {keep_version})")
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_enabled": self._db is not None,
+                "pending_writes": len(self._pending),
+                "flushes": self._flushes,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
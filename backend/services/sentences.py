@@ -0,0 +1,76 @@
+import re
+from typing import List, Tuple
+
+# End of a sentence: terminal punctuation (plus closing quotes/brackets) followed by whitespace, or a line break
+SENTENCE_END = re.compile(r"""(?<=[.!?…])["'”’)\]]*\s+|\n+""")
+
+
+def split_sentences(text: str, min_chars: int = 0) -> List[str]:
+    """Split text into sentences; pieces shorter than `min_chars` are joined to the next one"""
+    splitter = SentenceSplitter(min_chars=min_chars)
+    return splitter.feed(text) + splitter.flush()
+
+
+class SentenceSplitter:
+    """Incremental sentence splitter for streamed text
+
+    `feed` takes the next chunk of text and returns the sentences it
+    completed; `flush` returns whatever is left once the stream ends. A
+    boundary is only accepted once the whitespace after it has arrived, so
+    "Rp 1.500" split across two chunks stays one sentence.
+    """
+
+    def __init__(self, min_chars: int = 0):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._buffer):
+            if match.end() == len(self._buffer) and not match.group().endswith("\n"):
+                break  # the whitespace may continue in the next chunk
+            sentence = self._buffer[start:match.end()].strip()
+            if len(sentence) < self.min_chars:
+                continue  # keep it in the buffer, it goes out with the next sentence
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+
+def split_segments(text: str, max_chars: int) -> List[Tuple[str, str]]:
+    """Split text into segments of whole sentences of at most `max_chars` each
+
+    Returns (segment, separator) pairs; joining every segment with its
+    separator rebuilds the text with its line breaks and blank lines (other
+    whitespace between sentences becomes one space). A single sentence
+    longer than `max_chars` is a segment of its own.
+    """
+    pieces = []  # (sentence, separator to the next sentence)
+    for line in text.split("\n"):
+        sentences = split_sentences(line)
+        if not sentences:
+            if pieces and pieces[-1][1] == "\n":
+                pieces[-1] = (pieces[-1][0], "\n\n")
+            continue
+        pieces.extend((sentence, " ") for sentence in sentences)
+        pieces[-1] = (pieces[-1][0], "\n")
+
+    segments = []
+    current, separator = "", ""
+    for sentence, next_separator in pieces:
+        if current and len(current) + len(separator) + len(sentence) > max_chars:
+            segments.append((current, separator))
+            current = ""
+        current = current + separator + sentence if current else sentence
+        separator = next_separator
+    if current:
+        segments.append((current, ""))
+    return segments
@@ -0,0 +1,62 @@
+import random
+import threading
+from collections import deque
+
+import numpy as np
+
+
+class ShadowStats:
+    """Agreement and latency of a candidate model running beside the live one"""
+
+    def __init__(self, version: str, sample_rate: float, window: int = 1000):
+        self.version = version
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self._lock = threading.Lock()
+        self._primary_ms = deque(maxlen=window)
+        self._shadow_ms = deque(maxlen=window)
+        self._compared = 0
+        self._agreed = 0
+        self._errors = 0
+        self._skipped = 0
+
+    def should_sample(self) -> bool:
+        return random.random() < self.sample_rate
+
+    def record(self, agreed: bool, primary_ms: float, shadow_ms: float):
+        with self._lock:
+            self._compared += 1
+            self._agreed += int(agreed)
+            self._primary_ms.append(primary_ms)
+            self._shadow_ms.append(shadow_ms)
+
+    def record_error(self):
+        with self._lock:
+            self._errors += 1
+
+    def record_skipped(self):
+        """Sampled request dropped because the shadow queue was full"""
+        with self._lock:
+            self._skipped += 1
+
+    @staticmethod
+    def _percentiles(values) -> dict:
+        if not values:
+            return {"p50_ms": None, "p99_ms": None}
+        values = np.asarray(values)
+        return {
+            "p50_ms": round(float(np.percentile(values, 50)), 2),
+            "p99_ms": round(float(np.percentile(values, 99)), 2),
+        }
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "version": self.version,
+                "sample_rate": self.sample_rate,
+                "compared": self._compared,
+                "agreement": round(self._agreed / self._compared, 4) if self._compared else None,
+                "errors": self._errors,
+                "skipped": self._skipped,
+                "primary_latency": self._percentiles(self._primary_ms),
+                "shadow_latency": self._percentiles(self._shadow_ms),
+            }
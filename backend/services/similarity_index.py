@@ -0,0 +1,168 @@
+import os
+import json
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "embeddings.f16.npy"
+CENTROIDS_FILE = "centroids.npy"
+METADATA_FILE = "index.json"
+
+# Below this many vectors a brute-force scan is already fast enough
+IVF_MIN_ITEMS = 4096
+
+# Indexes whose float32 copy would exceed the budget are scored this many rows at a time
+SCORE_CHUNK_ROWS = 2048
+DEFAULT_MAX_FLOAT32_BYTES = 512 * 1024 * 1024
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 15, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on L2-normalized vectors, returns normalized centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        for cluster in range(n_clusters):
+            members = vectors[assignments == cluster]
+            if len(members):
+                centroids[cluster] = members.mean(axis=0)
+            else:
+                centroids[cluster] = vectors[rng.integers(len(vectors))]
+        centroids = l2_normalize(centroids)
+
+    return centroids
+
+
+def build_index(embeddings: np.ndarray, items: List[dict], output_dir: str, n_lists: Optional[int] = None) -> dict:
+    """Write a compact float16 embedding matrix plus optional IVF lists to disk
+
+    Rows are stored grouped by IVF list so each list is one contiguous slice
+    of the memory-mapped matrix.
+    """
+    vectors = l2_normalize(embeddings)
+    os.makedirs(output_dir, exist_ok=True)
+
+    centroids = None
+    offsets = None
+    if n_lists is None and len(vectors) >= IVF_MIN_ITEMS:
+        n_lists = int(np.sqrt(len(vectors)))
+
+    if n_lists and n_lists > 1:
+        centroids = kmeans(vectors, n_lists)
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(assignments, kind="stable")
+        vectors = vectors[order]
+        items = [items[i] for i in order]
+        offsets = np.searchsorted(assignments[order], np.arange(n_lists + 1)).tolist()
+        np.save(os.path.join(output_dir, CENTROIDS_FILE), centroids.astype(np.float32))
+    elif os.path.exists(os.path.join(output_dir, CENTROIDS_FILE)):
+        os.remove(os.path.join(output_dir, CENTROIDS_FILE))
+
+    np.save(os.path.join(output_dir, VECTORS_FILE), vectors.astype(np.float16))
+
+    metadata = {
+        "count": len(items),
+        "dimension": int(vectors.shape[1]) if len(vectors) else 0,
+        "items": items,
+        "ivf_offsets": offsets,
+    }
+    with open(os.path.join(output_dir, METADATA_FILE), "w") as f:
+        json.dump(metadata, f)
+
+    logger.info(f"Wrote similarity index with {len(items)} vectors to {output_dir} (ivf_lists={n_lists or 0})")
+    return metadata
+
+
+class SimilarityIndex:
+    """Cosine-similarity search over a memory-mapped float16 embedding matrix
+
+    float16 has no BLAS kernels, so rows are scored in float32. When that
+    copy fits in `max_float32_bytes` it is made once at load time; larger
+    indexes convert SCORE_CHUNK_ROWS rows at a time into a small buffer, so
+    no query ever copies the whole matrix.
+    """
+
+    def __init__(self, vectors: np.ndarray, items: List[dict], centroids: Optional[np.ndarray] = None,
+                 offsets: Optional[List[int]] = None, nprobe: int = 8,
+                 max_float32_bytes: int = DEFAULT_MAX_FLOAT32_BYTES):
+        self.vectors = vectors
+        self.items = items
+        self.centroids = centroids
+        self.offsets = offsets
+        self.nprobe = nprobe
+        self.float32_vectors = None
+        if vectors.size * 4 <= max_float32_bytes:
+            self.float32_vectors = np.asarray(vectors, dtype=np.float32)
+
+    @classmethod
+    def load(cls, directory: str, nprobe: int = 8,
+             max_float32_bytes: int = DEFAULT_MAX_FLOAT32_BYTES) -> "SimilarityIndex":
+        with open(os.path.join(directory, METADATA_FILE), "r") as f:
+            metadata = json.load(f)
+
+        vectors = np.load(os.path.join(directory, VECTORS_FILE), mmap_mode="r")
+        centroids = None
+        centroids_path = os.path.join(directory, CENTROIDS_FILE)
+        if metadata.get("ivf_offsets") and os.path.exists(centroids_path):
+            centroids = np.load(centroids_path)
+
+        return cls(vectors, metadata["items"], centroids, metadata.get("ivf_offsets"), nprobe, max_float32_bytes)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _candidate_ranges(self, query: np.ndarray) -> List[range]:
+        if self.centroids is None:
+            return [range(0, len(self.items))]
+
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return [range(self.offsets[p], self.offsets[p + 1]) for p in probes]
+
+    def _score(self, start: int, stop: int, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of rows [start, stop) to a normalized float32 query"""
+        if self.float32_vectors is not None:
+            return self.float32_vectors[start:stop] @ query
+
+        scores = np.empty(stop - start, dtype=np.float32)
+        buffer = np.empty((min(SCORE_CHUNK_ROWS, stop - start), self.vectors.shape[1]), dtype=np.float32)
+        for offset in range(start, stop, SCORE_CHUNK_ROWS):
+            end = min(offset + SCORE_CHUNK_ROWS, stop)
+            chunk = buffer[:end - offset]
+            np.copyto(chunk, self.vectors[offset:end])
+            np.dot(chunk, query, out=scores[offset - start:end - start])
+        return scores
+
+    def search(self, query: np.ndarray, k: int = 5) -> List[dict]:
+        """Top-k items by cosine similarity to a single embedding"""
+        if not self.items or k <= 0:
+            return []
+
+        query = l2_normalize(np.asarray(query).reshape(-1))
+        all_rows, all_scores = [], []
+        for rows in self._candidate_ranges(query):
+            if not len(rows):
+                continue
+            all_scores.append(self._score(rows.start, rows.stop, query))
+            all_rows.append(np.arange(rows.start, rows.stop))
+
+        if not all_scores:
+            return []
+
+        scores = np.concatenate(all_scores)
+        rows = np.concatenate(all_rows)
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+
+        return [dict(self.items[rows[i]], score=round(float(scores[i]), 4)) for i in best]
@@ -0,0 +1,139 @@
+import re
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.tables import TranslationMemoryEntry
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_source_text(text: str) -> str:
+    """Unicode NFC with whitespace collapsed, so trivially different inputs share an entry"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def context_hash(context: Optional[str]) -> str:
+    if not context or not context.strip():
+        return ""
+    return hashlib.sha256(normalize_source_text(context).encode("utf-8")).hexdigest()[:16]
+
+
+def translation_key(text: str, target_language: str, context: Optional[str], prompt_version: str) -> str:
+    """SHA-256 of (normalized text, target language, context hash, prompt version)"""
+    payload = "\x00".join([normalize_source_text(text), target_language, context_hash(context), prompt_version])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """Earlier translations: an in-process LRU in front of a database table
+
+    `get` only looks at memory and returns in microseconds; `load` fetches
+    memory misses from the table in one query (call it off the event loop)
+    and promotes them. Results are plain dicts with translated_text,
+    cultural_notes and confidence_score. A prompt change gets a new
+    prompt_version and therefore new keys, old entries are simply not hit.
+    """
+
+    def __init__(self, session_factory=None, max_entries: int = 10000):
+        self.session_factory = session_factory
+        self.max_entries = max_entries
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._db_hits = 0
+        self._misses = 0
+        self._stores = 0
+
+    def _remember(self, key: str, result: dict):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                self._hits += 1
+            return result
+
+    def load(self, keys: Iterable[str]) -> Dict[str, dict]:
+        """Entries for `keys` from the table (memory misses count as misses when not found there)"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        if keys and self.session_factory is not None:
+            db = self.session_factory()
+            try:
+                rows = db.query(TranslationMemoryEntry).filter(TranslationMemoryEntry.key.in_(keys)).all()
+                found = {
+                    row.key: {
+                        "translated_text": row.translated_text,
+                        "cultural_notes": row.cultural_notes,
+                        "confidence_score": row.confidence_score,
+                    }
+                    for row in rows
+                }
+            except SQLAlchemyError as e:
+                logger.error(f"Translation memory lookup failed: {e}")
+            finally:
+                db.close()
+
+        with self._lock:
+            for key, result in found.items():
+                self._remember(key, result)
+            self._hits += len(found)
+            self._db_hits += len(found)
+            self._misses += len(keys) - len(found)
+        return found
+
+    def store(self, key: str, source_text: str, target_language: str, context: Optional[str],
+              prompt_version: str, result: dict):
+        result = {
+            "translated_text": result["translated_text"],
+            "cultural_notes": result.get("cultural_notes"),
+            "confidence_score": result.get("confidence_score"),
+        }
+        with self._lock:
+            self._remember(key, result)
+            self._stores += 1
+
+        if self.session_factory is None:
+            return
+        db = self.session_factory()
+        try:
+            db.merge(TranslationMemoryEntry(
+                key=key,
+                source_text=normalize_source_text(source_text),
+                target_language=target_language,
+                context_hash=context_hash(context),
+                prompt_version=prompt_version,
+                **result,
+            ))
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()  # most likely a concurrent insert of the same key
+            logger.warning(f"Could not persist translation memory entry: {e}")
+        finally:
+            db.close()
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "persistent": self.session_factory is not None,
+                "hits": self._hits,
+                "db_hits": self._db_hits,
+                "misses": self._misses,
+                "stores": self._stores,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
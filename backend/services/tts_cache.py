@@ -0,0 +1,195 @@
+import os
+import re
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+AUDIO_SUFFIX = ".mp3"
+
+
+def normalize_tts_text(text: str) -> str:
+    """Unicode NFC with whitespace collapsed; both render to the same speech"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def tts_cache_key(model: str, voice: str, text: str) -> str:
+    """Content address of one synthesized clip: SHA-256 of (model, voice, normalized text)"""
+    payload = "\x00".join([model, voice, normalize_tts_text(text)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def valid_tts_key(key: str) -> bool:
+    return bool(re.fullmatch(r"[0-9a-f]{64}", key))
+
+
+class TTSCache:
+    """Two-tier cache for synthesized speech
+
+    Tier 1 keeps recent clips in memory, bounded by total bytes. Tier 2 is an
+    optional directory of MP3 files (`<dir>/<key[:2]>/<key>.mp3`) bounded by
+    total size and evicted least recently used first; the LRU order survives
+    restarts through the files' mtime. Disk hits can be served straight from
+    the file (FileResponse handles Range requests) and are promoted into
+    memory when read as bytes.
+    """
+
+    def __init__(self, max_memory_bytes: int = 32 * 1024 * 1024, cache_dir: Optional[str] = None,
+                 max_disk_bytes: int = 1024 * 1024 * 1024):
+        self.max_memory_bytes = max_memory_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk = OrderedDict()  # key -> size, least recently used first
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        if cache_dir:
+            self._scan_disk(cache_dir)
+
+    def _scan_disk(self, cache_dir: str):
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError as e:
+            logger.error(f"Could not create TTS cache directory {cache_dir}: {e}")
+            self.cache_dir = None
+            return
+
+        entries = []
+        for root, _, files in os.walk(cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                if name.endswith(".tmp"):
+                    os.remove(path)  # interrupted write
+                    continue
+                key = name[:-len(AUDIO_SUFFIX)]
+                if name.endswith(AUDIO_SUFFIX) and valid_tts_key(key):
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, key, stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        self._evict_disk()
+        logger.info(f"TTS cache disk tier at {cache_dir}: {len(self._disk)} clips, {self._disk_bytes / 1e6:.1f} MB")
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + AUDIO_SUFFIX)
+
+    def _remember(self, key: str, audio: bytes):
+        if len(audio) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _touch_disk(self, key: str):
+        self._disk.move_to_end(key)
+        try:
+            os.utime(self.path_for(key))
+        except OSError:
+            pass
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self._evictions += 1
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass
+
+    def get_path(self, key: str) -> Optional[str]:
+        """File of a cached clip, for serving with FileResponse; None when not on disk"""
+        with self._lock:
+            if self.cache_dir is None or key not in self._disk:
+                return None
+            path = self.path_for(key)
+            if not os.path.exists(path):
+                self._disk_bytes -= self._disk.pop(key)
+                return None
+            self._touch_disk(key)
+            self._hits += 1
+            self._disk_hits += 1
+            return path
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                if key in self._disk:
+                    self._touch_disk(key)
+                self._hits += 1
+                return audio
+
+            if self.cache_dir is not None and key in self._disk:
+                try:
+                    with open(self.path_for(key), "rb") as f:
+                        audio = f.read()
+                except OSError:
+                    self._disk_bytes -= self._disk.pop(key)
+                else:
+                    self._touch_disk(key)
+                    self._remember(key, audio)
+                    self._hits += 1
+                    self._disk_hits += 1
+                    return audio
+
+            self._misses += 1
+            return None
+
+    def set(self, key: str, audio: bytes):
+        with self._lock:
+            self._remember(key, audio)
+            if self.cache_dir is None or not audio or len(audio) > self.max_disk_bytes:
+                return
+
+            path = self.path_for(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(tmp_path, "wb") as f:
+                    f.write(audio)
+                os.replace(tmp_path, path)  # readers never see a half-written clip
+            except OSError as e:
+                logger.error(f"Failed to write TTS cache entry: {e}")
+                return
+
+            self._disk_bytes += len(audio) - self._disk.pop(key, 0)
+            self._disk[key] = len(audio)
+            self._evict_disk()
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "disk_enabled": self.cache_dir is not None,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,55 @@
+"""Helpers for serving streamed responses in tests the way uvicorn does"""
+import asyncio
+from types import SimpleNamespace
+
+from fastapi.responses import StreamingResponse
+from starlette.requests import Request
+
+
+class FakeCompletionStream:
+    """Endless streamed completion that records whether it was closed"""
+
+    def __init__(self, delta: str = "Kain ini ditenun. ", interval: float = 0.02, first: str = ""):
+        self.delta = delta
+        self.interval = interval
+        self.pending = [first] if first else []
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(self.interval)
+        delta = self.pending.pop() if self.pending else self.delta
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+
+    async def close(self):
+        await asyncio.sleep(0)  # a real close awaits the connection, i.e. is cancellable
+        self.closed = True
+
+
+def http_scope() -> dict:
+    # uvicorn announces ASGI spec 2.3, where Starlette cancels the body on http.disconnect
+    return {"type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "method": "POST",
+            "path": "/", "headers": [], "query_string": b""}
+
+
+async def serve_until_disconnect(make_body, disconnect_after: float) -> list:
+    """Run a StreamingResponse like the server does and hang up after `disconnect_after` seconds"""
+    started = asyncio.get_running_loop().time()
+    sent = []
+
+    async def receive():
+        remaining = disconnect_after - (asyncio.get_running_loop().time() - started)
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = http_scope()
+    response = StreamingResponse(make_body(Request(scope, receive)), media_type="text/event-stream")
+    await response(scope, receive, send)
+    await asyncio.sleep(0.05)  # let any handed-off cleanup finish
+    return sent
@@ -0,0 +1,165 @@
+import time
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from services.batching import BatchQueueFull, MicroBatcher
+
+
+def row_ids(batch: np.ndarray) -> np.ndarray:
+    """Fake model: one output row per input row, carrying the row's marker value"""
+    return batch[:, 0, 0, :1].copy()
+
+
+def images(marker: float, rows: int = 1) -> np.ndarray:
+    return np.full((rows, 2, 2, 3), marker, np.float32)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_requests_get_their_own_rows():
+    batcher = MicroBatcher(row_ids, max_batch_size=8, max_wait_ms=20)
+    batcher.start()
+
+    async def main():
+        return await asyncio.gather(
+            batcher.submit(images(1)),
+            batcher.submit(images(2, rows=3)),
+            batcher.submit(images(3, rows=2)),
+        )
+
+    try:
+        single, triple, double = run(main())
+    finally:
+        batcher.stop()
+
+    assert single.shape == (1, 1) and single[0, 0] == 1
+    assert triple.shape == (3, 1) and (triple == 2).all()
+    assert double.shape == (2, 1) and (double == 3).all()
+    assert batcher.get_metrics()["items"] == 6
+
+
+def test_tuple_outputs_are_split_per_request():
+    batcher = MicroBatcher(lambda batch: (row_ids(batch), row_ids(batch) * 10), max_batch_size=4, max_wait_ms=20)
+    batcher.start()
+
+    async def main():
+        return await asyncio.gather(batcher.submit(images(1, rows=2)), batcher.submit(images(2)))
+
+    try:
+        first, second = run(main())
+    finally:
+        batcher.stop()
+
+    assert first[0].shape == (2, 1) and (first[1] == 10).all()
+    assert second[0].shape == (1, 1) and second[1][0, 0] == 20
+
+
+def test_rejects_tensors_without_a_batch_dimension():
+    batcher = MicroBatcher(row_ids)
+    batcher.start()
+    try:
+        with pytest.raises(ValueError):
+            run(batcher.submit(np.zeros((2, 2, 3), np.float32)))
+    finally:
+        batcher.stop()
+
+
+def test_model_errors_reach_every_request_of_the_batch():
+    def broken(batch):
+        raise RuntimeError("model exploded")
+
+    batcher = MicroBatcher(broken, max_batch_size=4, max_wait_ms=20)
+    batcher.start()
+
+    async def main():
+        return await asyncio.gather(batcher.submit(images(1)), batcher.submit(images(2)), return_exceptions=True)
+
+    try:
+        results = run(main())
+    finally:
+        batcher.stop()
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert batcher.get_metrics()["errors"] >= 1
+
+
+def test_full_queue_is_rejected():
+    release = threading.Event()
+
+    def blocking(batch):
+        release.wait(5)
+        return row_ids(batch)
+
+    batcher = MicroBatcher(blocking, max_batch_size=1, max_wait_ms=0, max_queue_depth=1)
+    batcher.start()
+
+    async def main():
+        first = asyncio.ensure_future(batcher.submit(images(1)))
+        await asyncio.sleep(0.05)  # taken off the queue, blocked in the model
+        second = asyncio.ensure_future(batcher.submit(images(2)))
+        await asyncio.sleep(0)
+        with pytest.raises(BatchQueueFull):
+            await batcher.submit(images(3))
+        release.set()
+        return await asyncio.gather(first, second)
+
+    try:
+        results = run(main())
+    finally:
+        release.set()
+        batcher.stop()
+
+    assert [result[0, 0] for result in results] == [1, 2]
+    assert batcher.get_metrics()["rejected"] == 1
+
+
+def test_submit_after_stop_is_rejected():
+    batcher = MicroBatcher(row_ids)
+    batcher.start()
+    batcher.stop()
+
+    with pytest.raises(RuntimeError):
+        run(batcher.submit(images(1)))
+    assert not batcher.get_metrics()["running"]
+
+
+def test_stop_finishes_queued_work():
+    def slow(batch):
+        time.sleep(0.05)
+        return row_ids(batch)
+
+    batcher = MicroBatcher(slow, max_batch_size=1, max_wait_ms=0)
+    batcher.start()
+
+    async def main():
+        pending = [asyncio.ensure_future(batcher.submit(images(marker))) for marker in range(3)]
+        await asyncio.sleep(0.01)
+        await asyncio.to_thread(batcher.stop)
+        return await asyncio.gather(*pending)
+
+    results = run(main())
+    assert [result[0, 0] for result in results] == [0, 1, 2]
+
+
+def test_stop_fails_items_left_after_join_timeout():
+    def slow(batch):
+        time.sleep(0.3)
+        return row_ids(batch)
+
+    batcher = MicroBatcher(slow, max_batch_size=1, max_wait_ms=0)
+    batcher.start()
+
+    async def main():
+        pending = [asyncio.ensure_future(batcher.submit(images(marker))) for marker in range(3)]
+        await asyncio.sleep(0.05)
+        await asyncio.to_thread(batcher.stop, 0.05)
+        return await asyncio.wait_for(asyncio.gather(*pending, return_exceptions=True), timeout=2)
+
+    results = run(main())
+    assert results[0][0, 0] == 0  # already running when stop() was called
+    assert all(isinstance(result, RuntimeError) for result in results[1:])
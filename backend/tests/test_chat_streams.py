@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from routes import chat
+from tests.streaming import FakeCompletionStream, serve_until_disconnect
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    turns = []
+
+    def save(conversation_id, user_message, bot_response):
+        turns.append((conversation_id, user_message, bot_response))
+        return True
+
+    monkeypatch.setattr(chat, "save_streamed_reply", save)
+    monkeypatch.setattr(chat, "schedule_memory_update", lambda conversation_id, character_name: None)
+    return turns
+
+
+def test_chat_stream_disconnect_closes_upstream_and_saves_the_partial_reply(saved):
+    stream = FakeCompletionStream()
+
+    async def main():
+        return await serve_until_disconnect(
+            lambda request: chat.stream_chat_events(request, stream, 7, "Ina Na", "Apa itu hinggi?"),
+            disconnect_after=0.15,
+        )
+
+    sent = asyncio.run(main())
+
+    assert any(message.get("body") for message in sent)
+    assert stream.closed
+    assert len(saved) == 1
+    conversation_id, user_message, bot_response = saved[0]
+    assert (conversation_id, user_message) == (7, "Apa itu hinggi?")
+    assert bot_response.startswith("Kain ini ditenun.")
+
+
+def test_pipelined_speech_disconnect_closes_upstream_and_saves_the_turn(saved, monkeypatch):
+    async def fake_speech(voice, text):
+        await asyncio.sleep(0.01)
+        return "key", text.encode("utf-8"), False
+
+    monkeypatch.setattr(chat, "synthesize_speech", fake_speech)
+    stream = FakeCompletionStream()
+
+    async def main():
+        return await serve_until_disconnect(
+            lambda request: chat.pipelined_speech(stream, 7, "Ina Na", "Apa itu hinggi?", "nova"),
+            disconnect_after=0.15,
+        )
+
+    sent = asyncio.run(main())
+
+    assert any(message.get("body") for message in sent)
+    assert stream.closed
+    assert len(saved) == 1 and saved[0][2].startswith("Kain ini ditenun.")
+
+
+def test_speech_relay_disconnect_releases_the_upstream_response(monkeypatch):
+    class FakeSpeechResponse:
+        closed = False
+
+        async def iter_bytes(self):
+            while True:
+                await asyncio.sleep(0.02)
+                yield b"\xff\xfb" * 64
+
+        async def close(self):
+            await asyncio.sleep(0)
+            self.closed = True
+
+    cached = []
+    monkeypatch.setattr(chat.tts_cache, "set", lambda key, audio: cached.append(key))
+    response = FakeSpeechResponse()
+
+    async def main():
+        return await serve_until_disconnect(lambda request: chat.relay_speech(response, "key"), disconnect_after=0.1)
+
+    sent = asyncio.run(main())
+
+    assert any(message.get("body") for message in sent)
+    assert response.closed
+    assert cached == []  # an incomplete clip is never cached
+
+
+def test_memory_cached_clip_answers_range_requests(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from services.tts_cache import TTSCache
+
+    cache = TTSCache(max_memory_bytes=1 << 20)
+    monkeypatch.setattr(chat, "tts_cache", cache)
+    key = "a" * 64
+    cache.set(key, bytes(range(100)))
+    app = FastAPI()
+    app.include_router(chat.chat_router)
+    client = TestClient(app)
+    url = f"/tts/audio/{key}"
+
+    full = client.get(url)
+    assert full.status_code == 200 and full.content == bytes(range(100))
+    assert full.headers["accept-ranges"] == "bytes"
+
+    part = client.get(url, headers={"Range": "bytes=10-19"})
+    assert part.status_code == 206
+    assert part.content == bytes(range(10, 20))
+    assert part.headers["content-range"] == "bytes 10-19/100"
+
+    tail = client.get(url, headers={"Range": "bytes=-5"})
+    assert tail.status_code == 206 and tail.content == bytes(range(95, 100))
+
+    stale = client.get(url, headers={"Range": "bytes=10-19", "If-Range": '"other"'})
+    assert stale.status_code == 200 and len(stale.content) == 100
+
+    beyond = client.get(url, headers={"Range": "bytes=100-"})
+    assert beyond.status_code == 416
+    assert beyond.headers["content-range"] == "bytes */100"
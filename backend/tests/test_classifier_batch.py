@@ -0,0 +1,77 @@
+import io
+import asyncio
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+
+from routes import classifier
+
+
+class CountingFile(io.BytesIO):
+    """Upload body that records how many bytes were read from it"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def upload(data: bytes, name: str = "kain.jpg", declare_size: bool = True) -> UploadFile:
+    return UploadFile(
+        CountingFile(data),
+        size=len(data) if declare_size else None,
+        filename=name,
+        headers=Headers({"content-type": "image/jpeg"}),
+    )
+
+
+def collect(files):
+    return asyncio.run(classifier.collect_batch_entries(files))
+
+
+def test_too_many_files_are_rejected_before_reading(monkeypatch):
+    monkeypatch.setattr(classifier, "MAX_BATCH_ITEMS", 2)
+    files = [upload(b"x" * 10) for _ in range(3)]
+
+    with pytest.raises(HTTPException) as error:
+        collect(files)
+
+    assert "Terlalu banyak" in error.value.detail
+    assert all(file.file.bytes_read == 0 for file in files)
+
+
+def test_declared_total_size_is_rejected_before_reading(monkeypatch):
+    monkeypatch.setattr(classifier, "MAX_BATCH_UPLOAD_SIZE", 100)
+    files = [upload(b"x" * 60), upload(b"y" * 60)]
+
+    with pytest.raises(HTTPException):
+        collect(files)
+
+    assert all(file.file.bytes_read == 0 for file in files)
+
+
+def test_total_size_is_enforced_while_reading_undeclared_files(monkeypatch):
+    monkeypatch.setattr(classifier, "MAX_BATCH_UPLOAD_SIZE", 100)
+    files = [upload(b"x" * 60, declare_size=False) for _ in range(3)]
+
+    with pytest.raises(HTTPException):
+        collect(files)
+
+    assert files[2].file.bytes_read == 0
+
+
+def test_oversized_file_becomes_an_entry_error(monkeypatch):
+    monkeypatch.setattr(classifier, "MAX_FILE_SIZE", 50)
+    files = [upload(b"x" * 80, declare_size=False), upload(b"ok", name="kecil.jpg")]
+
+    entries, archive = collect(files)
+
+    assert archive is None
+    assert "terlalu besar" in entries[0]["error"]
+    assert files[0].file.bytes_read == 51  # never more than one byte past the limit
+    assert entries[1]["load"]() == b"ok"
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from services.glossary import Glossary, GlossaryIndex, glossary_tokens, parse_glossary
+
+LANGUAGES = ["id", "en"]
+
+
+def glossary_file(entries, version="1") -> bytes:
+    return json.dumps({"version": version, "entries": entries}).encode("utf-8")
+
+
+def build_index(*terms) -> GlossaryIndex:
+    _, entries = parse_glossary(glossary_file([{"sumba": term, "id": f"arti {term}"} for term in terms]), LANGUAGES)
+    return GlossaryIndex(entries, version="1")
+
+
+def test_tokens_ignore_case_and_punctuation():
+    assert glossary_tokens("Hinggi, Kombu!") == ["hinggi", "kombu"]
+    assert glossary_tokens("Lau  Pahudu") == ["lau", "pahudu"]
+
+
+def test_lookup_matches_whole_terms_only():
+    index = build_index("hinggi", "hinggi kombu")
+
+    assert index.lookup("Hinggi").term == "hinggi"
+    assert index.lookup("hinggi kombu!").term == "hinggi kombu"
+    assert index.lookup("kombu") is None
+    assert index.lookup("hinggi kombu besar") is None
+    assert index.lookup("") is None
+
+
+def test_find_terms_prefers_the_longest_match():
+    index = build_index("hinggi", "hinggi kombu", "lau")
+    found = index.find_terms("Hinggi kombu dan lau, juga hinggi biasa")
+
+    assert [entry.term for entry in found] == ["hinggi kombu", "lau", "hinggi"]
+
+
+def test_find_terms_lists_each_entry_once():
+    index = build_index("lau")
+    assert [entry.term for entry in index.find_terms("lau lau lau")] == ["lau"]
+
+
+def test_find_terms_falls_back_when_a_longer_term_does_not_complete():
+    index = build_index("hinggi", "hinggi kombu merah")
+    assert [entry.term for entry in index.find_terms("hinggi kombu biru")] == ["hinggi"]
+
+
+def test_parse_glossary_keeps_configured_languages():
+    version, entries = parse_glossary(
+        glossary_file([{"sumba": "lau", "id": "sarung", "en": "sarong", "fr": "sarong", "note": "kain wanita"}]),
+        LANGUAGES,
+    )
+    assert version == "1"
+    assert dict(entries[0].translations) == {"id": "sarung", "en": "sarong"}
+    assert entries[0].note == "kain wanita"
+
+
+@pytest.mark.parametrize("data", [
+    b"not json",
+    b"[]",
+    glossary_file([{"id": "tanpa istilah"}]),
+    glossary_file([{"sumba": "lau", "fr": "sarong"}]),
+])
+def test_parse_glossary_rejects_unusable_files(data):
+    with pytest.raises(ValueError):
+        parse_glossary(data, LANGUAGES)
+
+
+def test_version_defaults_to_content_hash():
+    data = json.dumps({"entries": [{"sumba": "lau", "id": "sarung"}]}).encode("utf-8")
+    version, _ = parse_glossary(data, LANGUAGES)
+    assert len(version) == 12
+
+
+def test_replace_and_reload(tmp_path):
+    path = str(tmp_path / "glossary.json")
+    glossary = Glossary(path, LANGUAGES, poll_seconds=0)
+    assert glossary.load() == 0
+
+    glossary.replace(glossary_file([{"sumba": "lau", "id": "sarung"}], version="2"))
+    assert glossary.index.version == "2"
+    assert glossary.index.lookup("lau").translations["id"] == "sarung"
+
+    other_worker = Glossary(path, LANGUAGES, poll_seconds=0)
+    assert other_worker.is_stale()
+    assert other_worker.load() == 1
+    assert not other_worker.is_stale()
+
+
+def test_invalid_replacement_keeps_the_current_file(tmp_path):
+    path = str(tmp_path / "glossary.json")
+    glossary = Glossary(path, LANGUAGES)
+    glossary.replace(glossary_file([{"sumba": "lau", "id": "sarung"}]))
+
+    with pytest.raises(ValueError):
+        glossary.replace(b"{}")
+
+    assert glossary.index.lookup("lau") is not None
+    with open(path, "rb") as f:
+        assert json.load(f)["entries"][0]["sumba"] == "lau"
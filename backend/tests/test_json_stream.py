@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from services.json_stream import JsonStringFieldExtractor
+
+DOCUMENT = json.dumps({
+    "confidence_score": 0.9,
+    "translated_text": 'Kain "hinggi"\n\tdipakai pria \\ ✓ 🧵 é',
+    "cultural_notes": "catatan",
+})
+
+
+def extract(chunks) -> tuple:
+    extractor = JsonStringFieldExtractor("translated_text")
+    return "".join(extractor.feed(chunk) for chunk in chunks), extractor.done
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 8, len(DOCUMENT)])
+def test_matches_json_decoding_for_any_chunking(chunk_size):
+    chunks = [DOCUMENT[i:i + chunk_size] for i in range(0, len(DOCUMENT), chunk_size)]
+    text, done = extract(chunks)
+
+    assert text == json.loads(DOCUMENT)["translated_text"]
+    assert done
+
+
+def test_ascii_escaped_document_with_surrogate_pairs():
+    document = json.dumps({"translated_text": "tenun 🧵 ikat ✓"}, ensure_ascii=True)
+    assert "\\ud83e" in document
+    text, done = extract(document)  # one character at a time
+
+    assert text == "tenun 🧵 ikat ✓"
+    assert done
+
+
+def test_nothing_before_the_field_and_nothing_after_it():
+    extractor = JsonStringFieldExtractor("translated_text")
+    assert extractor.feed('{"cultural_notes": "translated_text", ') == ""
+    assert extractor.feed('"translated_text": "ya') == "ya"
+    assert extractor.feed('", "more": "x"}') == ""
+    assert extractor.done
+    assert extractor.feed('"translated_text": "lagi"') == ""
+
+
+def test_escape_split_across_chunks_is_held_back():
+    extractor = JsonStringFieldExtractor("translated_text")
+    assert extractor.feed('{"translated_text": "a\\') == "a"
+    assert extractor.feed('u00') == ""
+    assert extractor.feed('e9b"') == "éb"
+    assert extractor.done
+
+
+@pytest.mark.parametrize("chunk_size", [1, 100])
+def test_malformed_escapes_do_not_raise_or_stall(chunk_size):
+    document = '{"translated_text": "x\\uZZZZy\\ud800z\\q"}'
+    text, done = extract([document[i:i + chunk_size] for i in range(0, len(document), chunk_size)])
+    assert text == "xy\ufffdzq"
+    assert done
+
+
+def test_unfinished_value_is_not_done():
+    text, done = extract(['{"translated_text": "setengah'])
+    assert text == "setengah"
+    assert not done
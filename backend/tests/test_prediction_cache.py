@@ -0,0 +1,119 @@
+import time
+
+from services.prediction_cache import PredictionCache, content_key
+
+
+def result(label: str) -> dict:
+    return {"predicted_class": label, "confidence": 0.9}
+
+
+def test_key_is_scoped_to_model_version():
+    assert content_key(b"image", "v1") != content_key(b"image", "v2")
+    assert content_key(b"image", "v1") == content_key(b"image", "v1")
+    assert content_key(b"image", "v1").startswith("v1:")
+
+
+def test_invalidate_keeps_only_the_given_version():
+    cache = PredictionCache()
+    old, new = content_key(b"image", "v1"), content_key(b"image", "v2")
+    cache.set(old, result("hinggi"))
+    cache.set(new, result("lau"))
+
+    cache.invalidate(keep_version="v2")
+
+    assert cache.get(old) is None
+    assert cache.get(new) == result("lau")
+
+
+def test_invalidate_everything():
+    cache = PredictionCache()
+    key = content_key(b"image", "v1")
+    cache.set(key, result("hinggi"))
+
+    cache.invalidate()
+
+    assert cache.get(key) is None
+    assert cache.get_metrics()["entries"] == 0
+
+
+def test_invalidate_reaches_the_disk_tier(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    old, new = content_key(b"image", "v1"), content_key(b"other", "v2")
+    cache = PredictionCache(disk_path=path)
+    cache.set(old, result("hinggi"))
+    cache.set(new, result("lau"))
+    assert cache.flush() == 2
+    cache.invalidate(keep_version="v2")
+
+    restarted = PredictionCache(disk_path=path)
+    assert restarted.get(new) is None  # memory only
+    assert restarted.load(old) is None
+    assert restarted.load(new) == result("lau")
+    assert restarted.get(new) == result("lau")  # promoted
+    assert restarted.get_metrics()["disk_hits"] == 1
+
+
+def test_disk_writes_are_batched(tmp_path):
+    cache = PredictionCache(disk_path=str(tmp_path / "cache.sqlite"), write_batch_size=3, flush_seconds=60)
+    keys = [content_key(bytes([index]), "v1") for index in range(3)]
+
+    cache.set(keys[0], result("hinggi"))
+    cache.set(keys[1], result("lau"))
+    assert not cache.needs_flush()
+    cache.set(keys[2], result("kombu"))
+    assert cache.needs_flush()
+
+    assert cache.flush() == 3
+    assert cache.flush() == 0
+    assert cache.get_metrics()["flushes"] == 1
+    assert PredictionCache(disk_path=str(tmp_path / "cache.sqlite")).load(keys[2]) == result("kombu")
+
+
+def test_pending_writes_are_found_after_eviction(tmp_path):
+    cache = PredictionCache(max_entries=1, disk_path=str(tmp_path / "cache.sqlite"), write_batch_size=10)
+    first, second = content_key(b"a", "v1"), content_key(b"b", "v1")
+    cache.set(first, result("hinggi"))
+    cache.set(second, result("lau"))
+
+    assert cache.get(first) is None
+    assert cache.load(first) == result("hinggi")
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    cache = PredictionCache(ttl_seconds=60)
+    key = content_key(b"image", "v1")
+    cache.set(key, result("hinggi"))
+
+    now = time.time()
+    monkeypatch.setattr("services.prediction_cache.time.time", lambda: now + 120)
+
+    assert cache.get(key) is None
+    assert cache.get_metrics()["misses"] == 1
+
+
+def test_flush_purges_expired_rows(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite")
+    cache = PredictionCache(ttl_seconds=60, disk_path=path)
+    stale, fresh = content_key(b"a", "v1"), content_key(b"b", "v1")
+    cache.set(stale, result("hinggi"))
+    cache.flush()
+
+    now = time.time()
+    monkeypatch.setattr("services.prediction_cache.time.time", lambda: now + 120)
+    assert cache.load(stale) is None
+    cache.set(fresh, result("lau"))
+    cache.flush()
+
+    rows = cache._db.execute("SELECT key FROM prediction_cache").fetchall()
+    assert rows == [(fresh,)]
+
+
+def test_memory_tier_is_bounded():
+    cache = PredictionCache(max_entries=2)
+    keys = [content_key(bytes([index]), "v1") for index in range(3)]
+    for key in keys:
+        cache.set(key, result("hinggi"))
+
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) is not None
+    assert cache.get_metrics()["entries"] == 2
@@ -0,0 +1,64 @@
+from services.sentences import SentenceSplitter, split_segments, split_sentences
+
+
+def rebuild(segments) -> str:
+    return "".join(segment + separator for segment, separator in segments)
+
+
+def test_split_sentences():
+    assert split_sentences("Halo. Apa kabar? Baik!") == ["Halo.", "Apa kabar?", "Baik!"]
+    assert split_sentences('Dia berkata "ya." Lalu pergi.') == ['Dia berkata "ya."', "Lalu pergi."]
+    assert split_sentences("Baris satu\nBaris dua") == ["Baris satu", "Baris dua"]
+    assert split_sentences("   ") == []
+
+
+def test_short_pieces_join_the_next_sentence():
+    assert split_sentences("Ya. Kain ini ditenun di Sumba Timur.", min_chars=10) == [
+        "Ya. Kain ini ditenun di Sumba Timur."
+    ]
+
+
+def test_streamed_chunks_do_not_split_numbers():
+    splitter = SentenceSplitter()
+    sentences = []
+    for chunk in ["Harganya Rp 1.", "500 saja. Mau", " beli? ", "Terima kasih"]:
+        sentences.extend(splitter.feed(chunk))
+    sentences.extend(splitter.flush())
+
+    assert sentences == ["Harganya Rp 1.500 saja.", "Mau beli?", "Terima kasih"]
+
+
+def test_boundary_waits_for_the_following_whitespace():
+    splitter = SentenceSplitter()
+    assert splitter.feed("Selesai.") == []
+    assert splitter.feed(" Lanjut") == ["Selesai."]
+    assert splitter.flush() == ["Lanjut"]
+
+
+def test_segments_respect_max_chars():
+    text = "Satu dua tiga. Empat lima enam. Tujuh delapan sembilan."
+    segments = split_segments(text, max_chars=32)
+
+    assert [segment for segment, _ in segments] == ["Satu dua tiga. Empat lima enam.", "Tujuh delapan sembilan."]
+    assert all(len(segment) <= 32 for segment, _ in segments)
+    assert rebuild(segments) == text
+
+
+def test_segments_keep_line_breaks_and_blank_lines():
+    text = "Judul\n\nKalimat pertama. Kalimat kedua.\nBaris terakhir."
+    segments = split_segments(text, max_chars=20)
+
+    assert rebuild(segments) == text
+    assert segments[0] == ("Judul", "\n\n")
+
+
+def test_overlong_sentence_is_its_own_segment():
+    long_sentence = "kata " * 50 + "akhir."
+    segments = split_segments(f"Awal. {long_sentence} Penutup.", max_chars=40)
+
+    assert [segment for segment, _ in segments] == ["Awal.", long_sentence.strip(), "Penutup."]
+
+
+def test_short_text_is_one_segment():
+    assert split_segments("Halo. Apa kabar?", max_chars=800) == [("Halo. Apa kabar?", "")]
+    assert split_segments("", max_chars=800) == []
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from services import similarity_index
+from services.similarity_index import SimilarityIndex, build_index, l2_normalize
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(300, 32)).astype(np.float32)
+    build_index(embeddings, [{"product_id": f"P{i}"} for i in range(300)], str(tmp_path))
+    return str(tmp_path), embeddings
+
+
+@pytest.mark.parametrize("max_float32_bytes", [0, 1024 * 1024])
+def test_search_matches_an_exact_scan(index_dir, monkeypatch, max_float32_bytes):
+    monkeypatch.setattr(similarity_index, "SCORE_CHUNK_ROWS", 64)  # several chunks plus a partial one
+    directory, embeddings = index_dir
+    index = SimilarityIndex.load(directory, max_float32_bytes=max_float32_bytes)
+    assert (index.float32_vectors is not None) == bool(max_float32_bytes)
+
+    query = embeddings[17] + 0.01
+    found = index.search(query, k=5)
+
+    exact = l2_normalize(embeddings) @ l2_normalize(query)
+    assert [item["product_id"] for item in found] == [f"P{i}" for i in np.argsort(-exact)[:5]]
+    assert found[0]["score"] == pytest.approx(float(exact.max()), abs=1e-3)
+
+
+def test_ivf_index_uses_both_scoring_paths_alike(tmp_path):
+    rng = np.random.default_rng(1)
+    embeddings = rng.normal(size=(400, 16)).astype(np.float32)
+    build_index(embeddings, [{"product_id": f"P{i}"} for i in range(400)], str(tmp_path), n_lists=8)
+
+    cached = SimilarityIndex.load(str(tmp_path), nprobe=3)
+    chunked = SimilarityIndex.load(str(tmp_path), nprobe=3, max_float32_bytes=0)
+    for query in embeddings[:10]:
+        assert cached.search(query, k=4) == chunked.search(query, k=4)
@@ -0,0 +1,173 @@
+import json
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from routes import translator
+from services.glossary import Glossary, GlossaryIndex, parse_glossary
+from tests.streaming import FakeCompletionStream, serve_until_disconnect
+
+TEXTS = ["hinggi", "lau", "tenun"]
+
+
+def reply(content=None, refusal=None):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content, refusal=refusal))])
+
+
+@pytest.fixture
+def model_reply(monkeypatch):
+    """Make translate_packed receive the given reply instead of calling OpenAI"""
+    holder = {}
+
+    async def fake_call(create, **kwargs):
+        holder["kwargs"] = kwargs
+        return holder["reply"]
+
+    monkeypatch.setattr(translator, "validate_openai_client", lambda: SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=None))
+    ))
+    monkeypatch.setattr(translator, "call_with_retries", fake_call)
+
+    def set_reply(value):
+        holder["reply"] = value
+        return holder
+
+    return set_reply
+
+
+def translate(texts=TEXTS):
+    return asyncio.run(translator.translate_packed(texts, "id"))
+
+
+def test_entries_are_placed_by_id(model_reply):
+    holder = model_reply(reply(json.dumps({"translations": [
+        {"id": 2, "translated_text": " tenunan ", "cultural_notes": "", "confidence_score": 1.4},
+        {"id": 0, "translated_text": "kain pria", "cultural_notes": "dipakai saat upacara", "confidence_score": 0.8},
+    ]})))
+
+    results = translate()
+
+    assert results[0] == {"translated_text": "kain pria", "cultural_notes": "dipakai saat upacara", "confidence_score": 0.8}
+    assert results[1] is None  # left out, retried on its own
+    assert results[2] == {"translated_text": "tenunan", "cultural_notes": None, "confidence_score": 1.0}
+    assert holder["kwargs"]["response_format"] == translator.BATCH_TRANSLATION_SCHEMA
+
+
+def test_unusable_entries_are_skipped(model_reply):
+    model_reply(reply(json.dumps({"translations": [
+        {"id": 7, "translated_text": "di luar jangkauan"},
+        {"id": "1", "translated_text": "id bukan angka"},
+        {"id": 1, "translated_text": "   "},
+        "bukan objek",
+        {"id": 0, "translated_text": "kain pria"},
+    ]})))
+
+    results = translate()
+
+    assert results[0]["translated_text"] == "kain pria"
+    assert results[1:] == [None, None]
+
+
+@pytest.mark.parametrize("content", [
+    "bukan json",
+    json.dumps({"hasil": []}),
+    json.dumps({"translations": "kain"}),
+    json.dumps([1, 2, 3]),
+    "",
+])
+def test_garbled_reply_falls_back_to_single_translations(model_reply, content):
+    model_reply(reply(content))
+    assert translate() == [None, None, None]
+
+
+def test_refusal_falls_back_to_single_translations(model_reply):
+    model_reply(reply(None, refusal="I can't help with that."))
+    assert translate() == [None, None, None]
+
+
+def test_missing_content_falls_back_to_single_translations(model_reply):
+    model_reply(reply(None))
+    assert translate() == [None, None, None]
+
+
+def test_clean_translation_requires_text():
+    with pytest.raises(ValueError):
+        translator.clean_translation({"translated_text": ""})
+    with pytest.raises(ValueError):
+        translator.clean_translation(["translated_text"])
+    assert translator.clean_translation({"translated_text": "ya", "confidence_score": True})["confidence_score"] is None
+
+
+def test_translation_stream_disconnect_closes_upstream(monkeypatch):
+    remembered = []
+
+    async def remember(*args):
+        remembered.append(args)
+
+    monkeypatch.setattr(translator, "remember_translation", remember)
+    stream = FakeCompletionStream(first='{"translated_text": "', delta="kain ")
+    body = translator.TranslateRequest(user_id="u1", sumba_text="hinggi", target_language="id")
+
+    async def main():
+        return await serve_until_disconnect(
+            lambda request: translator.stream_model_translation(
+                request, body, stream, "key", "v2", translator.datetime.now()
+            ),
+            disconnect_after=0.15,
+        )
+
+    sent = asyncio.run(main())
+
+    assert any(b"kain" in message.get("body", b"") for message in sent)
+    assert stream.closed
+    assert remembered == []  # an unfinished translation is never stored
+
+
+@pytest.fixture
+def glossary(monkeypatch, tmp_path):
+    data = json.dumps({"version": "7", "entries": [
+        {"sumba": "hinggi", "id": "kain tenun pria"},
+        {"sumba": "lau", "id": "sarung wanita"},
+    ]}).encode("utf-8")
+    current = Glossary(str(tmp_path / "glossary.json"), ["id", "en"])
+    version, entries = parse_glossary(data, ["id", "en"])
+    current.index = GlossaryIndex(entries, version)
+    monkeypatch.setattr(translator, "glossary", current)
+    return current
+
+
+def batch_items(*texts) -> dict:
+    items = {}
+    for text in texts:
+        key, _, _ = translator.translation_plan(text, "id", None)
+        items[key] = translator.BatchTranslateItem(text=text, target_language="id")
+    return items
+
+
+def test_items_are_packed_only_with_the_same_glossary_hints(glossary):
+    items = batch_items("hinggi merah", "hinggi biru", "lau baru", "kain lama", "kain baru")
+    calls = translator.plan_batch(list(items), items)
+
+    packed_texts = sorted(sorted(items[key].text for key in call) for call in calls)
+    assert packed_texts == [["hinggi biru", "hinggi merah"], ["kain baru", "kain lama"], ["lau baru"]]
+
+
+def test_pack_stores_results_under_the_version_of_the_hints_sent(glossary, model_reply, monkeypatch):
+    stored = []
+    monkeypatch.setattr(translator.translation_memory, "store",
+                        lambda key, text, lang, context, prompt_version, result: stored.append((key, prompt_version)))
+    holder = model_reply(reply(json.dumps({"translations": [
+        {"id": 0, "translated_text": "kain tenun pria merah"},
+        {"id": 1, "translated_text": "kain tenun pria biru"},
+    ]})))
+    items = batch_items("hinggi merah", "hinggi biru")
+    keys = list(items)
+
+    outcomes = asyncio.run(translator.translate_batch_pack(keys, items, asyncio.Semaphore(1)))
+
+    prompt = holder["kwargs"]["messages"][1]["content"]
+    assert "hinggi = kain tenun pria" in prompt and "lau" not in prompt
+    assert stored == [(key, translator.translation_plan(items[key].text, "id", None)[1]) for key in keys]
+    assert all("+g" in version for _, version in stored)
+    assert [error for _, _, error in outcomes] == [None, None]